@@ -0,0 +1,1032 @@
+"""
+HamSCI Contesting and DXing Dashboard - Async (ASGI) Server
+
+Serves the dashboard from a single asyncio event loop instead of one blocking
+WSGI worker per request. Pages and static files are served as in web-ft.py;
+every MongoDB read (spot windows, since deltas, start/end pages and replays,
+/tbsummary aggregations and spot cache refreshes) goes through PyMongo's
+asyncio client, so waiting on the database holds neither a worker nor a
+thread. CPU-bound work (grid/zone enrichment, filtering, in-memory cache
+lookups) runs in a bounded thread pool. Live update streams are plain
+coroutines, so open connections cost no threads.
+
+Query building, enrichment, formatting and the shared spot caches all come
+from web-ft.py, so both servers return the same data. Each receiver in the
+registry (receivers.py) is read through an asyncio client shared per MongoDB
+URI; requests covering several receivers read them concurrently and merge
+the spots in time order.
+
+Usage:
+    pip install -r requirements-asgi.txt
+    uvicorn asgi-ft:app --host 0.0.0.0 --port 5000
+
+Configuration (environment / .env):
+    ASGI_EXECUTOR_THREADS=4   Threads for enrichment and cache lookups
+    ASGI_MAX_PENDING=64       Executor jobs allowed in flight or queued; further
+                              requests wait for a slot
+
+Project: HamSCI Personal Space Weather Station Dashboard Development
+"""
+
+import asyncio
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+import contextvars
+from datetime import timedelta
+from functools import partial
+import heapq
+import importlib.util
+import os
+import time
+
+from bson.errors import InvalidId
+from pymongo import ASCENDING
+from starlette.applications import Starlette
+from starlette.datastructures import MutableHeaders
+from starlette.middleware import Middleware
+from starlette.responses import FileResponse, JSONResponse, PlainTextResponse, Response, StreamingResponse
+from starlette.routing import Mount, Route
+from starlette.staticfiles import StaticFiles
+
+from grid_cells import CellAggregator, cell_pipeline
+from metrics import (METRICS_ENABLED, PROMETHEUS_CONTENT_TYPE, count_spots, finish_timings, record_stage,
+                     render_metrics, start_timings, timed_async_batches)
+from profiler import PROFILER_ENABLED, folded, sample_stacks
+from receivers import close_async_clients, receiver_async_collection
+from response_cache import cache_key, cacheable_window, choose_encoding, compress, etag_matches
+from spot_cache import SPOT_CACHE_MINUTES, SPOT_STREAM_LIFETIME_SECONDS, SPOT_STREAM_SECONDS
+from spotdb import async_cursor_batches, spot_sort
+from wire_format import COLUMNAR_FORMATS, msgpack, requested_format
+from zone_assets import find_zone_asset
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+ASGI_EXECUTOR_THREADS = int(os.getenv('ASGI_EXECUTOR_THREADS', '4'))
+ASGI_MAX_PENDING = int(os.getenv('ASGI_MAX_PENDING', '64'))
+
+
+def load_web_app():
+    """
+    Import web-ft.py (not importable by name because of the hyphen).
+
+    Returns:
+        module: The loaded web-ft module (grid table, spot cache, fetchers)
+    """
+    spec = importlib.util.spec_from_file_location("web_ft", os.path.join(BASE_DIR, "web-ft.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+web = load_web_app()
+
+# Receiver id -> spots collection on the asyncio client
+async_collections = {receiver.id: receiver_async_collection(receiver) for receiver in web.receivers}
+
+executor = ThreadPoolExecutor(max_workers=ASGI_EXECUTOR_THREADS, thread_name_prefix="enrich")
+_pending = asyncio.Semaphore(ASGI_MAX_PENDING)
+
+# Receiver id -> lock held while its spot cache refreshes (see refresh_caches())
+_refresh_locks = {}
+
+# The caches are only refreshed through the async client, never from the executor
+for _source in web.spot_sources.values():
+    if _source.spot_cache is not None:
+        _source.spot_cache.auto_refresh = False
+
+
+async def offload(func, *args, **kwargs):
+    """
+    Run a blocking function in the bounded executor.
+
+    The function runs in a copy of the caller's context, so its stage
+    timings (metrics.py) count towards the current request.
+
+    Args:
+        func (callable): Function to run
+        *args, **kwargs: Passed to ``func``
+
+    Returns:
+        Whatever ``func`` returns
+    """
+    context = contextvars.copy_context()
+    async with _pending:
+        return await asyncio.get_running_loop().run_in_executor(
+            executor, partial(context.run, func, *args, **kwargs))
+
+
+def query_int(params, name):
+    """Integer query parameter, or None if missing/invalid (like Flask's type=int)."""
+    try:
+        return int(params[name])
+    except (KeyError, ValueError):
+        return None
+
+
+def spot_filters(params):
+    """
+    Read the /spots filter query parameters (see web-ft.py spot_filters()).
+
+    Args:
+        params (QueryParams): Request query parameters
+
+    Returns:
+        dict: Keyword arguments for fetch_wspr_spots() / spot_matches()
+    """
+    mode = params.get('mode')
+    return {
+        "band": params.get('band'),
+        "modes": [m.lower() for m in mode.split(',') if m] if mode else None,
+        "country": params.get('country'),
+        "continent": params.get('continent'),
+        "cq_zone": query_int(params, 'cqzone'),
+        "itu_zone": query_int(params, 'ITUzone'),
+    }
+
+
+def table_filters(params, default_band=None):
+    """
+    Read the table band/mode filter query parameters (see web-ft.py table_filters()).
+
+    Args:
+        params (QueryParams): Request query parameters
+        default_band (str): Band selection used when ``band`` is not given
+
+    Returns:
+        dict: Keyword arguments for spot_matches()
+    """
+    mode = params.get('mode')
+    return {
+        "band": params.get('band', default_band),
+        "modes": [m.lower() for m in mode.split(',') if m] if mode else None,
+    }
+
+
+def cache_covers(lastInterval, sources):
+    """True if the shared spot caches of all sources can answer a lastInterval window."""
+    try:
+        minutes = int(lastInterval)
+    except (TypeError, ValueError):
+        return False
+    return all(source.spot_cache is not None and source.spot_cache.covers(minutes) for source in sources)
+
+
+async def read_docs(collection, query, projection, sort, limit=0):
+    """
+    Read every document of a query through the async Mongo client.
+
+    Args:
+        collection (AsyncCollection): A receiver's spots collection
+        query (dict): MongoDB filter
+        projection (dict): Fields to read
+        sort (list): PyMongo sort specification
+        limit (int): Most documents to read, or 0 for all
+
+    Returns:
+        list[dict]: Raw documents in ``sort`` order
+    """
+    cursor = collection.find(query, projection).sort(sort).limit(limit).batch_size(limit or web.CURSOR_BATCH_SIZE)
+    return [doc async for docs in timed_async_batches(async_cursor_batches(cursor, web.CURSOR_BATCH_SIZE))
+            for doc in docs]
+
+
+async def refresh_caches(sources):
+    """
+    Refresh the spot caches of some receivers that are due, through the async client.
+
+    The refresh query runs on the event loop and each batch is enriched and
+    added in the executor (see SpotCache.refresh_query() and load()), so a
+    refresh holds no thread while MongoDB answers. The cache reads that
+    follow in the executor never query (auto_refresh is off).
+    Concurrent requests for the same receiver wait for one refresh.
+
+    Args:
+        sources (list[SpotSource]): Receivers whose caches to refresh
+    """
+    async def refresh(source):
+        cache = source.spot_cache
+        async with _refresh_locks.setdefault(source.receiver.id, asyncio.Lock()):
+            if not cache.refresh_due():
+                return
+            cursor = async_collections[source.receiver.id].find(cache.refresh_query(), cache.projection) \
+                .sort([("_id", ASCENDING)]).batch_size(web.CURSOR_BATCH_SIZE)
+            async for docs in timed_async_batches(async_cursor_batches(cursor, web.CURSOR_BATCH_SIZE)):
+                await offload(cache.load, docs)
+            await offload(cache.finish_refresh)
+
+    await asyncio.gather(*(refresh(source) for source in sources if source.spot_cache is not None))
+
+
+async def database_spots(collection, query, projection, format_batch):
+    """
+    Stream formatted spots for a query through the async Mongo client.
+
+    Documents are read CURSOR_BATCH_SIZE at a time without blocking the event
+    loop; each batch is enriched and formatted in the executor.
+
+    Args:
+        collection (AsyncCollection): A receiver's spots collection
+        query (dict): MongoDB filter
+        projection (dict): Fields to read
+        format_batch (callable): Turns a list of raw documents into a list of spots
+
+    Yields:
+        list[dict]: Formatted spots, oldest first
+    """
+    cursor = collection.find(query, projection).sort(spot_sort()).batch_size(web.CURSOR_BATCH_SIZE)
+    async for docs in timed_async_batches(async_cursor_batches(cursor, web.CURSOR_BATCH_SIZE)):
+        yield await offload(format_batch, docs)
+
+
+async def source_spots(sources, make_query, projection, format_batch):
+    """
+    Stream formatted spots of several receivers from the database, oldest first.
+
+    One receiver is streamed batch by batch. Several are read concurrently,
+    each on its own collection, and merged on the spot ``time`` into a single
+    batch (see web-ft.py fan_out()).
+
+    Args:
+        sources (list[SpotSource]): Receivers to read
+        make_query (callable): Takes a Receiver and returns its MongoDB filter
+        projection (dict): Fields to read
+        format_batch (callable): Called with (docs, receiver); returns formatted spots
+
+    Yields:
+        list[dict]: Formatted spots, oldest first
+    """
+    def read(source):
+        receiver = source.receiver
+        return database_spots(async_collections[receiver.id], make_query(receiver), projection,
+                              partial(format_batch, receiver=receiver))
+
+    if len(sources) == 1:
+        async for batch in read(sources[0]):
+            yield batch
+        return
+
+    async def collect(source):
+        return [spot async for batch in read(source) for spot in batch]
+
+    results = await asyncio.gather(*(collect(source) for source in sources))
+    yield list(heapq.merge(*results, key=lambda spot: spot["time"]))
+
+
+async def cached_batch(sources, func):
+    """Refresh the spot caches of some receivers, then yield the list returned by a blocking cache read."""
+    await refresh_caches(sources)
+    yield await offload(func)
+
+
+async def serialize_batches(batches, ndjson=False):
+    """
+    Serialize spot batches as a JSON array, or NDJSON.
+
+    Args:
+        batches (async iterable[list[dict]]): Formatted spots
+        ndjson (bool): One JSON object per line instead of a JSON array
+
+    Yields:
+        str: Consecutive pieces of the same body as web-ft.py serialize_spots()
+    """
+    first = True
+    if not ndjson:
+        yield "["
+    async for spots in batches:
+        if not spots:
+            continue
+        # Serialized by the Flask app's JSON provider so both servers send identical bytes
+        start = time.perf_counter()
+        chunk = [web.app.json.dumps(spot) for spot in spots]
+        record_stage("serialize", time.perf_counter() - start)
+        count_spots(len(spots))
+        if ndjson:
+            yield "\n".join(chunk) + "\n"
+        else:
+            yield ("" if first else ",") + ",".join(chunk)
+        first = False
+    if not ndjson:
+        yield "]"
+
+
+async def conditional_response(request, key, build):
+    """
+    Serve a response cache entry with its ETag, or 304 if the client has it.
+
+    Concurrent requests for the same key share one build (see
+    response_cache.ResponseCache.get_async()).
+
+    Args:
+        request (Request): Incoming request
+        key (tuple): Key from response_cache.cache_key()
+        build (callable): Coroutine function returning ``(body bytes, mimetype)``
+
+    Returns:
+        Response: 200 with the body, or 304 Not Modified
+    """
+    entry = await web.response_cache.get_async(key, build)
+    encoding = choose_encoding(request.headers.get("accept-encoding"), len(entry.body))
+    # Each content encoding is a separate representation with its own tag
+    etag = f"{entry.etag}-{encoding}" if encoding else entry.etag
+    headers = {"ETag": f'"{etag}"', "Cache-Control": "no-cache", "Vary": "Accept, Accept-Encoding"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    body = await offload(web.response_cache.encoded, entry, encoding)
+    return Response(body, media_type=entry.mimetype, headers=headers)
+
+
+async def spot_list_response(request, route, lastInterval, filters, batches):
+    """
+    Answer a spot list request, coalesced and cached when the window allows.
+
+    Mirrors web-ft.py coalesced_spots(): windows up to
+    RESPONSE_CACHE_MAX_MINUTES go through the response cache, longer ones
+    stream straight from the database. Columnar formats (wire_format.py) are
+    always built whole.
+
+    Args:
+        request (Request): Incoming request
+        route (str): Endpoint path, part of the cache key
+        lastInterval (str): Window in minutes, or None for a start/end range (never cached)
+        filters (dict): Parsed filters, part of the cache key
+        batches (callable): Returns an async iterable of formatted spot batches
+
+    Returns:
+        Response: Cached, 304 or streaming spot list, or a 406 JSON error
+    """
+    fmt = requested_format(request.query_params.get('format'), request.headers.get('accept'))
+    if fmt == "msgpack" and msgpack is None:
+        return JSONResponse({"error": "format=msgpack needs the msgpack package on the server"}, status_code=406)
+    cacheable = web.response_cache is not None and cacheable_window(lastInterval)
+    ndjson = fmt == 'ndjson'
+    media_type = "application/x-ndjson" if ndjson else "application/json"
+
+    if fmt in COLUMNAR_FORMATS:
+        async def build():
+            spots = [spot async for batch in batches() for spot in batch]
+            return await offload(web.encode_spot_columns, spots, fmt)
+    elif cacheable:
+        async def build():
+            body = "".join([piece async for piece in serialize_batches(batches(), ndjson)])
+            return body.encode(), media_type
+    else:
+        return StreamingResponse(serialize_batches(batches(), ndjson), media_type=media_type)
+
+    if not cacheable:
+        body, media_type = await build()
+        encoding = choose_encoding(request.headers.get("accept-encoding"), len(body))
+        headers = {"Vary": "Accept, Accept-Encoding"}
+        if encoding:
+            headers["Content-Encoding"] = encoding
+        return Response(await offload(compress, body, encoding), media_type=media_type, headers=headers)
+    return await conditional_response(request, cache_key(route, lastInterval, filters, fmt), build)
+
+
+async def spot_changes_response(params, format_spot, filters, sources):
+    """
+    Answer a ``since`` request with a delta (see web-ft.py spot_changes_response()).
+
+    Args:
+        params (QueryParams): Request query parameters
+        format_spot (callable): table_spot or map_spot
+        filters (dict): Keyword arguments for spot_matches()
+        sources (list[SpotSource]): Receivers to include
+
+    Returns:
+        JSONResponse: Delta, or a 400 JSON error
+    """
+    try:
+        minutes = int(params.get('lastInterval', '15'))
+        cursor = web.parse_cursor(params.get('since'), sources)
+    except (InvalidId, TypeError, ValueError):
+        return JSONResponse({"error": "since must be 0 or a cursor from a previous response"}, status_code=400)
+    return JSONResponse(await fetch_spot_changes(cursor, minutes, format_spot, filters, sources))
+
+
+async def fetch_spot_changes(since, minutes, format_spot, filters, sources):
+    """
+    Fetch the spots added after a cursor (see web-ft.py fetch_spot_changes()).
+
+    Windows the spot caches cover are answered from memory after an async
+    refresh; other receivers' documents are read through the async client.
+
+    Args:
+        since (dict): Receiver id -> ObjectId, or None for a full sync
+        minutes (int): Window in minutes
+        format_spot (callable): table_spot or map_spot
+        filters (dict): Keyword arguments for spot_matches()
+        sources (list[SpotSource]): Receivers to include
+
+    Returns:
+        dict: Delta (see web-ft.py fetch_spot_changes())
+    """
+    await refresh_caches(sources)
+
+    async def changes(source):
+        after = (since or {}).get(source.receiver.id)
+        docs = None
+        if not cache_covers(minutes, [source]):
+            docs = await read_docs(async_collections[source.receiver.id],
+                                   web.changes_query(after, minutes, source.receiver),
+                                   web.CACHE_PROJECTION, [("_id", ASCENDING)])
+        return await offload(web.source_changes, source, after, minutes, format_spot, filters, docs)
+
+    results = await asyncio.gather(*(changes(source) for source in sources))
+    return web.merge_changes(since, minutes, sources, results)
+
+
+async def fetch_spot_page(start, end, after, limit, format_spot, projection, filters, sources):
+    """
+    Fetch one page of a range through the async client (see web-ft.py fetch_spot_page()).
+
+    Args:
+        start, end (datetime): Range (naive UTC); end is excluded
+        after (dict): Positions from parse_page_cursor(), empty for the first page
+        limit (int): Spots per page
+        format_spot (callable): table_spot or map_spot
+        projection (dict): Fields to read
+        filters (dict): spot_query() filters
+        sources (list[SpotSource]): Receivers to include
+
+    Returns:
+        dict: Page (see web-ft.py fetch_spot_page())
+    """
+    async def read(source):
+        docs = await read_docs(async_collections[source.receiver.id],
+                               web.page_query(start, end, after, filters, source.receiver),
+                               {**projection, "ts": 1}, web.KEYSET_SORT, limit + 1)
+        return await offload(web.enrich_batch, docs)
+
+    results = await asyncio.gather(*(read(source) for source in sources))
+    return await offload(web.assemble_page, start, end, after, limit, format_spot, filters, sources, results)
+
+
+async def range_spots(start, end, filters, sources, format_spot=None):
+    """
+    Stream every map spot of a range a page at a time (see web-ft.py range_spots()).
+
+    Yields:
+        list[dict]: Formatted spots of one page, oldest first
+    """
+    after = {}
+    while True:
+        page = await fetch_spot_page(start, end, after, web.SPOT_PAGE_MAX, format_spot or web.map_spot,
+                                     web.MAP_PROJECTION, filters, sources)
+        yield page["spots"]
+        if page["next"] is None:
+            return
+        after = web.parse_page_cursor(page["next"])
+
+
+async def spot_page_response(params, format_spot, projection, filters, sources):
+    """
+    Answer a ``start`` request with one page (see web-ft.py spot_page_response()).
+
+    Args:
+        params (QueryParams): Request query parameters
+        format_spot (callable): table_spot or map_spot
+        projection (dict): Fields to read
+        filters (dict): spot_query() filters
+        sources (list[SpotSource]): Receivers to include
+
+    Returns:
+        JSONResponse: Page, or a 400 JSON error
+    """
+    try:
+        start, end, limit, after = web.parse_range(params)
+    except ValueError as err:
+        return JSONResponse({"error": str(err)}, status_code=400)
+    return JSONResponse(await fetch_spot_page(start, end, after, limit, format_spot, projection, filters, sources))
+
+
+async def range_aggregate_response(request, format_spot, new_aggregator, filters, sources, precision=None):
+    """
+    Answer a ``start`` request with ``aggregate`` (see web-ft.py range_aggregate_response()).
+
+    Args:
+        request (Request): Incoming request
+        format_spot (callable): Formatter from spot_aggregation()
+        new_aggregator (callable): Aggregator factory from spot_aggregation()
+        filters (dict): spot_query() filters
+        sources (list[SpotSource]): Receivers to include
+        precision (str): Cell precision from web.database_cells(), or None
+
+    Returns:
+        Response: Link or cell list, or a 400 JSON error
+    """
+    try:
+        start, end, _, _ = web.parse_range(request.query_params)
+    except ValueError as err:
+        return JSONResponse({"error": str(err)}, status_code=400)
+    if precision:
+        return await spot_list_response(request, '/spots', None, None,
+                                        lambda: fetch_cells(precision, filters, sources, start=start, end=end))
+    return await spot_list_response(
+        request, '/spots', None, None,
+        lambda: aggregated(new_aggregator, range_spots(start, end, filters, sources, format_spot)))
+
+
+def replay_response(params, filters, sources):
+    """
+    Stream a past range as Server-Sent Events (see web-ft.py replay_response()).
+
+    Pages are read in the executor between events; the wait for each
+    event's due time is an asyncio sleep.
+
+    Args:
+        params (QueryParams): Request query parameters
+        filters (dict): spot_query() filters
+        sources (list[SpotSource]): Receivers to include
+
+    Returns:
+        StreamingResponse: text/event-stream, or a 400 JSON error
+    """
+    try:
+        start, end, speed, minutes = web.parse_replay(params)
+    except ValueError as err:
+        return JSONResponse({"error": str(err)}, status_code=400)
+
+    async def generate():
+        started = time.monotonic()
+        async for due, event in replay_events(start, end, speed, minutes, filters, sources):
+            delay = started + due - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            yield f"data: {web.app.json.dumps(event)}\n\n"
+
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    return StreamingResponse(generate(), media_type="text/event-stream", headers=headers)
+
+
+async def replay_events(start, end, speed, minutes, filters, sources):
+    """
+    Replay a past range as /spots/stream events (see web-ft.py replay_events()).
+
+    Yields:
+        tuple: (due, event) as in web-ft.py replay_events()
+    """
+    pages = range_spots(start, end, filters, sources)
+    spots = deque()
+
+    async def next_spot():
+        while not spots:
+            page = await anext(pages, None)
+            if page is None:
+                return None
+            spots.extend(page)
+        return spots.popleft()
+
+    pending = await next_spot()
+    minute = start.replace(second=0, microsecond=0)
+    first = True
+    while minute < end:
+        label = minute.strftime("%y%m%d %H%M")
+        batch = []
+        while pending is not None and pending["time"] <= label:
+            batch.append(pending)
+            pending = await next_spot()
+        due, event = web.replay_event(start, minute, speed, minutes, batch, first)
+        yield due, event
+        first = False
+        minute += timedelta(minutes=1)
+    yield web.replay_done(start, end, speed, event)
+
+
+def stream_spot_events(lastInterval, format_spot, filters, sources, last_event_id=None):
+    """
+    Push new spots as Server-Sent Events (see web-ft.py stream_spot_events()).
+
+    The wait between events is an asyncio sleep, so an open stream holds no
+    thread; only the cache lookup for each event runs in the executor.
+
+    Args:
+        lastInterval (str): Window in minutes; must be covered by the spot cache
+        format_spot (callable): table_spot or map_spot
+        filters (dict): Keyword arguments for spot_matches()
+        sources (list[SpotSource]): Receivers to include
+        last_event_id (str): Last-Event-ID header of a reconnecting client, or None
+
+    Returns:
+        StreamingResponse: text/event-stream, or a JSON error
+    """
+    try:
+        minutes = int(lastInterval)
+    except (TypeError, ValueError):
+        return JSONResponse({"error": "lastInterval must be a number of minutes"}, status_code=400)
+    if any(source.spot_cache is None for source in sources):
+        return JSONResponse({"error": "live updates need the spot cache (SPOT_CACHE_MINUTES > 0)"}, status_code=503)
+    if not cache_covers(minutes, sources):
+        return JSONResponse({"error": f"lastInterval must be 1-{SPOT_CACHE_MINUTES} minutes"}, status_code=400)
+
+    async def generate():
+        cursor = web.resume_cursor(last_event_id, sources)
+        deadline = time.monotonic() + SPOT_STREAM_LIFETIME_SECONDS
+        yield f"retry: {int(SPOT_STREAM_SECONDS * 1000)}\n\n"
+        while True:
+            event = await fetch_spot_changes(cursor, minutes, format_spot, filters, sources)
+            if event["cursor"]:
+                cursor = web.parse_cursor(event["cursor"], sources)
+            yield f"id: {event['cursor'] or ''}\ndata: {web.app.json.dumps(event)}\n\n"
+            if time.monotonic() >= deadline:
+                return
+            await asyncio.sleep(SPOT_STREAM_SECONDS)
+
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    return StreamingResponse(generate(), media_type="text/event-stream", headers=headers)
+
+
+def map_batch(docs, filters, receiver, format_spot=None):
+    """Enrich, geo-filter and format a batch of one receiver's documents for /spots."""
+    format_spot = format_spot or web.map_spot
+    return [
+        format_spot(spot, receiver) for spot in web.enrich_batch(docs)
+        if web.matches_geo_filters(spot["tx"], filters["country"], filters["continent"],
+                                   filters["cq_zone"], filters["itu_zone"])
+    ]
+
+
+def table_batch(docs, receiver):
+    """Enrich and format a batch of one receiver's documents for /tbspots."""
+    return [web.table_spot(spot, receiver) for spot in web.enrich_batch(docs)]
+
+
+# Routes
+# ------
+# Same URLs, parameters and responses as web-ft.py
+
+def template(name):
+    path = os.path.join(BASE_DIR, "templates", name)
+
+    async def page(request):
+        return FileResponse(path, media_type="text/html")
+    return page
+
+
+async def aggregated(new_aggregator, batches):
+    """
+    Collapse spot batches into links or cells (see web-ft.py spot_aggregation()).
+
+    Args:
+        new_aggregator (callable): Returns an empty LinkAggregator or CellAggregator
+        batches (async iterable[list[dict]]): Formatted spots, oldest first
+
+    Yields:
+        list[dict]: All link or cell records, as a single batch
+    """
+    aggregator = new_aggregator()
+    async for batch in batches:
+        await offload(aggregator.add, batch)
+    yield aggregator.records()
+
+
+async def fetch_cells(precision, filters, sources, lastInterval=15, start=None, end=None):
+    """
+    Bin decodes into Maidenhead cells (see web-ft.py fetch_cells()).
+
+    Receivers whose spot cache covers the window are binned in memory after
+    an async refresh; the cell_pipeline() aggregation of the others runs on
+    the async client.
+
+    Yields:
+        list[dict]: All cell records, as a single batch
+    """
+    async def rows(source):
+        if start is None and cache_covers(lastInterval, [source]):
+            await refresh_caches([source])
+            return None
+        query = web.spot_query(lastInterval, receiver=source.receiver, start=start, end=end, **filters)
+        started = time.perf_counter()
+        groups = [row async for row in
+                  await async_collections[source.receiver.id].aggregate(cell_pipeline(query, precision))]
+        record_stage("query", time.perf_counter() - started)
+        return groups
+
+    results = await asyncio.gather(*(rows(source) for source in sources))
+    aggregator = CellAggregator(precision)
+    for source, groups in zip(sources, results):
+        await offload(web.add_source_cells, aggregator, filters, source, lastInterval, start, end, groups)
+    yield aggregator.records()
+
+
+async def spots(request):
+    """REST API endpoint: spots for the map (see web-ft.py /spots)."""
+    params = request.query_params
+    filters = spot_filters(params)
+    try:
+        sources = web.selected_sources(params.get('rx'))
+        format_spot, new_aggregator, aggregate_key = web.spot_aggregation(params)
+    except ValueError as err:
+        return JSONResponse({"error": str(err)}, status_code=400)
+    precision = web.database_cells(aggregate_key, filters)
+    if 'start' in params:
+        if new_aggregator:
+            return await range_aggregate_response(request, format_spot, new_aggregator, filters, sources, precision)
+        return await spot_page_response(params, web.map_spot, web.MAP_PROJECTION, filters, sources)
+    if 'since' in params:
+        if new_aggregator:
+            return JSONResponse({"error": "aggregate cannot be combined with since"}, status_code=400)
+        return await spot_changes_response(params, web.map_spot, filters, sources)
+
+    lastInterval = params.get('lastInterval', '15')
+
+    def spot_batches():
+        if cache_covers(lastInterval, sources):
+            return cached_batch(sources, lambda: list(web.fetch_wspr_spots(lastInterval, sources=sources,
+                                                                           format_spot=format_spot, **filters)))
+        return source_spots(sources, lambda receiver: web.spot_query(lastInterval, receiver=receiver, **filters),
+                            web.MAP_PROJECTION, partial(map_batch, filters=filters, format_spot=format_spot))
+
+    def batches():
+        if precision:
+            return fetch_cells(precision, filters, sources, lastInterval)
+        return aggregated(new_aggregator, spot_batches()) if new_aggregator else spot_batches()
+
+    return await spot_list_response(request, '/spots', lastInterval,
+                                    {**filters, "rx": web.source_ids(sources), **aggregate_key}, batches)
+
+
+async def spots_stream(request):
+    """Server-Sent Events endpoint: live map updates (see web-ft.py /spots/stream)."""
+    params = request.query_params
+    try:
+        sources = web.selected_sources(params.get('rx'))
+    except ValueError as err:
+        return JSONResponse({"error": str(err)}, status_code=400)
+    return stream_spot_events(params.get('lastInterval', '15'), web.map_spot, spot_filters(params),
+                              sources, request.headers.get('last-event-id'))
+
+
+async def spots_replay(request):
+    """Server-Sent Events endpoint: replay a past range on the map (see web-ft.py /spots/replay)."""
+    params = request.query_params
+    try:
+        sources = web.selected_sources(params.get('rx'))
+    except ValueError as err:
+        return JSONResponse({"error": str(err)}, status_code=400)
+    return replay_response(params, spot_filters(params), sources)
+
+
+async def tbspots(request):
+    """REST API endpoint: spots for the table (see web-ft.py /tbspots)."""
+    params = request.query_params
+    try:
+        sources = web.selected_sources(params.get('rx'))
+    except ValueError as err:
+        return JSONResponse({"error": str(err)}, status_code=400)
+    filters = table_filters(params)
+    if 'start' in params:
+        return await spot_page_response(params, web.table_spot, web.TABLE_PROJECTION, filters, sources)
+    if 'since' in params:
+        return await spot_changes_response(params, web.table_spot, filters, sources)
+
+    lastInterval = params.get('lastInterval', '15')
+
+    def batches():
+        if cache_covers(lastInterval, sources):
+            return cached_batch(sources, lambda: list(web.fetch_wspr_spots_tb(lastInterval, sources=sources,
+                                                                              **filters)))
+        return source_spots(sources, lambda receiver: web.spot_query(lastInterval, receiver=receiver, **filters),
+                            web.TABLE_PROJECTION, table_batch)
+
+    return await spot_list_response(request, '/tbspots', lastInterval,
+                                    {**filters, "rx": web.source_ids(sources)}, batches)
+
+
+async def tbsummary(request):
+    """REST API endpoint: region x band x mode counts (see web-ft.py /tbsummary)."""
+    params = request.query_params
+    mode = params.get('mode')
+    modes = [m for m in mode.split(',') if m] if mode else None
+    lastInterval = params.get('lastInterval', '15')
+    band = params.get('band', 'CBs')
+    try:
+        sources = web.selected_sources(params.get('rx'))
+    except ValueError as err:
+        return JSONResponse({"error": str(err)}, status_code=400)
+    if web.response_cache is None:
+        return JSONResponse(await fetch_table_summary(lastInterval, band, modes, sources))
+
+    async def build():
+        summary = await fetch_table_summary(lastInterval, band, modes, sources)
+        return web.app.json.dumps(summary).encode(), "application/json"
+
+    filters = {"band": band, "modes": [m.lower() for m in modes] if modes else None, "rx": web.source_ids(sources)}
+    return await conditional_response(request, cache_key('/tbsummary', lastInterval, filters), build)
+
+
+async def fetch_table_summary(lastInterval, band, modes, sources):
+    """
+    Count spots per region, band and mode (see web-ft.py fetch_table_summary()).
+
+    Receivers whose spot cache covers the window are counted in memory after
+    an async refresh; the rollup or $group aggregation of the others runs on
+    the async client.
+
+    Returns:
+        dict: Summary (see web-ft.py fetch_table_summary())
+    """
+    modes = [m.lower() for m in modes] if modes else None
+
+    async def rows(source):
+        groups = None
+        if cache_covers(lastInterval, [source]):
+            await refresh_caches([source])
+        else:
+            kind, pipeline = web.summary_pipeline(lastInterval, band, modes, source.receiver)
+            collection = async_collections[source.receiver.id]
+            if kind == "rollups":
+                collection = collection.database[web.ROLLUP_COLLECTION]
+            start = time.perf_counter()
+            groups = [row async for row in await collection.aggregate(pipeline)]
+            record_stage("query", time.perf_counter() - start)
+        return await offload(web.summary_rows, lastInterval, band, modes, source, groups)
+
+    results = await asyncio.gather(*(rows(source) for source in sources))
+    return web.summary_counts(lastInterval, [row for source_rows in results for row in source_rows])
+
+
+async def tbspots_stream(request):
+    """Server-Sent Events endpoint: live table updates (see web-ft.py /tbspots/stream)."""
+    params = request.query_params
+    try:
+        sources = web.selected_sources(params.get('rx'))
+    except ValueError as err:
+        return JSONResponse({"error": str(err)}, status_code=400)
+    return stream_spot_events(params.get('lastInterval', '15'), web.table_spot, table_filters(params, 'CBs'),
+                              sources, request.headers.get('last-event-id'))
+
+
+async def openings(request):
+    """REST API endpoint: detected band openings (see web-ft.py /openings)."""
+    try:
+        since, band, modes, sources = web.parse_openings(request.query_params)
+    except ValueError as err:
+        return JSONResponse({"error": str(err)}, status_code=400)
+    error = web.openings_unavailable(sources)
+    if error:
+        return JSONResponse({"error": error}, status_code=503)
+    await refresh_caches(sources)
+    return JSONResponse(await offload(web.fetch_openings, since, band, modes, sources))
+
+
+async def openings_stream(request):
+    """Server-Sent Events endpoint: band opening alerts (see web-ft.py /openings/stream)."""
+    try:
+        since, band, modes, sources = web.parse_openings(request.query_params, request.headers.get('last-event-id'))
+    except ValueError as err:
+        return JSONResponse({"error": str(err)}, status_code=400)
+    error = web.openings_unavailable(sources)
+    if error:
+        return JSONResponse({"error": error}, status_code=503)
+
+    async def generate():
+        cursor = since
+        deadline = time.monotonic() + SPOT_STREAM_LIFETIME_SECONDS
+        yield f"retry: {int(SPOT_STREAM_SECONDS * 1000)}\n\n"
+        while True:
+            await refresh_caches(sources)
+            event = await offload(web.fetch_openings, cursor, band, modes, sources)
+            cursor = event["cursor"]
+            yield f"id: {cursor}\ndata: {web.app.json.dumps(event)}\n\n"
+            if time.monotonic() >= deadline:
+                return
+            await asyncio.sleep(SPOT_STREAM_SECONDS)
+
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    return StreamingResponse(generate(), media_type="text/event-stream", headers=headers)
+
+
+async def stats(request):
+    """REST API endpoint: SNR and drift quantiles (see web-ft.py /stats)."""
+    try:
+        args = web.parse_stats(request.query_params)
+    except ValueError as err:
+        return JSONResponse({"error": str(err)}, status_code=400)
+    if any(source.stats is None for source in args[-1]):
+        return JSONResponse({"error": "statistics need the spot cache (SPOT_CACHE_MINUTES > 0)"}, status_code=503)
+    await refresh_caches(args[-1])
+    return JSONResponse(await offload(web.fetch_stats, *args))
+
+
+async def zone_asset(request):
+    """Simplified zone boundary assets (see web-ft.py /zones/<name>)."""
+    name = request.path_params['name']
+    asset = find_zone_asset(name, request.headers.get("accept-encoding"))
+    if asset is None:
+        return JSONResponse({"error": f"no zone asset {name!r} (build them with python zone_assets.py)"},
+                            status_code=404)
+    headers = {
+        "Vary": "Accept-Encoding",
+        "Cache-Control": f"public, max-age={asset.max_age}, immutable" if asset.max_age else "no-cache",
+    }
+    if asset.encoding:
+        headers["Content-Encoding"] = asset.encoding
+    response = FileResponse(asset.path, media_type=asset.mimetype, headers=headers, stat_result=os.stat(asset.path))
+    if etag_matches(request.headers.get("if-none-match"), response.headers["etag"].strip('"')):
+        return Response(status_code=304, headers={**headers, "ETag": response.headers["etag"]})
+    return response
+
+
+async def metrics(request):
+    """Prometheus metrics (see web-ft.py /metrics)."""
+    if not METRICS_ENABLED:
+        return JSONResponse({"error": "metrics are disabled (METRICS_ENABLED=0)"}, status_code=404)
+    return Response(render_metrics(), headers={"Content-Type": PROMETHEUS_CONTENT_TYPE})
+
+
+async def debug_profile(request):
+    """Sample the server's stacks for a flame graph (see web-ft.py /debug/profile)."""
+    if not PROFILER_ENABLED:
+        return JSONResponse({"error": "profiling is disabled (PROFILER_ENABLED=0)"}, status_code=404)
+    try:
+        seconds = float(request.query_params.get('seconds', 10))
+    except ValueError:
+        seconds = 10
+    # A plain thread, not the executor: the capture sleeps between samples
+    stacks = await asyncio.to_thread(sample_stacks, seconds)
+    if stacks is None:
+        return JSONResponse({"error": "a profile capture is already running"}, status_code=409)
+    return PlainTextResponse(folded(stacks))
+
+
+async def receivers_list(request):
+    """REST API endpoint: the receiver registry (see web-ft.py /receivers)."""
+    return JSONResponse([
+        {"id": r.id, "callsign": r.callsign, "locator": r.locator, "lat": r.lat, "lon": r.lon}
+        for r in web.receivers
+    ])
+
+
+class RequestMetrics:
+    """
+    ASGI middleware collecting each request's stage timings (see metrics.py).
+
+    Adds the Server-Timing header when the response starts and records the
+    request once its body has been sent.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not METRICS_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        timings = start_timings()
+        status = 500
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                MutableHeaders(scope=message).append("Server-Timing", timings.server_timing())
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            finish_timings(timings, ROUTE_PATHS.get(scope.get("endpoint"), "unmatched"), status)
+
+
+@asynccontextmanager
+async def lifespan(app):
+    yield
+    await close_async_clients()
+    executor.shutdown(wait=False, cancel_futures=True)
+
+
+app = Starlette(
+    routes=[
+        Route('/', template("both.html")),
+        Route('/map', template("index_ft.html")),
+        Route('/display', template("index_wcount.html")),
+        Route('/table', template("table_ft.html")),
+        Route('/spots', spots),
+        Route('/spots/stream', spots_stream),
+        Route('/spots/replay', spots_replay),
+        Route('/tbspots', tbspots),
+        Route('/tbsummary', tbsummary),
+        Route('/tbspots/stream', tbspots_stream),
+        Route('/openings', openings),
+        Route('/openings/stream', openings_stream),
+        Route('/stats', stats),
+        Route('/receivers', receivers_list),
+        Route('/metrics', metrics),
+        Route('/debug/profile', debug_profile),
+        Route('/zones/{name}', zone_asset),
+        # web-ft.py serves static files from the site root (static_url_path='')
+        Mount('/', StaticFiles(directory=os.path.join(BASE_DIR, "static"))),
+    ],
+    middleware=[Middleware(RequestMetrics)],
+    lifespan=lifespan,
+)
+
+# Endpoint -> route path, for the route label of the request metrics
+ROUTE_PATHS = {
+    route.endpoint if isinstance(route, Route) else route.app: route.path if isinstance(route, Route) else "/{path}"
+    for route in app.routes
+}
@@ -0,0 +1,224 @@
+"""
+HamSCI Contesting and DXing Dashboard - Band Opening Detector
+
+Streaming detector that turns the spots a receiver hears into "opening" and
+"closing" events per path (table region x band x mode), so operators are
+alerted when a band opens instead of every client recounting its window.
+
+Each path keeps one exponentially decayed counter: a spot decays the count
+to its minute and adds 1 (O(1) per spot), and count x ln 2 / half-life is
+the recent rate in spots per minute. Once a minute has passed, every path's
+rate is compared with its baseline for that hour of the day (UTC), a
+running mean of the path's rate at that hour over the last
+OPENING_BASELINE_DAYS days:
+
+    opening  rate >= max(OPENING_MIN_RATE, OPENING_RATIO x baseline)
+    closing  rate <  max(OPENING_MIN_RATE / 2, baseline)
+
+so a path that is busy every evening does not alert every evening. An hour
+is only judged after WARMUP_MINUTES of history. The spot cache loads its
+whole window on start, so with SPOT_CACHE_MINUTES=1440 every hour is trained
+at once; with the default hour, the other hours train as the day goes by.
+
+The detector is fed by the spot cache (see spot_cache.py) and judges minutes
+by spot time, so it gives the same events however often the cache refreshes.
+
+Configuration (environment / .env):
+    OPENING_HALF_LIFE_MINUTES=10  Half-life of the activity counters
+    OPENING_RATIO=2               Rate vs baseline that counts as an opening
+    OPENING_MIN_RATE=1            Spots per minute below which no path is open
+    OPENING_BASELINE_DAYS=7       Memory of the hour-of-day baselines
+    OPENING_EVENT_LIMIT=500       Recent events kept per receiver
+
+Example:
+    >>> detector = OpeningDetector()
+    >>> detector.add(enrich_spots(docs))
+    >>> detector.events()[-1]
+    {'id': 42, 'type': 'opening', 'region': 'Europe', 'band': '15m', 'mode': 'ft8',
+     'time': '261018 1307', 'rate': 2.4, 'baseline': 0.31}
+
+Project: HamSCI Personal Space Weather Station Dashboard Development
+"""
+
+from collections import deque
+from datetime import timedelta
+import itertools
+import math
+import os
+import threading
+
+from regions import region_from_cq
+
+OPENING_HALF_LIFE_MINUTES = float(os.getenv('OPENING_HALF_LIFE_MINUTES', '10'))
+OPENING_RATIO = float(os.getenv('OPENING_RATIO', '2'))
+OPENING_MIN_RATE = float(os.getenv('OPENING_MIN_RATE', '1'))
+OPENING_BASELINE_DAYS = float(os.getenv('OPENING_BASELINE_DAYS', '7'))
+OPENING_EVENT_LIMIT = int(os.getenv('OPENING_EVENT_LIMIT', '500'))
+
+# Spots reach MongoDB a minute or two after their time, so a minute is only
+# judged by the wall clock once it is this old (see OpeningDetector.advance())
+SETTLE_MINUTES = 2
+
+# Minutes of history an hour-of-day baseline needs before it is used
+WARMUP_MINUTES = 30
+
+# Longest gap (e.g. a receiver outage) judged minute by minute
+MAX_GAP = timedelta(days=1)
+
+MINUTE = timedelta(minutes=1)
+
+# Event ids are unique across receivers, so one cursor covers any selection
+_event_ids = itertools.count(1)
+
+
+def _time(minute):
+    return minute.strftime("%y%m%d %H%M")
+
+
+class OpeningDetector:
+    """
+    Sliding-window activity counters and opening/closing events for one receiver.
+
+    Args:
+        half_life (float): Counter half-life in minutes
+        ratio (float): Rate vs baseline that counts as an opening
+        min_rate (float): Spots per minute below which no path is open
+        baseline_days (float): Memory of the hour-of-day baselines
+        event_limit (int): Recent events kept
+    """
+
+    def __init__(self, half_life=OPENING_HALF_LIFE_MINUTES, ratio=OPENING_RATIO, min_rate=OPENING_MIN_RATE,
+                 baseline_days=OPENING_BASELINE_DAYS, event_limit=OPENING_EVENT_LIMIT):
+        self.decay = math.log(2) / half_life   # per minute
+        self.ratio = ratio
+        self.min_rate = min_rate
+        self.baseline_samples = baseline_days * 60
+
+        self._counters = {}    # path -> [decayed count, minute of the last spot]
+        self._baselines = {}   # path -> 24 x [mean rate, samples], by UTC hour
+        self._open = {}        # path -> {"since", "rate", "baseline"}
+        self._events = deque(maxlen=event_limit)
+        self._clock = None     # first minute not judged yet
+        self._lock = threading.Lock()
+
+    def add(self, spots):
+        """
+        Count new spots, judging the minutes they move past.
+
+        Args:
+            spots (iterable[dict]): Enriched spots (see spot_enrich.py) in
+                arrival order; spots without a minute are skipped
+        """
+        with self._lock:
+            for spot in spots:
+                minute = spot.get("minute")
+                if minute is None:
+                    continue
+                self._advance(minute)
+                # a spot for a minute already judged counts towards the current one
+                minute = max(minute, self._clock)
+                tx = spot["tx"]
+                path = (region_from_cq(tx.cq_zone if tx else None), spot["band_name"], spot.get("mode"))
+                counter = self._counters.get(path)
+                if counter is None:
+                    self._counters[path] = [1.0, minute]
+                else:
+                    age = (minute - counter[1]).total_seconds() / 60
+                    counter[0] = counter[0] * math.exp(-self.decay * age) + 1
+                    counter[1] = minute
+
+    def advance(self, now):
+        """
+        Judge the minutes that have settled by wall-clock time, so paths
+        close even if the receiver stops hearing anything.
+
+        Args:
+            now (datetime): Current naive UTC time
+        """
+        with self._lock:
+            if self._clock is not None:
+                self._advance(now - SETTLE_MINUTES * MINUTE)
+
+    def _advance(self, until):
+        if self._clock is None:
+            self._clock = until.replace(second=0, microsecond=0)
+            return
+        if until - self._clock > MAX_GAP:
+            self._clock = until.replace(second=0, microsecond=0) - MAX_GAP
+        while self._clock + MINUTE <= until:
+            self._judge(self._clock)
+            self._clock += MINUTE
+
+    def _judge(self, minute):
+        end = minute + MINUTE
+        hour = minute.hour
+        for path, (count, updated) in self._counters.items():
+            age = (end - updated).total_seconds() / 60
+            rate = count * math.exp(-self.decay * age) * self.decay
+            hours = self._baselines.get(path)
+            if hours is None:
+                hours = self._baselines[path] = [[0.0, 0] for _ in range(24)]
+            baseline, samples = hours[hour]
+            if samples >= WARMUP_MINUTES:
+                self._check(path, minute, rate, baseline)
+            samples += 1
+            hours[hour] = [baseline + (rate - baseline) / min(samples, self.baseline_samples), samples]
+
+    def _check(self, path, minute, rate, baseline):
+        state = self._open.get(path)
+        if state is None:
+            if rate >= max(self.min_rate, self.ratio * baseline):
+                self._open[path] = {"since": _time(minute), "rate": rate, "baseline": baseline}
+                self._emit("opening", path, minute, rate, baseline)
+        elif rate < max(self.min_rate / 2, baseline):
+            del self._open[path]
+            self._emit("closing", path, minute, rate, baseline)
+        else:
+            state["rate"], state["baseline"] = rate, baseline
+
+    def _emit(self, kind, path, minute, rate, baseline):
+        region, band, mode = path
+        self._events.append({
+            "id": next(_event_ids),
+            "type": kind,
+            "region": region,
+            "band": band,
+            "mode": mode,
+            "time": _time(minute),
+            "rate": round(rate, 2),
+            "baseline": round(baseline, 2),
+        })
+
+    def events(self, since=0):
+        """
+        Recent opening and closing events.
+
+        Args:
+            since (int): Only return events with a larger id
+
+        Returns:
+            list[dict]: Events, oldest first, containing:
+                - id: Event id (increasing, unique across receivers)
+                - type: "opening" or "closing"
+                - region, band, mode: The path (region as in regions.py)
+                - time: Minute judged ("YYMMDD HHMM")
+                - rate: Spots per minute (decayed)
+                - baseline: Usual rate at this hour of day
+        """
+        with self._lock:
+            return [event for event in self._events if event["id"] > since]
+
+    def open_paths(self):
+        """
+        Paths open now.
+
+        Returns:
+            list[dict]: One record per open path with region, band, mode,
+            since ("YYMMDD HHMM" of its opening event), rate and baseline
+        """
+        with self._lock:
+            return [
+                {"region": region, "band": band, "mode": mode, "since": state["since"],
+                 "rate": round(state["rate"], 2), "baseline": round(state["baseline"], 2)}
+                for (region, band, mode), state in self._open.items()
+            ]
@@ -0,0 +1,165 @@
+"""
+HamSCI Contesting and DXing Dashboard - Amateur Radio Band Plan
+
+Frequency edges for the amateur bands shown on the dashboard, plus helpers to
+classify a frequency (one at a time or a whole batch with NumPy) and to turn a
+band selection into a MongoDB frequency filter so band filtering can run in
+the database instead of the browser.
+
+Project: HamSCI Personal Space Weather Station Dashboard Development
+"""
+
+import numpy as np
+
+# (band, lower edge MHz inclusive, upper edge MHz exclusive), ordered by frequency
+BAND_PLAN = [
+    # Long wave bands
+    ("2200m", 0.136, 0.137),
+    ("630m", 0.472, 0.479),
+
+    # HF bands (most commonly used for DX and contesting)
+    ("160m", 1.8, 2.0),
+    ("80m", 3.5, 4.0),
+    ("60m", 5.2, 5.5),
+    ("40m", 7.0, 7.3),
+    ("30m", 10.1, 10.15),    # WARC band (no contests)
+    ("20m", 14.0, 14.35),
+    ("17m", 18.068, 18.168),  # WARC band (no contests)
+    ("15m", 21.0, 21.45),
+    ("12m", 24.89, 24.99),    # WARC band (no contests)
+    ("10m", 28.0, 29.7),
+
+    # VHF/UHF bands
+    ("6m", 50.0, 54.0),
+    ("2m", 144.0, 148.0),
+]
+
+BAND_EDGES = {band: (low, high) for band, low, high in BAND_PLAN}
+
+# Column form of BAND_PLAN for frequencies_to_bands(); the extra last name is
+# what out-of-band frequencies map to
+BAND_LOWS = np.array([low for _, low, _ in BAND_PLAN])
+BAND_HIGHS = np.array([high for _, _, high in BAND_PLAN])
+BAND_NAMES = np.array([band for band, _, _ in BAND_PLAN] + ["Unknown"], dtype=object)
+
+# The 6 traditional HF contest bands (selected with band=CBs)
+# Excludes WARC bands (30m, 17m, 12m) where contesting is prohibited
+CONTEST_BANDS = ["160m", "80m", "40m", "20m", "15m", "10m"]
+
+
+def frequency_to_band(freq):
+    """
+    Convert a frequency in MHz to an amateur radio band designation.
+
+    Maps frequencies to standard amateur radio band names based on FCC amateur
+    radio frequency allocations. Used to categorize spots by band for display
+    and filtering purposes.
+
+    Args:
+        freq (float): Frequency in MHz (e.g., 14.097 for 20 meters)
+
+    Returns:
+        str: Band designation (e.g., "20m", "40m") or "Unknown" if not in an amateur band
+
+    Example:
+        >>> frequency_to_band(14.097)
+        '20m'
+        >>> frequency_to_band(7.074)
+        '40m'
+    """
+    if freq is None:
+        return "Unknown"
+    for band, low, high in BAND_PLAN:
+        if low <= freq < high:
+            return band
+    return "Unknown"
+
+
+def frequencies_to_bands(freqs):
+    """
+    Vectorized frequency_to_band() for a batch of frequencies.
+
+    Finds each frequency's candidate band with one searchsorted over the
+    lower band edges, then checks it against the upper edge.
+
+    Args:
+        freqs (list[float]): Frequencies in MHz (None allowed)
+
+    Returns:
+        numpy.ndarray: Object array of band names ("Unknown" if not in a band)
+
+    Example:
+        >>> frequencies_to_bands([14.097, 7.074, None])
+        array(['20m', '40m', 'Unknown'], dtype=object)
+    """
+    f = np.array([np.nan if v is None else v for v in freqs], dtype=float)
+    idx = np.searchsorted(BAND_LOWS, f, side="right") - 1
+    safe = np.clip(idx, 0, len(BAND_PLAN) - 1)
+    inside = (idx >= 0) & (f < BAND_HIGHS[safe])
+    return BAND_NAMES[np.where(inside, safe, len(BAND_PLAN))]
+
+
+def band_query(band):
+    """
+    Build a MongoDB filter on ``frequency`` for a band selection.
+
+    Args:
+        band (str): Band name (e.g. "20m") or "CBs" for all contest bands
+
+    Returns:
+        dict: MongoDB filter, or None if the band is empty or not recognized
+
+    Example:
+        >>> band_query("20m")
+        {'frequency': {'$gte': 14.0, '$lt': 14.35}}
+    """
+    bands = CONTEST_BANDS if band == "CBs" else [band]
+    ranges = [
+        {"frequency": {"$gte": BAND_EDGES[b][0], "$lt": BAND_EDGES[b][1]}}
+        for b in bands if b in BAND_EDGES
+    ]
+    if not ranges:
+        return None
+    return ranges[0] if len(ranges) == 1 else {"$or": ranges}
+
+
+def band_switch(field="$frequency"):
+    """
+    Build a MongoDB aggregation expression that maps a frequency to its band.
+
+    Mirrors frequency_to_band() inside a pipeline so spots can be grouped by
+    band without pulling them out of the database.
+
+    Args:
+        field (str): Field path holding the frequency in MHz
+
+    Returns:
+        dict: ``$switch`` expression evaluating to the band name or "Unknown"
+    """
+    return {"$switch": {
+        "branches": [
+            {"case": {"$and": [{"$gte": [field, low]}, {"$lt": [field, high]}]}, "then": band}
+            for band, low, high in BAND_PLAN
+        ],
+        "default": "Unknown",
+    }}
+
+
+def band_selected(band_name, band):
+    """
+    Check a spot's band against a band selection (the in-memory band_query()).
+
+    Args:
+        band_name (str): Band of the spot, as returned by frequency_to_band()
+        band (str): Band name (e.g. "20m") or "CBs" for all contest bands
+
+    Returns:
+        bool: True if the spot is on the selected band(s)
+
+    Example:
+        >>> band_selected("40m", "CBs")
+        True
+    """
+    if band == "CBs":
+        return band_name in CONTEST_BANDS
+    return band_name == band
@@ -0,0 +1,475 @@
+"""
+HamSCI Contesting and DXing Dashboard - Benchmark Suite
+
+Measures the dashboard's query and enrichment paths against a synthetic spot
+collection (synthetic_spots.py), so performance can be checked without a
+live WSPRDaemon database and regressions caught before they reach the
+station. The spots are loaded either into an in-memory mock (mongomock, the
+default) or into a local ``mongod``, then web-ft.py is loaded against them
+and the following are timed:
+
+- frequency_to_band, frequencies_to_bands and get_cq_zone calls per second
+- enrich_spots throughput in spots per second
+- fetch_wspr_spots and fetch_wspr_spots_tb, and the /spots, /tbspots and
+  /tbsummary endpoints (through Flask's test client), for windows from
+  15 minutes to 48 hours: first-request ("cold") time, p50/p95/p99/max
+  latency and peak RSS
+
+Latencies against the mock measure the dashboard plus a slow pure-Python
+database, so the mock defaults to 10 spots per minute; use a local mongod
+(default 50 spots per minute) for numbers comparable to the station. The
+response cache is off unless RESPONSE_CACHE_SECONDS is set, so every request
+does the work; the spot cache keeps its configured size (SPOT_CACHE_MINUTES).
+
+Usage:
+    python bench-ft.py                               # mongomock, 48 h at 10 spots/min
+    python bench-ft.py --mongodb-uri mongodb://localhost:27017
+    python bench-ft.py --spots-per-minute 200 --contest-hours 48
+    python bench-ft.py --band-mix 20m:40,40m:30,15m:30 --mode-mix ft8:1
+    python bench-ft.py --stamped                     # spots as stamped by ingest-ft.py
+    python bench-ft.py --json bench.json             # save the results
+    python bench-ft.py --baseline bench.json         # exit 1 if slower than a saved run
+
+Against a mongod the benchmark replaces the ``spots`` and ``spot_rollups``
+collections of its own database (``--database``, default wspr_bench).
+
+Project: HamSCI Personal Space Weather Station Dashboard Development
+"""
+
+import argparse
+from datetime import datetime, timedelta, timezone
+import importlib.util
+import json
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from startup_report import peak_rss_mb
+from synthetic_spots import BAND_MIX, MODE_MIX, SpotGenerator
+
+BENCH_DATABASE = "wspr_bench"
+
+# Windows timed for every fetcher and endpoint, in minutes
+WINDOWS = (15, 60, 360, 1440, 2880)
+
+ENDPOINTS = ("/spots", "/tbspots", "/tbsummary")
+
+# mongomock reads each document in Python (and copies the remaining results for
+# every cursor step), so a 48-hour window at station rates takes minutes per
+# request; the mock backend defaults to a lighter spot rate
+MOCK_SPOTS_PER_MINUTE = 10
+
+# Spots inserted per insert_many call
+LOAD_BATCH_SIZE = 5000
+
+# Latency/throughput change tolerated by --baseline before a result counts as a regression
+DEFAULT_TOLERANCE = 0.25
+
+
+def parse_mix(text, known):
+    """
+    Parse a ``--band-mix``/``--mode-mix`` value.
+
+    Args:
+        text (str): Comma-separated ``name:weight`` pairs, e.g. "20m:40,40m:30"
+        known (dict): Default mix; its keys are the allowed names
+
+    Returns:
+        dict: Name -> weight
+
+    Raises:
+        argparse.ArgumentTypeError: On unknown names or malformed weights
+
+    Example:
+        >>> parse_mix("20m:40,40m:30", BAND_MIX)
+        {'20m': 40.0, '40m': 30.0}
+    """
+    mix = {}
+    for item in text.split(","):
+        name, _, weight = item.strip().partition(":")
+        if name not in known:
+            raise argparse.ArgumentTypeError(f"unknown name {name!r}; choose from {', '.join(known)}")
+        try:
+            mix[name] = float(weight or 1)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"weight of {name} must be a number") from None
+    return mix
+
+
+def latency_summary(samples):
+    """
+    Summarize request durations.
+
+    Args:
+        samples (list[float]): Durations in seconds
+
+    Returns:
+        dict: p50_ms, p95_ms, p99_ms and max_ms
+    """
+    ms = np.asarray(samples) * 1000
+    p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+    return {"p50_ms": round(p50, 2), "p95_ms": round(p95, 2), "p99_ms": round(p99, 2),
+            "max_ms": round(float(ms.max()), 2)}
+
+
+def timed(call, repeat):
+    """
+    Time a call once cold and then ``repeat`` more times.
+
+    Args:
+        call (callable): Function without arguments
+        repeat (int): Warm repetitions
+
+    Returns:
+        tuple: (cold seconds, list of warm durations in seconds, result of the first call)
+    """
+    start = time.perf_counter()
+    result = call()
+    cold = time.perf_counter() - start
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        call()
+        samples.append(time.perf_counter() - start)
+    return cold, samples, result
+
+
+def throughput(call, items, min_seconds=0.5):
+    """
+    Measure how many items per second a call processes.
+
+    Args:
+        call (callable): Processes all ``items`` once per call
+        items (int): Items handled per call
+        min_seconds (float): Keep calling for at least this long
+
+    Returns:
+        float: Items per second
+    """
+    calls = 0
+    start = time.perf_counter()
+    while True:
+        call()
+        calls += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_seconds:
+            return items * calls / elapsed
+
+
+def configure_backend(args):
+    """
+    Point the dashboard at the benchmark database before it is imported.
+
+    Writes a one-receiver registry for the benchmark database and, without
+    ``--mongodb-uri``, replaces pymongo's client with mongomock's.
+
+    Args:
+        args (argparse.Namespace): Parsed command line
+
+    Returns:
+        str: Path of the temporary receiver registry
+    """
+    if args.mongodb_uri is None:
+        try:
+            import mongomock
+        except ImportError:
+            sys.exit("The in-memory backend needs mongomock (pip install mongomock), "
+                     "or pass --mongodb-uri for a local mongod")
+        import pymongo
+        pymongo.MongoClient = mongomock.MongoClient
+
+    receiver = {
+        "id": "bench", "callsign": args.rx_callsign, "locator": args.rx_locator,
+        "mongodb_uri": args.mongodb_uri or "mongodb://localhost:27017",
+        "database": args.database,
+    }
+    registry = tempfile.NamedTemporaryFile("w", suffix=".json", delete=False)
+    with registry:
+        json.dump({"receivers": [receiver]}, registry)
+    os.environ["RECEIVERS_FILE"] = registry.name
+    os.environ.setdefault("RESPONSE_CACHE_SECONDS", "0")
+    if args.stamped:
+        os.environ["SPOT_ENRICHED"] = "1"
+        os.environ["SPOT_ROLLUPS"] = "1"
+    return registry.name
+
+
+def load_dashboard():
+    """Import web-ft.py (its file name is not a valid module name)."""
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "web-ft.py")
+    spec = importlib.util.spec_from_file_location("web_ft", path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules["web_ft"] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def load_spots(dashboard, docs, stamped=False):
+    """
+    Replace the benchmark collection with generated spots.
+
+    Args:
+        dashboard (module): Loaded web-ft.py
+        docs (list[dict]): Generated spot documents, oldest first
+        stamped (bool): Store the fields ingest-ft.py adds and build the
+            per-minute rollups, as on a station running the worker
+
+    Returns:
+        int: Number of spots loaded
+    """
+    from rollups import ensure_rollup_indexes, rebuild_rollups
+    from spot_enrich import ENRICHED_INDEXES, enrich_spots, enrichment_fields
+    from spotdb import SPOT_INDEXES, ensure_indexes
+
+    source = next(iter(dashboard.spot_sources.values()))
+    source.collection.drop()
+    source.rollups.drop()
+    if stamped:
+        for doc, spot in zip(docs, enrich_spots([dict(doc) for doc in docs], dashboard.grid_table)):
+            doc.update(enrichment_fields(spot))
+    for start in range(0, len(docs), LOAD_BATCH_SIZE):
+        # insert_many adds _id to the documents; pass copies so docs stay raw
+        source.collection.insert_many([dict(doc) for doc in docs[start:start + LOAD_BATCH_SIZE]])
+    ensure_indexes(source.collection, indexes=SPOT_INDEXES + (ENRICHED_INDEXES if stamped else []))
+    if stamped:
+        ensure_rollup_indexes(source.rollups)
+        rebuild_rollups(source.collection, source.rollups, empty=True)
+    return len(docs)
+
+
+def bench_helpers(dashboard, docs):
+    """
+    Throughput of the per-spot helpers.
+
+    Args:
+        dashboard (module): Loaded web-ft.py
+        docs (list[dict]): Generated spot documents
+
+    Returns:
+        list[dict]: One result per helper, with ``per_second``
+    """
+    from bands import frequencies_to_bands, frequency_to_band
+    from spot_enrich import enrich_spots
+
+    sample = [{key: value for key, value in doc.items() if key not in ("enriched", "ts")}
+              for doc in docs[:10000]]
+    freqs = [doc["frequency"] for doc in sample]
+    rng = np.random.default_rng(0)
+    points = list(zip(rng.uniform(-80, 80, 2000), rng.uniform(-180, 180, 2000)))
+
+    zone_start = time.perf_counter()
+    dashboard.get_cq_zone(*points[0])
+    zone_load = time.perf_counter() - zone_start
+
+    results = [
+        {"name": "frequency_to_band",
+         "per_second": throughput(lambda: [frequency_to_band(f) for f in freqs], len(freqs))},
+        {"name": "frequencies_to_bands",
+         "per_second": throughput(lambda: frequencies_to_bands(freqs), len(freqs))},
+        {"name": "get_cq_zone",
+         "per_second": throughput(lambda: [dashboard.get_cq_zone(lat, lon) for lat, lon in points], len(points)),
+         "cold_ms": round(zone_load * 1000, 2)},
+        {"name": "enrich_spots",
+         # Fresh copies each call; enrich_spots adds keys to the documents
+         "per_second": throughput(lambda: enrich_spots([dict(doc) for doc in sample], dashboard.grid_table),
+                                  len(sample))},
+    ]
+    for result in results:
+        result["per_second"] = round(result["per_second"])
+    return results
+
+
+def bench_windows(dashboard, windows, repeat, report=None):
+    """
+    Latency of the spot fetchers and endpoints for each window.
+
+    Args:
+        dashboard (module): Loaded web-ft.py
+        windows (list[int]): Windows in minutes
+        repeat (int): Warm requests per fetcher/endpoint and window
+        report (callable): Called with each result as soon as it is measured
+
+    Returns:
+        list[dict]: One result per (name, window) with spots, cold_ms,
+        latency percentiles and peak_rss_mb
+    """
+    client = dashboard.app.test_client()
+    calls = {
+        "fetch_wspr_spots": lambda window: list(dashboard.fetch_wspr_spots(lastInterval=window)),
+        "fetch_wspr_spots_tb": lambda window: list(dashboard.fetch_wspr_spots_tb(lastInterval=window)),
+    }
+    for endpoint in ENDPOINTS:
+        calls[endpoint] = lambda window, endpoint=endpoint: client.get(f"{endpoint}?lastInterval={window}").get_data()
+
+    results = []
+    for window in windows:
+        for name, call in calls.items():
+            cold, samples, first = timed(lambda: call(window), repeat)
+            if name == "/tbsummary":
+                spots = json.loads(first)["total"]
+            elif name.startswith("/"):
+                spots = len(json.loads(first))
+            else:
+                spots = len(first)
+            result = {"name": name, "window": window, "spots": spots, "cold_ms": round(cold * 1000, 2),
+                      **latency_summary(samples), "peak_rss_mb": round(peak_rss_mb() or 0)}
+            results.append(result)
+            if report:
+                report(result)
+    return results
+
+
+def result_key(result):
+    """Identity of a result across runs: (name, window or None)."""
+    return (result["name"], result.get("window"))
+
+
+def find_regressions(results, baseline, tolerance):
+    """
+    Compare results with a saved run.
+
+    Args:
+        results (dict): This run (see main())
+        baseline (dict): A run saved with ``--json``
+        tolerance (float): Allowed relative slowdown, e.g. 0.25
+
+    Returns:
+        list[str]: One line per helper that got slower in throughput or
+        fetcher/endpoint that got slower in p50 latency
+    """
+    previous = {result_key(result): result for result in baseline.get("helpers", []) + baseline.get("windows", [])}
+    regressions = []
+    for result in results["helpers"]:
+        old = previous.get(result_key(result))
+        if old and result["per_second"] < old["per_second"] * (1 - tolerance):
+            regressions.append(f"{result['name']}: {result['per_second']:,}/s, was {old['per_second']:,}/s")
+    for result in results["windows"]:
+        old = previous.get(result_key(result))
+        if old and result["p50_ms"] > old["p50_ms"] * (1 + tolerance):
+            regressions.append(f"{result['name']} {result['window']} min: p50 {result['p50_ms']} ms, "
+                               f"was {old['p50_ms']} ms")
+    return regressions
+
+
+WINDOW_HEADER = (f"{'':<22}{'window':>7}{'spots':>9}{'cold':>10}{'p50':>10}{'p95':>10}{'p99':>10}"
+                 f"{'max':>10}{'peak RSS':>10}   (times in ms)")
+
+
+def format_run(run):
+    """One-line description of the generated data set."""
+    return (f"{run['spots']:,} spots over {run['hours']:g} h ({run['spots_per_minute']:g}/min, "
+            f"contest {run['contest_hours']:g} h, {run['backend']}"
+            f"{', stamped' if run['stamped'] else ''}): generated in {run['generate_s']:.1f} s, "
+            f"loaded in {run['load_s']:.1f} s")
+
+
+def format_result(result):
+    """Table row of a helper (calls per second) or fetcher/endpoint (latency) result."""
+    if "per_second" in result:
+        cold = f"  (first call {result['cold_ms']:.1f} ms)" if "cold_ms" in result else ""
+        return f"{result['name']:<22}{result['per_second']:>14,} /s{cold}"
+    return (f"{result['name']:<22}{result['window']:>7}{result['spots']:>9,}"
+            + "".join(f"{result[key]:>10.1f}" for key in ("cold_ms", "p50_ms", "p95_ms", "p99_ms", "max_ms"))
+            + f"{result['peak_rss_mb']:>7} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the dashboard against synthetic spots")
+    parser.add_argument("--mongodb-uri", default=None,
+                        help="Local mongod to load the spots into (default: in-memory mongomock)")
+    parser.add_argument("--database", default=BENCH_DATABASE,
+                        help="Database replaced with the synthetic spots (default: %(default)s)")
+    parser.add_argument("--spots-per-minute", type=float, default=None,
+                        help="Average spot rate (default: 50, or 10 with the in-memory mock)")
+    parser.add_argument("--hours", type=float, default=48, help="Spot history to generate (default: %(default)s)")
+    parser.add_argument("--stations", type=int, default=2000, help="Transmitting stations (default: %(default)s)")
+    parser.add_argument("--band-mix", type=lambda text: parse_mix(text, BAND_MIX), default=None,
+                        help="Band weights, e.g. 20m:40,40m:30 (default: a typical HF mix)")
+    parser.add_argument("--mode-mix", type=lambda text: parse_mix(text, MODE_MIX), default=None,
+                        help="Mode weights, e.g. ft8:70,ft4:10,wspr:20")
+    parser.add_argument("--contest-hours", type=float, default=0,
+                        help="Run the most recent N hours at contest rates (default: %(default)s)")
+    parser.add_argument("--contest-factor", type=float, default=4.0,
+                        help="Spot rate multiplier during the contest (default: %(default)s)")
+    parser.add_argument("--windows", type=lambda text: [int(w) for w in text.split(",")], default=list(WINDOWS),
+                        help="lastInterval windows in minutes (default: 15,60,360,1440,2880)")
+    parser.add_argument("--repeat", type=int, default=10, help="Warm requests per window (default: %(default)s)")
+    parser.add_argument("--stamped", action="store_true",
+                        help="Load spots as stamped by ingest-ft.py, with rollups, and set "
+                             "SPOT_ENRICHED=1 SPOT_ROLLUPS=1")
+    parser.add_argument("--rx-callsign", default="KD3ALD")
+    parser.add_argument("--rx-locator", default="FN21ni")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", default=None, help="Write the results to this file")
+    parser.add_argument("--baseline", default=None, help="Results of an earlier run (--json) to compare with")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="Relative slowdown counted as a regression (default: %(default)s)")
+    args = parser.parse_args()
+    if args.spots_per_minute is None:
+        args.spots_per_minute = 50 if args.mongodb_uri else MOCK_SPOTS_PER_MINUTE
+
+    from spotdb import MONGODB_DATABASE
+    if args.mongodb_uri and args.database == MONGODB_DATABASE:
+        parser.error(f"refusing to replace the dashboard database {MONGODB_DATABASE}; pick another --database")
+
+    registry = configure_backend(args)
+    try:
+        dashboard = load_dashboard()
+
+        end = datetime.now(timezone.utc).replace(tzinfo=None, second=0, microsecond=0)
+        contests = []
+        if args.contest_hours > 0:
+            contests.append((end - timedelta(hours=args.contest_hours), end + timedelta(minutes=1)))
+        generator = SpotGenerator(args.spots_per_minute, args.band_mix, args.mode_mix, args.stations,
+                                  contests, args.contest_factor, args.rx_callsign, args.seed)
+        start = time.perf_counter()
+        docs = list(generator.spots(round(args.hours * 60), end=end))
+        generated = time.perf_counter() - start
+        start = time.perf_counter()
+        load_spots(dashboard, docs, stamped=args.stamped)
+        loaded = time.perf_counter() - start
+
+        results = {"run": {
+            "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "backend": "mongod" if args.mongodb_uri else "mongomock",
+            "spots": len(docs), "hours": args.hours, "spots_per_minute": args.spots_per_minute,
+            "contest_hours": args.contest_hours, "stamped": args.stamped, "seed": args.seed,
+            "generate_s": round(generated, 2), "load_s": round(loaded, 2),
+        }}
+        print(format_run(results["run"]), end="\n\n")
+        results["helpers"] = bench_helpers(dashboard, docs)
+        for result in results["helpers"]:
+            print(format_result(result))
+        print()
+        print(WINDOW_HEADER)
+        results["windows"] = bench_windows(dashboard, args.windows, args.repeat,
+                                           report=lambda result: print(format_result(result), flush=True))
+    finally:
+        os.remove(registry)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=1)
+        print(f"Wrote {args.json}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        changed = [key for key in ("backend", "hours", "spots_per_minute", "contest_hours", "stamped", "seed")
+                   if baseline.get("run", {}).get(key) != results["run"][key]]
+        if changed:
+            print(f"\nWarning: the baseline was run with different {', '.join(changed)}")
+        regressions = find_regressions(results, baseline, args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) beyond {args.tolerance:.0%}:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print(f"\nNo regressions beyond {args.tolerance:.0%} against {args.baseline}")
+
+
+if __name__ == '__main__':
+    main()
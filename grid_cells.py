@@ -0,0 +1,183 @@
+"""
+HamSCI Contesting and DXing Dashboard - Maidenhead Cell Binning
+
+Bins transmitters into Maidenhead cells for zoomed-out map views. At world
+zoom a busy FT8 window is thousands of overlapping markers; binned, it is a
+few hundred fields or squares, each carrying its decode count per band and
+best SNR, which the map draws as a heatmap.
+
+A cell is a locator prefix, so binning needs no coordinates:
+
+    field   2 characters, 20 deg x 10 deg (e.g. "FN")
+    square  4 characters,  2 deg x  1 deg (e.g. "FN21")
+
+The same prefix can be taken inside MongoDB ($substrCP), so windows that
+are not in the spot cache are binned by an aggregation (cell_pipeline())
+that returns one row per cell and band instead of every decode.
+
+Example:
+    >>> cell_of("fn21ni", "square")
+    'FN21'
+    >>> cell_bounds("FN21")
+    [[41.0, -76.0], [42.0, -74.0]]
+
+Project: HamSCI Personal Space Weather Station Dashboard Development
+"""
+
+from bands import band_switch
+
+# Locator characters per cell precision
+CELL_PRECISIONS = {"field": 2, "square": 4}
+
+# Locators the grid table can place: a field, optionally followed by a
+# square, subsquare and extended square
+LOCATOR_PATTERN = "^[A-Ra-r]{2}([0-9]{2}([A-Xa-x]{2}([0-9]{2})?)?)?$"
+
+
+def cell_of(grid, precision="square"):
+    """
+    Maidenhead cell of a locator.
+
+    Args:
+        grid (str): Valid locator (4, 6 or 8 characters, any case)
+        precision (str): "field" or "square" (see CELL_PRECISIONS)
+
+    Returns:
+        str: Upper-case cell, e.g. "FN" or "FN21"
+    """
+    return grid[:CELL_PRECISIONS[precision]].upper()
+
+
+def cell_pipeline(query, precision="square"):
+    """
+    Aggregation that bins a receiver's decodes into cells inside MongoDB.
+
+    Args:
+        query (dict): Spot filter (see web-ft.py spot_query())
+        precision (str): "field" or "square"
+
+    Returns:
+        list[dict]: Pipeline yielding one row per cell and band (see
+        CellAggregator.add_groups())
+    """
+    return [
+        {"$match": {"$and": [query, {"grid": {"$regex": LOCATOR_PATTERN}}]}},
+        {"$group": {
+            "_id": {
+                "cell": {"$toUpper": {"$substrCP": ["$grid", 0, CELL_PRECISIONS[precision]]}},
+                "band": band_switch("$frequency"),
+            },
+            "count": {"$sum": 1},
+            "best_snr": {"$max": "$snr"},
+            "stations": {"$addToSet": "$callsign"},
+            "last_seen": {"$max": {"$concat": ["$date", " ", "$time"]}},
+        }},
+    ]
+
+
+def cell_bounds(cell):
+    """
+    South-west and north-east corners of a cell.
+
+    Args:
+        cell (str): Field ("FN") or square ("FN21")
+
+    Returns:
+        list: [[south, west], [north, east]] in decimal degrees (Leaflet bounds)
+    """
+    west = (ord(cell[0]) - ord("A")) * 20 - 180
+    south = (ord(cell[1]) - ord("A")) * 10 - 90
+    width, height = 20, 10
+    if len(cell) >= 4:
+        west += int(cell[2]) * 2
+        south += int(cell[3])
+        width, height = 2, 1
+    return [[float(south), float(west)], [float(south + height), float(west + width)]]
+
+
+class CellAggregator:
+    """
+    Running binning of transmitter decodes into Maidenhead cells.
+
+    Args:
+        precision (str): "field" or "square"
+    """
+
+    def __init__(self, precision="square"):
+        self.precision = precision
+        self._cells = {}
+
+    def __len__(self):
+        return len(self._cells)
+
+    def _cell(self, key):
+        cell = self._cells.get(key)
+        if cell is None:
+            self._cells[key] = cell = {"cell": key, "count": 0, "bands": {}, "best_snr": None,
+                                       "stations": set(), "last_seen": None}
+        return cell
+
+    def add(self, spots):
+        """
+        Add decodes to their cells.
+
+        Args:
+            spots (iterable[dict]): Spots with ``grid`` (None for an invalid
+                locator, which is skipped), ``tx_sign``, ``band``, ``snr`` and
+                ``time``, oldest first (see web-ft.py cell_spot())
+        """
+        for spot in spots:
+            grid = spot.get("grid")
+            if not grid:
+                continue
+            cell = self._cell(cell_of(grid, self.precision))
+            cell["count"] += 1
+            band = spot.get("band") or "unknown"
+            cell["bands"][band] = cell["bands"].get(band, 0) + 1
+            snr = spot.get("snr")
+            if snr is not None and (cell["best_snr"] is None or snr > cell["best_snr"]):
+                cell["best_snr"] = snr
+            cell["stations"].add(spot.get("tx_sign"))
+            cell["last_seen"] = spot["time"]
+
+    def add_groups(self, rows):
+        """
+        Add the per-cell, per-band rows of a cell_pipeline() aggregation.
+
+        Args:
+            rows (iterable[dict]): Aggregation rows, in any order
+        """
+        for row in rows:
+            cell = self._cell(row["_id"]["cell"])
+            cell["count"] += row["count"]
+            band = row["_id"]["band"]
+            cell["bands"][band] = cell["bands"].get(band, 0) + row["count"]
+            snr = row.get("best_snr")
+            if snr is not None and (cell["best_snr"] is None or snr > cell["best_snr"]):
+                cell["best_snr"] = snr
+            cell["stations"].update(row["stations"])
+            last_seen = row.get("last_seen")
+            if last_seen is not None and (cell["last_seen"] is None or last_seen > cell["last_seen"]):
+                cell["last_seen"] = last_seen
+
+    def records(self):
+        """
+        Current cells.
+
+        Returns:
+            list[dict]: One record per cell, busiest first, containing:
+                - cell: Locator prefix ("FN" or "FN21")
+                - bounds: [[south, west], [north, east]]
+                - count: Decodes
+                - stations: Distinct transmitters
+                - bands: Band -> decodes
+                - best_snr: Highest SNR in dB (None if no decode had one)
+                - last_seen: Latest decode ("YYMMDD HHMM")
+        """
+        records = [
+            {**cell, "bounds": cell_bounds(cell["cell"]), "stations": len(cell["stations"])}
+            for cell in self._cells.values()
+        ]
+        records.sort(key=lambda cell: (-cell["count"], cell["cell"]))
+        return records
+
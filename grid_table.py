@@ -0,0 +1,404 @@
+"""
+HamSCI Contesting and DXing Dashboard - Maidenhead Grid Lookup Table
+
+Precomputed table mapping Maidenhead locators to coordinates, CQ zone, ITU zone,
+country and continent. Spots only ever carry a locator, so classifying each of
+the 32,400 4-character squares once replaces the per-spot grid conversion and
+point-in-polygon work with a table lookup.
+
+The table is built from the bundled GeoJSON files (via zones.ZoneLookup), saved
+as a packed NumPy record array and memory-mapped on startup. Squares that lie
+entirely inside a single zone of every layer answer their 6-character
+subsquares directly; subsquares of squares that straddle a boundary are
+classified lazily the first time they are seen and memoized. The memo holds
+at most GRID_CACHE_SIZE locators; the least recently used are dropped first,
+so stray locators cannot grow it without bound. It is shared by all request
+threads and guarded by a lock.
+
+Configuration (environment / .env):
+    GRID_CACHE_SIZE=100000      Locators memoized by lookup() and lookup_many()
+
+Usage:
+    python grid_table.py            # (re)build the on-disk table
+
+Project: HamSCI Personal Space Weather Station Dashboard Development
+"""
+
+from collections import OrderedDict, namedtuple
+import json
+import os
+import threading
+
+import maidenhead
+import numpy as np
+import shapely
+
+from zones import GEOJSON_DIR, ZONE_LAYERS, ZoneLookup, geojson_signature, shared_zone_lookup
+
+# Default location of the generated table (not committed; rebuilt when missing)
+GRID_TABLE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+GRID_TABLE_PATH = os.path.join(GRID_TABLE_DIR, "grid_table.npy")
+
+# Most locators memoized per table (a GridInfo and its key take about 200 bytes)
+GRID_CACHE_SIZE = int(os.getenv('GRID_CACHE_SIZE', '100000'))
+
+# Bump when the on-disk layout changes so stale tables are rebuilt
+GRID_TABLE_VERSION = 1
+
+# 18 fields x 10 squares in each direction
+SQUARES_PER_AXIS = 180
+
+# One record per 4-character square. Zone numbers use 0 and name indexes use -1
+# for "outside every polygon". The uniform mask has one bit per layer that is set
+# when the whole square falls inside a single polygon (or none) of that layer.
+GRID_DTYPE = np.dtype([
+    ("cq_zone", np.uint8),
+    ("itu_zone", np.uint8),
+    ("country", np.int16),
+    ("continent", np.int8),
+    ("uniform", np.uint8),
+])
+
+LAYER_BITS = {name: 1 << i for i, name in enumerate(ZONE_LAYERS)}
+ALL_UNIFORM = sum(LAYER_BITS.values())
+
+GridInfo = namedtuple("GridInfo", ["lat", "lon", "cq_zone", "itu_zone", "country", "continent"])
+
+
+def square_index(grid):
+    """
+    Compute the table row for the 4-character square of a locator.
+
+    Args:
+        grid (str): Maidenhead locator (4 or more characters, any case)
+
+    Returns:
+        int: Row index into the grid table, or None if the locator is malformed
+
+    Example:
+        >>> square_index("FN21ni")
+        9491
+    """
+    if not grid or len(grid) < 4:
+        return None
+    field_lon = ord(grid[0].upper()) - ord("A")
+    field_lat = ord(grid[1].upper()) - ord("A")
+    if not (0 <= field_lon < 18 and 0 <= field_lat < 18):
+        return None
+    if not (grid[2].isdigit() and grid[3].isdigit()):
+        return None
+    lon_idx = field_lon * 10 + int(grid[2])
+    lat_idx = field_lat * 10 + int(grid[3])
+    return lon_idx * SQUARES_PER_AXIS + lat_idx
+
+
+def decode_locators(grids):
+    """
+    Vectorized maidenhead.to_location for 4- and 6-character locators.
+
+    Uses the same integer arithmetic as the maidenhead package so results
+    are bit-identical. Locators that are not plain 4/6-character strings with
+    fields A-R, digits and subsquares A-X are flagged as not decoded and left
+    to maidenhead.to_location.
+
+    Args:
+        grids (list[str]): Maidenhead locators (any case)
+
+    Returns:
+        tuple: (lat, lon, row, decoded) arrays, where row is the square_index()
+        of each locator and decoded marks the entries that were handled
+    """
+    lengths = np.array([len(g) if isinstance(g, str) else 0 for g in grids])
+    text = np.array([g.upper() if isinstance(g, str) and len(g) <= 6 else "" for g in grids], dtype="U6")
+    codes = text.view(np.uint32).reshape(len(grids), 6).astype(np.int64)
+
+    field = codes[:, 0:2] - ord("A")
+    digit = codes[:, 2:4] - ord("0")
+    sub = codes[:, 4:6] - ord("A")
+    six = lengths == 6
+    decoded = (
+        ((lengths == 4) | six)
+        & np.all((field >= 0) & (field < 18), axis=1)
+        & np.all((digit >= 0) & (digit <= 9), axis=1)
+        & (~six | np.all((sub >= 0) & (sub < 24), axis=1))
+    )
+
+    # Same rational form as maidenhead.to_location_rect: nom / den
+    square = field * 10 + digit
+    nom = np.where(six[:, None], square * 24 + sub, square)
+    den = np.where(six, 240, 10)[:, None]
+    lon = (20 * (nom[:, 0:1] - 9 * den)) / den
+    lat = (10 * (nom[:, 1:2] - 9 * den)) / den
+    row = square[:, 0] * SQUARES_PER_AXIS + square[:, 1]
+    return lat[:, 0], lon[:, 0], row, decoded
+
+
+class GridTable:
+    """
+    Locator -> GridInfo lookup backed by the precomputed square table.
+
+    Args:
+        records (numpy.ndarray): GRID_DTYPE array with one row per 4-char square
+        countries (list[str]): Country names referenced by ``records["country"]``
+        continents (list[str]): Continent names referenced by ``records["continent"]``
+        zone_lookup (ZoneLookup): Used to classify boundary subsquares on demand.
+            The shared compact engine (zones.shared_zone_lookup()) is loaded
+            the first time it is needed if not given.
+        cache_size (int): Most locators memoized; the least recently used are dropped first
+    """
+
+    def __init__(self, records, countries, continents, zone_lookup=None, cache_size=GRID_CACHE_SIZE):
+        self.records = records
+        self.countries = countries
+        self.continents = continents
+        self.zone_lookup = zone_lookup
+        self.cache_size = cache_size
+        self._cache = OrderedDict()  # locator -> GridInfo, least recently used first
+        self._lock = threading.Lock()
+
+    @classmethod
+    def build(cls, zone_lookup):
+        """
+        Classify every 4-character square against every zone layer.
+
+        Each square is classified at its south-west corner (the point
+        maidenhead.to_location returns for a 4-character locator) and checked
+        for being uniform: fully inside one polygon, or touching none.
+
+        Args:
+            zone_lookup (ZoneLookup): Zone engine with all layers loaded
+
+        Returns:
+            GridTable: Newly built table
+        """
+        lon_idx, lat_idx = np.divmod(np.arange(SQUARES_PER_AXIS ** 2), SQUARES_PER_AXIS)
+        west = lon_idx * 2.0 - 180
+        south = lat_idx * 1.0 - 90
+        boxes = shapely.box(west, south, west + 2.0, south + 1.0)
+
+        corners = zone_lookup.lookup_many(south, west)
+        records = np.zeros(len(boxes), dtype=GRID_DTYPE)
+        names = {}
+
+        for name, index in zone_lookup.layers.items():
+            values = corners[name]
+            if name in ("cq_zone", "itu_zone"):
+                records[name] = [v or 0 for v in values]
+            else:
+                names[name] = sorted({v for v in values if v is not None})
+                codes = {v: i for i, v in enumerate(names[name])}
+                records[name] = [codes.get(v, -1) for v in values]
+
+            # A square is uniform if no polygon touches it, or exactly one does
+            # and that polygon contains the whole square in its interior
+            box_idx, zone_idx = index.tree.query(boxes, predicate="intersects")
+            hits = np.bincount(box_idx, minlength=len(boxes))
+            single = hits[box_idx] == 1
+            inside = np.zeros(len(boxes), dtype=bool)
+            inside[box_idx[single]] = shapely.contains_properly(
+                index.geometries[zone_idx[single]], boxes[box_idx[single]]
+            )
+            uniform = (hits == 0) | inside
+            records["uniform"] |= np.where(uniform, LAYER_BITS[name], 0).astype(np.uint8)
+
+        return cls(records, names.get("country", []), names.get("continent", []), zone_lookup)
+
+    def save(self, path=GRID_TABLE_PATH, geojson_dir=GEOJSON_DIR):
+        """
+        Write the table to ``path`` plus a JSON sidecar with the name lists.
+
+        Args:
+            path (str): Destination .npy file
+            geojson_dir (str): Boundary file directory the table was built from
+        """
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        np.save(path, self.records)
+        meta = {
+            "version": GRID_TABLE_VERSION,
+            "sources": geojson_signature(geojson_dir),
+            "countries": self.countries,
+            "continents": self.continents,
+        }
+        with open(os.path.splitext(path)[0] + ".json", "w") as f:
+            json.dump(meta, f)
+
+    @classmethod
+    def load(cls, path=GRID_TABLE_PATH, geojson_dir=GEOJSON_DIR, zone_lookup=None):
+        """
+        Memory-map a previously saved table.
+
+        Args:
+            path (str): .npy file written by save()
+            geojson_dir (str): Boundary file directory to validate against
+            zone_lookup (ZoneLookup): Optional engine for boundary subsquares
+
+        Returns:
+            GridTable: Loaded table, or None if missing or stale
+        """
+        meta_path = os.path.splitext(path)[0] + ".json"
+        try:
+            with open(meta_path) as f:
+                meta = json.load(f)
+            records = np.load(path, mmap_mode="r")
+        except (OSError, ValueError):
+            return None
+
+        if (meta.get("version") != GRID_TABLE_VERSION
+                or meta.get("sources") != geojson_signature(geojson_dir)
+                or records.dtype != GRID_DTYPE
+                or len(records) != SQUARES_PER_AXIS ** 2):
+            return None
+        return cls(records, meta["countries"], meta["continents"], zone_lookup)
+
+    def lookup(self, grid):
+        """
+        Resolve a locator to coordinates and zone attributes.
+
+        Coordinates are the south-west corner returned by
+        maidenhead.to_location, so results match the original per-spot code.
+
+        Args:
+            grid (str): Maidenhead locator (e.g. "FN21ni")
+
+        Returns:
+            GridInfo: Coordinates and zones, or None if the locator is malformed
+
+        Example:
+            >>> grid_table.lookup("FN21ni").cq_zone
+            5
+        """
+        with self._lock:
+            if grid in self._cache:
+                self._cache.move_to_end(grid)
+                return self._cache[grid]
+        info = self._resolve(grid)
+        with self._lock:
+            self._cache[grid] = info
+            self._trim_cache()
+        return info
+
+    def lookup_many(self, grids):
+        """
+        Resolve a batch of locators, classifying each distinct locator once.
+
+        Locators not seen before are decoded together with decode_locators(),
+        answered from the square table where it is uniform, and the remaining
+        boundary subsquares are classified with one ZoneLookup.lookup_many()
+        call. Results are memoized like lookup(), up to ``cache_size``.
+
+        Args:
+            grids (list[str]): Maidenhead locators, duplicates allowed
+
+        Returns:
+            list[GridInfo]: One entry (or None) per input locator
+        """
+        cache = self._cache
+        found, missing = {}, []
+        with self._lock:
+            for grid in dict.fromkeys(grids):
+                if grid in cache:
+                    cache.move_to_end(grid)
+                    found[grid] = cache[grid]
+                else:
+                    missing.append(grid)
+        if missing:
+            # Other threads may evict entries meanwhile, so answer from found
+            resolved = self._resolve_many(missing)
+            found.update(resolved)
+            with self._lock:
+                cache.update(resolved)
+                self._trim_cache()
+        return [found[g] for g in grids]
+
+    def _trim_cache(self):
+        # Called with _lock held
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def _resolve_many(self, grids):
+        lat, lon, row, decoded = decode_locators(grids)
+        records = self.records[np.where(decoded, row, 0)]
+        short = np.array([len(g) == 4 if isinstance(g, str) else False for g in grids])
+        from_table = decoded & (short | (records["uniform"] == ALL_UNIFORM))
+        boundary = np.flatnonzero(decoded & ~from_table)
+        resolved = {}
+
+        for i in np.flatnonzero(from_table):
+            record = records[i]
+            resolved[grids[i]] = GridInfo(
+                float(lat[i]), float(lon[i]),
+                int(record["cq_zone"]) or None,
+                int(record["itu_zone"]) or None,
+                self.countries[record["country"]] if record["country"] >= 0 else None,
+                self.continents[record["continent"]] if record["continent"] >= 0 else None,
+            )
+
+        if boundary.size:
+            if self.zone_lookup is None:
+                self.zone_lookup = shared_zone_lookup()
+            zones = self.zone_lookup.lookup_many(lat[boundary], lon[boundary])
+            for j, i in enumerate(boundary):
+                resolved[grids[i]] = GridInfo(
+                    float(lat[i]), float(lon[i]), zones["cq_zone"][j], zones["itu_zone"][j],
+                    zones["country"][j], zones["continent"][j],
+                )
+
+        # Anything unusual (field-only, 8-character, malformed) goes the slow way
+        for i in np.flatnonzero(~decoded):
+            resolved[grids[i]] = self._resolve(grids[i])
+        return resolved
+
+    def _resolve(self, grid):
+        try:
+            lat, lon = maidenhead.to_location(grid)
+        except (ValueError, TypeError, AttributeError):
+            return None
+
+        row = square_index(grid)
+        if row is not None:
+            record = self.records[row]
+            if len(grid) == 4 or record["uniform"] == ALL_UNIFORM:
+                return GridInfo(
+                    lat, lon,
+                    int(record["cq_zone"]) or None,
+                    int(record["itu_zone"]) or None,
+                    self.countries[record["country"]] if record["country"] >= 0 else None,
+                    self.continents[record["continent"]] if record["continent"] >= 0 else None,
+                )
+
+        # Field-only locators and subsquares of squares that straddle a zone
+        # boundary: classify the exact point
+        if self.zone_lookup is None:
+            self.zone_lookup = shared_zone_lookup()
+        zones = self.zone_lookup.lookup(lat, lon)
+        return GridInfo(lat, lon, zones["cq_zone"], zones["itu_zone"],
+                        zones["country"], zones["continent"])
+
+
+def load_grid_table(path=GRID_TABLE_PATH, geojson_dir=GEOJSON_DIR, zone_lookup=None):
+    """
+    Load the on-disk grid table, building and saving it first if needed.
+
+    Args:
+        path (str): Location of the .npy table
+        geojson_dir (str): Directory containing the GeoJSON boundary files
+        zone_lookup (ZoneLookup): Zone engine to build from / fall back on
+
+    Returns:
+        GridTable: Ready-to-use table
+    """
+    table = GridTable.load(path, geojson_dir, zone_lookup)
+    if table is None:
+        if zone_lookup is None:
+            zone_lookup = ZoneLookup(geojson_dir)
+        table = GridTable.build(zone_lookup)
+        table.save(path, geojson_dir)
+    return table
+
+
+if __name__ == '__main__':
+    table = GridTable.build(ZoneLookup())
+    table.save()
+    uniform = int(np.count_nonzero(table.records["uniform"] == ALL_UNIFORM))
+    print(f"Wrote {GRID_TABLE_PATH}: {len(table.records)} squares, "
+          f"{uniform} uniform across all layers")
@@ -0,0 +1,189 @@
+"""
+HamSCI Contesting and DXing Dashboard - Spot Enrichment Worker
+
+Background worker that stamps each spot in ``wspr_db.spots`` once with its
+timestamp, transmitter coordinates, CQ/ITU zone, country, continent and band
+(see spot_enrich.py), so the dashboard does not recompute them on every read.
+
+On start it backfills existing spots in bulk batches, then follows new inserts
+through a MongoDB change stream. Change streams need a replica set; on a
+standalone server the worker polls for documents above its _id high-water mark
+instead. The per-minute rollups (rollups.py) are kept current as spots are
+stamped.
+
+Usage:
+    python ingest-ft.py                   # backfill, then follow new inserts
+    python ingest-ft.py --backfill-only   # backfill and exit
+    python ingest-ft.py --poll 5          # poll every 5 s without change streams
+    python ingest-ft.py --receiver w3usr  # stamp another receiver's database
+
+Run one worker per spots collection in the receiver registry (receivers.py);
+receivers that share a collection share its worker.
+
+Once the backfill has finished, set SPOT_ENRICHED=1 for the dashboard so zone
+filters run inside MongoDB.
+
+Project: HamSCI Personal Space Weather Station Dashboard Development
+"""
+
+import argparse
+import time
+
+from pymongo import ASCENDING
+from pymongo.errors import OperationFailure
+
+from grid_table import load_grid_table
+from rollups import ROLLUP_COLLECTION, ensure_rollup_indexes, rebuild_rollups, update_rollups
+from spot_enrich import ENRICHED_INDEXES, SOURCE_PROJECTION, backfill_enrichment, stamp_spots
+from receivers import load_receivers, receiver_collection
+from spotdb import SPOT_INDEXES, SPOT_TTL_DAYS, cursor_batches, ensure_indexes
+
+
+def latest_id(collection):
+    """Largest _id in the collection, or None if it is empty."""
+    last = collection.find_one({}, {"_id": 1}, sort=[("_id", -1)])
+    return last["_id"] if last else None
+
+
+def stamp_and_roll_up(collection, rollups, docs, grid_table):
+    """
+    Stamp a batch of new spots and refresh the rollups of their minutes.
+
+    Args:
+        collection (pymongo.collection.Collection): The spots collection
+        rollups (pymongo.collection.Collection): The rollup collection
+        docs (list[dict]): Raw spot documents
+        grid_table (GridTable): Locator lookup table
+
+    Returns:
+        int: Number of spots updated
+    """
+    updated = stamp_spots(collection, docs, grid_table)
+    update_rollups(collection, rollups, {doc["minute"] for doc in docs})
+    return updated
+
+
+def stamp_since(collection, rollups, grid_table, high_water, batch_size=1000):
+    """
+    Stamp every spot inserted after a high-water mark.
+
+    Args:
+        collection (pymongo.collection.Collection): The spots collection
+        rollups (pymongo.collection.Collection): The rollup collection
+        grid_table (GridTable): Locator lookup table
+        high_water (ObjectId): Largest _id already handled, or None for all
+        batch_size (int): Maximum documents per bulk write
+
+    Returns:
+        tuple: (number of documents updated, new high-water mark)
+    """
+    query = {"_id": {"$gt": high_water}} if high_water else {}
+    cursor = collection.find(query, SOURCE_PROJECTION).sort([("_id", ASCENDING)])
+    updated = 0
+    for docs in cursor_batches(cursor, batch_size):
+        high_water = docs[-1]["_id"]
+        updated += stamp_and_roll_up(collection, rollups, docs, grid_table)
+    return updated, high_water
+
+
+def follow_change_stream(collection, rollups, grid_table, high_water, batch_size=1000):
+    """
+    Stamp spots as they are inserted, using a MongoDB change stream.
+
+    Spots inserted after ``high_water`` but before the stream opened are
+    caught up first. Inserts that arrive together are written back in one
+    bulk write.
+
+    Args:
+        collection (pymongo.collection.Collection): The spots collection
+        rollups (pymongo.collection.Collection): The rollup collection
+        grid_table (GridTable): Locator lookup table
+        high_water (ObjectId): Largest _id handled by the backfill
+        batch_size (int): Maximum documents per bulk write
+
+    Raises:
+        OperationFailure: If the server does not support change streams
+    """
+    pipeline = [{"$match": {"operationType": "insert"}}]
+    with collection.watch(pipeline) as stream:
+        updated, _ = stamp_since(collection, rollups, grid_table, high_water, batch_size)
+        if updated:
+            print(f"Enriched {updated} new spots")
+        while stream.alive:
+            batch = []
+            change = stream.try_next()
+            while change is not None:
+                batch.append(change["fullDocument"])
+                if len(batch) >= batch_size:
+                    break
+                change = stream.try_next()
+            if batch:
+                print(f"Enriched {stamp_and_roll_up(collection, rollups, batch, grid_table)} new spots")
+            else:
+                time.sleep(0.5)
+
+
+def follow_polling(collection, rollups, grid_table, high_water, batch_size=1000, poll=10.0):
+    """
+    Stamp new spots by polling for _id values above a high-water mark.
+
+    Args:
+        collection (pymongo.collection.Collection): The spots collection
+        rollups (pymongo.collection.Collection): The rollup collection
+        grid_table (GridTable): Locator lookup table
+        high_water (ObjectId): Largest _id handled by the backfill
+        batch_size (int): Maximum documents per bulk write
+        poll (float): Seconds between polls
+    """
+    while True:
+        updated, high_water = stamp_since(collection, rollups, grid_table, high_water, batch_size)
+        if updated:
+            print(f"Enriched {updated} new spots")
+        time.sleep(poll)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stamp spots with zones, coordinates and band")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--backfill-only", action="store_true",
+                        help="stamp existing spots and exit")
+    parser.add_argument("--poll", type=float, default=None,
+                        help="poll every N seconds instead of using a change stream")
+    parser.add_argument("--receiver", default=None,
+                        help="receiver id from the registry whose spots to stamp (default: the first)")
+    args = parser.parse_args()
+
+    receivers = load_receivers()
+    if args.receiver:
+        receivers = [receiver for receiver in receivers if receiver.id == args.receiver]
+        if not receivers:
+            parser.error(f"unknown receiver {args.receiver!r}")
+    receiver = receivers[0]
+    collection = receiver_collection(receiver)
+    rollups = collection.database[ROLLUP_COLLECTION]
+    try:
+        ensure_indexes(collection, ttl_days=SPOT_TTL_DAYS, indexes=SPOT_INDEXES + ENRICHED_INDEXES)
+        ensure_rollup_indexes(rollups)
+    except OperationFailure as err:
+        print(f"Could not create indexes: {err}")
+
+    grid_table = load_grid_table()
+    high_water = latest_id(collection)
+    backfilled = backfill_enrichment(collection, grid_table, args.batch_size)
+    print(f"Backfilled {backfilled} spots")
+    if backfilled or rollups.estimated_document_count() == 0:
+        print(f"Rebuilt {rebuild_rollups(collection, rollups, args.batch_size)} rollup rows")
+    if args.backfill_only:
+        return
+
+    if args.poll is None:
+        try:
+            follow_change_stream(collection, rollups, grid_table, high_water, args.batch_size)
+            return
+        except OperationFailure as err:
+            print(f"Change streams unavailable ({err}); polling instead")
+    follow_polling(collection, rollups, grid_table, high_water, args.batch_size, args.poll or 10.0)
+
+
+if __name__ == '__main__':
+    main()
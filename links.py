@@ -0,0 +1,85 @@
+"""
+HamSCI Contesting and DXing Dashboard - TX -> RX Link Aggregation
+
+Collapses repeated decodes of the same path into one record. A WSPR beacon
+heard every 2 minutes for an hour is 30 map spots with the same endpoints;
+as a link it is one record carrying the decode count, first/last time heard
+and the SNR range, so the map draws one path instead of 30.
+
+A link is identified by (tx_sign, rx_sign, band, mode). Position, frequency
+and drift are those of the latest decode.
+
+Example:
+    >>> aggregator = LinkAggregator()
+    >>> aggregator.add(fetch_wspr_spots(lastInterval=60))
+    >>> aggregator.records()[0]
+    {'id': 'W1ABC_KD3ALD_20m_wspr', 'tx_sign': 'W1ABC', ..., 'count': 30,
+     'first_seen': '260107 1330', 'last_seen': '260107 1428',
+     'snr_min': -24, 'snr_max': -11, 'snr_last': -15}
+
+Project: HamSCI Personal Space Weather Station Dashboard Development
+"""
+
+# Fields of the latest decode copied onto its link
+LATEST_FIELDS = ("tx_lat", "tx_lon", "rx_lat", "rx_lon", "frequency", "drift")
+
+
+class LinkAggregator:
+    """
+    Running aggregation of map spots (see web-ft.py map_spot()) into links.
+
+    Spots must be added oldest first, as the spot fetchers return them.
+    """
+
+    def __init__(self):
+        self._links = {}
+
+    def __len__(self):
+        return len(self._links)
+
+    def add(self, spots):
+        """
+        Add decodes to their links.
+
+        Args:
+            spots (iterable[dict]): Map spots, oldest first
+        """
+        links = self._links
+        for spot in spots:
+            key = (spot["tx_sign"], spot["rx_sign"], spot["band"], spot["mode"])
+            snr = spot.get("snr")
+            link = links.get(key)
+            if link is None:
+                links[key] = link = {
+                    "id": "_".join(str(part) for part in key),
+                    "tx_sign": spot["tx_sign"],
+                    "rx_sign": spot["rx_sign"],
+                    "band": spot["band"],
+                    "mode": spot["mode"],
+                    "count": 0,
+                    "first_seen": spot["time"],
+                    "snr_min": snr,
+                    "snr_max": snr,
+                }
+            link["count"] += 1
+            link["last_seen"] = spot["time"]
+            link["snr_last"] = snr
+            for field in LATEST_FIELDS:
+                link[field] = spot.get(field)
+            if snr is not None:
+                if link["snr_min"] is None or snr < link["snr_min"]:
+                    link["snr_min"] = snr
+                if link["snr_max"] is None or snr > link["snr_max"]:
+                    link["snr_max"] = snr
+
+    def records(self):
+        """
+        Current links.
+
+        Returns:
+            list[dict]: One record per link, least recently heard first, with
+            the map spot fields of the latest decode plus count, first_seen,
+            last_seen ("YYMMDD HHMM"), snr_min, snr_max and snr_last
+        """
+        return sorted(self._links.values(), key=lambda link: link["last_seen"])
+
@@ -0,0 +1,410 @@
+"""
+HamSCI Contesting and DXing Dashboard - Request Metrics
+
+Lightweight, dependency-free instrumentation for the spot endpoints, to tell
+where the time goes when the dashboard lags (e.g. during a contest):
+
+- per-stage timing of each request: ``query`` (waiting for the first cursor
+  batch), ``drain`` (later batches), ``enrich`` (grid/zone/band lookups),
+  ``cache`` (spot cache reads and refreshes) and ``serialize`` (JSON or
+  columnar encoding)
+- spot cache and response cache hit/miss counters
+- request latency and spots-per-request histograms per route
+- MongoDB connection pool statistics (a pymongo pool listener)
+
+Everything is exposed in the Prometheus text format on ``/metrics``, and each
+response carries its stage times in a ``Server-Timing`` header (visible in the
+browser's DevTools network panel). For streamed responses the header is sent
+before the body, so it holds the stages done by then; the histograms include
+the rest. Stages of requests covering several receivers are summed over the
+receivers, which are fetched in parallel.
+
+Configuration (environment / .env):
+    METRICS_ENABLED=1    Expose /metrics and send Server-Timing (0 disables both)
+
+Project: HamSCI Personal Space Weather Station Dashboard Development
+"""
+
+from bisect import bisect_left
+from contextlib import contextmanager
+import contextvars
+import os
+import threading
+import time
+
+from pymongo import monitoring
+
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', '1') == '1'
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Histogram bucket upper bounds
+SECONDS_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+SPOTS_BUCKETS = (10, 100, 1000, 5000, 10000, 50000, 100000, 500000)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _label_text(names, values):
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values)) + "}"
+
+
+def _number(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """
+    Monotonic counter with labels.
+
+    Args:
+        name (str): Metric name, e.g. "dashboard_cache_lookups_total"
+        description (str): Help text shown in /metrics
+        labels (tuple[str]): Label names
+
+    Example:
+        >>> lookups = Counter("lookups_total", "Cache lookups", ("result",))
+        >>> lookups.inc(result="hit")
+    """
+
+    kind = "counter"
+
+    def __init__(self, name, description, labels=()):
+        self.name = name
+        self.description = description
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def inc(self, amount=1, **labels):
+        """Add ``amount`` to the series selected by ``labels``."""
+        key = tuple(labels[name] for name in self.labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self):
+        """Yield ``(suffix, label names, label values, value)`` for rendering."""
+        with self._lock:
+            values = dict(self._values)
+        for key, value in sorted(values.items()):
+            yield "", self.labels, key, value
+
+
+class Histogram:
+    """
+    Histogram with fixed buckets and labels.
+
+    Args:
+        name (str): Metric name
+        description (str): Help text shown in /metrics
+        labels (tuple[str]): Label names
+        buckets (tuple[float]): Upper bounds, ascending (+Inf is added)
+    """
+
+    kind = "histogram"
+
+    def __init__(self, name, description, labels=(), buckets=SECONDS_BUCKETS):
+        self.name = name
+        self.description = description
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        self._series = {}   # label values -> [bucket counts..., +Inf count, sum]
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def observe(self, value, **labels):
+        """Record one observation in the series selected by ``labels``."""
+        key = tuple(labels[name] for name in self.labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * (len(self.buckets) + 2)
+            series[index] += 1
+            series[-1] += value
+
+    def samples(self):
+        """Yield ``(suffix, label names, label values, value)`` for rendering."""
+        with self._lock:
+            snapshot = {key: list(series) for key, series in self._series.items()}
+        names = self.labels + ("le",)
+        for key, series in sorted(snapshot.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), series):
+                cumulative += count
+                yield "_bucket", names, key + (_number(bound),), cumulative
+            yield "_sum", self.labels, key, series[-1]
+            yield "_count", self.labels, key, cumulative
+
+
+class Gauge:
+    """
+    Gauge whose series are read from a callback when /metrics is rendered.
+
+    Args:
+        name (str): Metric name
+        description (str): Help text shown in /metrics
+        labels (tuple[str]): Label names
+        read (callable): Returns ``{label values tuple: value}``
+    """
+
+    kind = "gauge"
+
+    def __init__(self, name, description, labels, read):
+        self.name = name
+        self.description = description
+        self.labels = tuple(labels)
+        self.read = read
+        REGISTRY.append(self)
+
+    def samples(self):
+        """Yield ``(suffix, label names, label values, value)`` for rendering."""
+        for key, value in sorted(self.read().items()):
+            if value is not None:
+                yield "", self.labels, key, value
+
+
+REGISTRY = []
+
+
+def render_metrics():
+    """
+    Render every registered metric in the Prometheus text format.
+
+    Returns:
+        str: Exposition text (see PROMETHEUS_CONTENT_TYPE)
+    """
+    lines = []
+    for metric in REGISTRY:
+        lines.append(f"# HELP {metric.name} {metric.description}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        for suffix, names, values, value in metric.samples():
+            lines.append(f"{metric.name}{suffix}{_label_text(names, values)} {_number(value)}")
+    return "\n".join(lines) + "\n"
+
+
+STAGE_SECONDS = Histogram("dashboard_stage_seconds", "Time spent per request stage", ("stage",))
+REQUEST_SECONDS = Histogram("dashboard_request_seconds", "Request handling time, including streaming",
+                            ("route",))
+REQUESTS = Counter("dashboard_requests_total", "Requests answered", ("route", "status"))
+SPOTS_PER_REQUEST = Histogram("dashboard_spots_per_request", "Spots returned per spot list request",
+                              ("route",), buckets=SPOTS_BUCKETS)
+CACHE_LOOKUPS = Counter("dashboard_cache_lookups_total",
+                        "Cache lookups by cache (spot, response) and result (hit, miss, coalesced)",
+                        ("cache", "result"))
+
+
+# Per-request stage timings
+# -------------------------
+
+class StageTimings:
+    """Stage durations and spot count of one request (see start_timings())."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages = {}
+        self.spots = None
+        self._lock = threading.Lock()
+
+    def add(self, stage, seconds):
+        with self._lock:
+            self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+
+    def count_spots(self, count):
+        with self._lock:
+            self.spots = (self.spots or 0) + count
+
+    def server_timing(self):
+        """
+        Format the stages recorded so far as a Server-Timing header value.
+
+        Returns:
+            str: e.g. ``query;dur=12.1, enrich;dur=30.4, total;dur=51.0``
+        """
+        with self._lock:
+            stages = list(self.stages.items())
+        stages.append(("total", time.perf_counter() - self.started))
+        return ", ".join(f"{stage};dur={seconds * 1000:.1f}" for stage, seconds in stages)
+
+
+_timings = contextvars.ContextVar("stage_timings", default=None)
+
+
+def start_timings():
+    """
+    Begin collecting stage timings for the current request.
+
+    Returns:
+        StageTimings: The request's timings (pass it to finish_timings())
+    """
+    timings = StageTimings()
+    _timings.set(timings)
+    return timings
+
+
+def finish_timings(timings, route, status):
+    """
+    Record a finished request and stop collecting its timings.
+
+    Args:
+        timings (StageTimings): Returned by start_timings()
+        route (str): Route pattern, e.g. "/spots"
+        status (int): HTTP status code
+    """
+    _timings.set(None)
+    REQUEST_SECONDS.observe(time.perf_counter() - timings.started, route=route)
+    REQUESTS.inc(route=route, status=str(status))
+    if timings.spots is not None:
+        SPOTS_PER_REQUEST.observe(timings.spots, route=route)
+
+
+def record_stage(stage, seconds):
+    """Add time to a stage of the current request and to the stage histogram."""
+    STAGE_SECONDS.observe(seconds, stage=stage)
+    timings = _timings.get()
+    if timings is not None:
+        timings.add(stage, seconds)
+
+
+def count_spots(count):
+    """Add to the number of spots returned by the current request."""
+    timings = _timings.get()
+    if timings is not None:
+        timings.count_spots(count)
+
+
+@contextmanager
+def stage(name):
+    """
+    Time a block as a request stage.
+
+    Example:
+        >>> with stage("enrich"):
+        ...     spots = enrich_spots(docs, grid_table)
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(name, time.perf_counter() - start)
+
+
+def timed_batches(batches):
+    """
+    Time reading cursor batches: the first as ``query``, the rest as ``drain``.
+
+    Args:
+        batches (iterable[list]): Batches from spotdb.cursor_batches()
+
+    Yields:
+        list: The same batches
+    """
+    batches = iter(batches)
+    name = "query"
+    while True:
+        start = time.perf_counter()
+        batch = next(batches, None)
+        record_stage(name, time.perf_counter() - start)
+        if batch is None:
+            return
+        name = "drain"
+        yield batch
+
+
+async def timed_async_batches(batches):
+    """Async version of timed_batches() for spotdb.async_cursor_batches()."""
+    batches = aiter(batches)
+    name = "query"
+    while True:
+        start = time.perf_counter()
+        batch = await anext(batches, None)
+        record_stage(name, time.perf_counter() - start)
+        if batch is None:
+            return
+        name = "drain"
+        yield batch
+
+
+# MongoDB connection pools
+# ------------------------
+
+class PoolMetrics(monitoring.ConnectionPoolListener):
+    """
+    pymongo connection pool listener keeping per-server pool statistics.
+
+    Pass ``event_listeners=[pool_metrics]`` when creating a MongoClient.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.open = {}       # address -> connections open
+        self.in_use = {}     # address -> connections checked out
+        self.waiting = {}    # address -> check-outs in progress
+        self.wait_seconds = Histogram("mongodb_pool_checkout_seconds",
+                                      "Time to check a connection out of the pool", ("server",))
+        self.failures = Counter("mongodb_pool_checkout_failures_total",
+                                "Failed connection check-outs by reason", ("server", "reason"))
+
+    def _add(self, table, address, amount):
+        server = f"{address[0]}:{address[1]}"
+        with self._lock:
+            table[server] = table.get(server, 0) + amount
+
+    def connection_created(self, event):
+        self._add(self.open, event.address, 1)
+
+    def connection_closed(self, event):
+        self._add(self.open, event.address, -1)
+
+    def connection_check_out_started(self, event):
+        self._add(self.waiting, event.address, 1)
+
+    def connection_check_out_failed(self, event):
+        self._add(self.waiting, event.address, -1)
+        self.failures.inc(server=f"{event.address[0]}:{event.address[1]}", reason=str(event.reason))
+
+    def connection_checked_out(self, event):
+        self._add(self.waiting, event.address, -1)
+        self._add(self.in_use, event.address, 1)
+        duration = getattr(event, "duration", None)  # pymongo 4.7+
+        if duration is not None:
+            self.wait_seconds.observe(duration, server=f"{event.address[0]}:{event.address[1]}")
+
+    def connection_checked_in(self, event):
+        self._add(self.in_use, event.address, -1)
+
+    def connection_ready(self, event):
+        pass
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def snapshot(self, table):
+        """Copy of one of the per-server tables, keyed by ``(server,)`` for a Gauge."""
+        with self._lock:
+            return {(server,): value for server, value in table.items()}
+
+
+pool_metrics = PoolMetrics()
+Gauge("mongodb_pool_connections", "Open connections per MongoDB server", ("server",),
+      lambda: pool_metrics.snapshot(pool_metrics.open))
+Gauge("mongodb_pool_connections_in_use", "Connections checked out per MongoDB server", ("server",),
+      lambda: pool_metrics.snapshot(pool_metrics.in_use))
+Gauge("mongodb_pool_checkouts_waiting", "Requests waiting for a connection per MongoDB server", ("server",),
+      lambda: pool_metrics.snapshot(pool_metrics.waiting))
@@ -0,0 +1,92 @@
+"""
+HamSCI Contesting and DXing Dashboard - Sampling Profiler
+
+In-process sampling profiler for capturing flame graphs from a running
+server under real load, without restarting it under an external profiler.
+While a capture runs, a background thread records the Python stack of every
+other thread every few milliseconds; the result is returned in the "folded"
+format (one ``frame;frame;frame count`` line per distinct stack) read by
+flamegraph.pl, speedscope.app and inferno.
+
+Sampling only touches the interpreter's frame table, so it can be left
+running during a contest; each capture is limited to PROFILE_MAX_SECONDS.
+Because the captured stacks reveal code paths, the ``/debug/profile``
+endpoints only exist with PROFILER_ENABLED=1.
+
+Configuration (environment / .env):
+    PROFILER_ENABLED=0          Enable /debug/profile (off by default)
+    PROFILE_INTERVAL_MS=5       Time between samples
+    PROFILE_MAX_SECONDS=60      Longest capture per request
+
+Example:
+    curl "http://localhost:5000/debug/profile?seconds=30" > spots.folded
+    flamegraph.pl spots.folded > spots.svg
+
+Project: HamSCI Personal Space Weather Station Dashboard Development
+"""
+
+from collections import Counter
+import os
+import sys
+import threading
+import time
+
+PROFILER_ENABLED = os.getenv('PROFILER_ENABLED', '0') == '1'
+PROFILE_INTERVAL_MS = float(os.getenv('PROFILE_INTERVAL_MS', '5'))
+PROFILE_MAX_SECONDS = float(os.getenv('PROFILE_MAX_SECONDS', '60'))
+
+# One capture at a time; overlapping captures would sample each other
+_capture_lock = threading.Lock()
+
+
+def _frame_name(frame):
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})"
+
+
+def sample_stacks(seconds, interval=PROFILE_INTERVAL_MS / 1000):
+    """
+    Sample the stacks of all other threads for a while.
+
+    Args:
+        seconds (float): Capture length (capped at PROFILE_MAX_SECONDS)
+        interval (float): Seconds between samples
+
+    Returns:
+        collections.Counter: Folded stack (root first, ``;``-separated) ->
+        number of samples, or None if another capture is running
+    """
+    if not _capture_lock.acquire(blocking=False):
+        return None
+    try:
+        me = threading.get_ident()
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        stacks = Counter()
+        deadline = time.monotonic() + min(seconds, PROFILE_MAX_SECONDS)
+        while time.monotonic() < deadline:
+            for ident, frame in sys._current_frames().items():
+                if ident == me:
+                    continue
+                frames = []
+                while frame is not None:
+                    frames.append(_frame_name(frame))
+                    frame = frame.f_back
+                thread = names.get(ident) or f"thread-{ident}"
+                stacks[";".join([thread] + frames[::-1])] += 1
+            time.sleep(interval)
+        return stacks
+    finally:
+        _capture_lock.release()
+
+
+def folded(stacks):
+    """
+    Format sampled stacks for flame graph tools.
+
+    Args:
+        stacks (collections.Counter): Result of sample_stacks()
+
+    Returns:
+        str: One ``stack count`` line per distinct stack, most frequent first
+    """
+    return "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
@@ -0,0 +1,65 @@
+"""
+HamSCI Contesting and DXing Dashboard - Table View Regions
+
+CQ zone to region mapping used by the table view, which groups spots into
+human-readable geographic regions so operators can quickly see which parts of
+the world are reachable on each band.
+
+Project: HamSCI Personal Space Weather Station Dashboard Development
+"""
+
+# Region Categories:
+# - Europe: Western/Central Europe
+# - Caribbean: Caribbean islands
+# - South America: All of South America
+# - Japan: Japanese islands
+# - Africa: African continent
+# - VK: Australia/New Zealand
+# - YB: Indonesia
+# - China: Mainland China
+# - UA9: Asiatic Russia (Siberia)
+# - Indian: Indian subcontinent
+# - Middle East: Middle Eastern countries
+# - Thailand: Southeast Asia (Thailand region)
+# - North America: USA, Canada, Alaska, Mexico
+# - Oceania: Pacific islands
+REGION_ZONES = {
+    "Europe":        [14, 15, 16, 20],
+    "Caribbean":     [8],
+    "South America": [9, 10, 11, 12, 13],
+    "Japan":         [25],
+    "Africa":        [33, 34, 35, 36, 37, 38, 39],
+    "VK":            [29, 30],
+    "YB":            [27, 28],
+    "China":         [23, 24],
+    "UA9":           [17, 18, 19],
+    "Indian":        [22],
+    "Middle East":   [21],
+    "Thailand":      [26],
+    "North America": [1, 2, 3, 4, 5, 6, 7, 40],
+    "Oceania":       [31, 32],
+}
+
+# Inverted mapping for constant-time lookups
+ZONE_REGIONS = {zone: region for region, zones in REGION_ZONES.items() for zone in zones}
+
+UNKNOWN_REGION = "Unknown"
+
+
+def region_from_cq(cq_zone):
+    """
+    Map CQ zone number to geographic region name.
+
+    Args:
+        cq_zone (int): CQ zone number (1-40), or None
+
+    Returns:
+        str: Region name or "Unknown" if the zone is missing or unmapped
+
+    Example:
+        >>> region_from_cq(5)   # CQ zone 5 is eastern USA
+        'North America'
+        >>> region_from_cq(14)  # CQ zone 14 is Western Europe
+        'Europe'
+    """
+    return ZONE_REGIONS.get(cq_zone, UNKNOWN_REGION)
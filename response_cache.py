@@ -0,0 +1,352 @@
+"""
+HamSCI Contesting and DXing Dashboard - Coalesced Response Cache
+
+Dashboards reload on shared timers, so identical spot requests tend to arrive
+together. ResponseCache makes them share work: the first request for a key
+builds the response body while concurrent requests for the same key wait for
+it (single flight), and the serialized bytes are then kept for a few seconds
+with an ETag. A client revalidating with ``If-None-Match`` gets
+``304 Not Modified`` while the body is unchanged. Bodies are sent gzip- or
+brotli-compressed (brotli needs the optional ``brotli`` package) when the
+client accepts it; each compressed variant is built once per cached body.
+
+Configuration (environment / .env):
+    RESPONSE_CACHE_SECONDS=10       How long a serialized response is reused;
+                                    0 disables coalescing and ETags
+    RESPONSE_CACHE_MAX_MINUTES=1440 Longest lastInterval whose body is held in
+                                    memory; longer windows stream uncached
+
+Project: HamSCI Personal Space Weather Station Dashboard Development
+"""
+
+import asyncio
+import gzip
+import hashlib
+import os
+import threading
+import time
+from typing import NamedTuple
+
+try:
+    import brotli
+except ImportError:  # optional: gzip is used instead
+    brotli = None
+
+from metrics import CACHE_LOOKUPS
+
+RESPONSE_CACHE_SECONDS = float(os.getenv('RESPONSE_CACHE_SECONDS', '10'))
+RESPONSE_CACHE_MAX_MINUTES = int(os.getenv('RESPONSE_CACHE_MAX_MINUTES', '1440'))
+
+# Bodies smaller than this are sent uncompressed
+COMPRESS_MIN_BYTES = 1024
+
+
+class CachedResponse(NamedTuple):
+    """Serialized response body shared by coalesced requests."""
+    body: bytes
+    etag: str
+    mimetype: str
+    expires: float
+
+
+def cache_key(route, lastInterval, filters=None, fmt=None):
+    """
+    Build a cache key from normalized request parameters.
+
+    Mode lists are sorted and empty filters dropped, so requests that differ
+    only in parameter order or spelling of "all" share a key.
+
+    Args:
+        route (str): Endpoint name, e.g. "/spots"
+        lastInterval (int|str): Window in minutes
+        filters (dict): Parsed filter keyword arguments
+        fmt (str): Response format ("ndjson" or None)
+
+    Returns:
+        tuple: Hashable key
+
+    Example:
+        >>> cache_key("/spots", "15", {"band": "CBs", "modes": ["ft8", "wspr"], "country": None})
+        ('/spots', '15', None, (('band', 'CBs'), ('modes', ('ft8', 'wspr'))))
+    """
+    items = []
+    for name, value in sorted((filters or {}).items()):
+        if value is None:
+            continue
+        if isinstance(value, list):
+            value = tuple(sorted(value))
+        items.append((name, value))
+    return (route, str(lastInterval).strip(), fmt, tuple(items))
+
+
+def cacheable_window(lastInterval):
+    """
+    Check whether a lastInterval window is short enough to cache in memory.
+
+    Args:
+        lastInterval (int|str): Window in minutes
+
+    Returns:
+        bool: True if responses for this window may be coalesced
+    """
+    try:
+        minutes = int(lastInterval)
+    except (TypeError, ValueError):
+        return False
+    return 0 < minutes <= RESPONSE_CACHE_MAX_MINUTES
+
+
+def etag_matches(if_none_match, etag):
+    """
+    Check an ``If-None-Match`` header against an entity tag.
+
+    Args:
+        if_none_match (str): Header value, e.g. ``"abc", W/"def"`` (or None)
+        etag (str): Unquoted entity tag of the current body
+
+    Returns:
+        bool: True if the client already has this body
+    """
+    if not if_none_match:
+        return False
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag == "*":
+            return True
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        if tag.strip('"') == etag:
+            return True
+    return False
+
+
+def accepted_encodings(accept_encoding):
+    """
+    Parse an Accept-Encoding header.
+
+    Args:
+        accept_encoding (str): Header value, or None
+
+    Returns:
+        set[str]: Lowercase encodings the client accepts (q > 0)
+
+    Example:
+        >>> sorted(accepted_encodings("gzip, br;q=0, deflate"))
+        ['deflate', 'gzip']
+    """
+    accepted = set()
+    for item in (accept_encoding or "").split(","):
+        name, _, params = item.partition(";")
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if quality > 0 and name.strip():
+            accepted.add(name.strip().lower())
+    return accepted
+
+
+def choose_encoding(accept_encoding, size):
+    """
+    Pick a content encoding the client accepts.
+
+    Args:
+        accept_encoding (str): Accept-Encoding header value, or None
+        size (int): Uncompressed body size in bytes
+
+    Returns:
+        str: "br", "gzip", or None to send the body as is
+
+    Example:
+        >>> choose_encoding("gzip, deflate, br", 50000)
+        'br'
+    """
+    if not accept_encoding or size < COMPRESS_MIN_BYTES:
+        return None
+    accepted = accepted_encodings(accept_encoding)
+    if brotli is not None and "br" in accepted:
+        return "br"
+    if "gzip" in accepted:
+        return "gzip"
+    return None
+
+
+def compress(body, encoding):
+    """
+    Compress a response body.
+
+    Args:
+        body (bytes): Uncompressed body
+        encoding (str): "br", "gzip", or None
+
+    Returns:
+        bytes: Encoded body
+    """
+    if encoding == "br":
+        return brotli.compress(body, quality=5)
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=6)
+    return body
+
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class ResponseCache:
+    """
+    Short-lived cache of serialized responses with single-flight builds.
+
+    Usable from worker threads (get()) and from an asyncio event loop
+    (get_async()); both share the stored bodies.
+
+    Args:
+        ttl (float): Seconds a built body is reused
+        max_entries (int): Bodies kept at most; the oldest are dropped first
+
+    Example:
+        >>> cache = ResponseCache(ttl=10)
+        >>> entry = cache.get(("/tbsummary", "15"), lambda: (b'{"total": 0}', "application/json"))
+        >>> entry.body, len(entry.etag)
+        (b'{"total": 0}', 32)
+    """
+
+    def __init__(self, ttl=RESPONSE_CACHE_SECONDS, max_entries=256):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = {}
+        self._flights = {}
+        self._async_flights = {}
+        self._encoded = {}
+        self._lock = threading.Lock()
+
+    def _fresh(self, key):
+        entry = self._entries.get(key)
+        if entry is not None and entry.expires > time.monotonic():
+            return entry
+        return None
+
+    def _store(self, key, body, mimetype):
+        entry = CachedResponse(body, hashlib.blake2b(body, digest_size=16).hexdigest(), mimetype,
+                               time.monotonic() + self.ttl)
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = entry
+            now = time.monotonic()
+            for old in [k for k, e in self._entries.items() if e.expires <= now]:
+                del self._entries[old]
+            while len(self._entries) > self.max_entries:
+                del self._entries[next(iter(self._entries))]
+        return entry
+
+    def encoded(self, entry, encoding):
+        """
+        Return a cached body in a content encoding, compressing it once.
+
+        Args:
+            entry (CachedResponse): Entry returned by get()/get_async()
+            encoding (str): "br", "gzip", or None (see choose_encoding())
+
+        Returns:
+            bytes: Encoded body
+        """
+        if encoding is None:
+            return entry.body
+        variant = (entry.etag, encoding)
+        with self._lock:
+            body = self._encoded.get(variant)
+        if body is None:
+            body = compress(entry.body, encoding)
+            with self._lock:
+                self._encoded[variant] = body
+                while len(self._encoded) > self.max_entries:
+                    del self._encoded[next(iter(self._encoded))]
+        return body
+
+    def get(self, key, build):
+        """
+        Return the cached body for a key, building it at most once at a time.
+
+        Args:
+            key (tuple): Key from cache_key()
+            build (callable): Returns ``(body bytes, mimetype)``; called by the
+                first request for the key, while later ones wait for its result
+
+        Returns:
+            CachedResponse: Body, ETag and mimetype
+
+        Raises:
+            Exception: Whatever ``build`` raised (also in the waiting requests)
+        """
+        with self._lock:
+            entry = self._fresh(key)
+            if entry is not None:
+                CACHE_LOOKUPS.inc(cache="response", result="hit")
+                return entry
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+        CACHE_LOOKUPS.inc(cache="response", result="miss" if leader else "coalesced")
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            flight.result = self._store(key, *build())
+            return flight.result
+        except Exception as err:
+            flight.error = err
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+
+    async def get_async(self, key, build):
+        """
+        Coroutine version of get() for the async server.
+
+        Args:
+            key (tuple): Key from cache_key()
+            build (callable): Coroutine function returning ``(body bytes, mimetype)``
+
+        Returns:
+            CachedResponse: Body, ETag and mimetype
+        """
+        with self._lock:
+            entry = self._fresh(key)
+        if entry is not None:
+            CACHE_LOOKUPS.inc(cache="response", result="hit")
+            return entry
+
+        flight = self._async_flights.get(key)
+        if flight is not None:
+            CACHE_LOOKUPS.inc(cache="response", result="coalesced")
+            return await asyncio.shield(flight)
+        CACHE_LOOKUPS.inc(cache="response", result="miss")
+
+        flight = self._async_flights[key] = asyncio.get_running_loop().create_future()
+        try:
+            entry = self._store(key, *(await build()))
+            flight.set_result(entry)
+            return entry
+        except Exception as err:
+            flight.set_exception(err)
+            # Mark the exception as retrieved when nobody was waiting for it
+            flight.exception()
+            raise
+        finally:
+            del self._async_flights[key]
+            if not flight.done():
+                flight.cancel()  # leader was cancelled; waiters see CancelledError
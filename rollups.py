@@ -0,0 +1,156 @@
+"""
+HamSCI Contesting and DXing Dashboard - Per-Minute Spot Rollups
+
+Pre-aggregated spot counts for long windows. Every row of the
+``spot_rollups`` collection summarizes one minute x band x mode x transmitter
+CQ zone x receiver: spot count plus SNR min/max/sum (mean = sum / count).
+A 48-hour table summary then reads a few rows per minute instead of every raw
+spot.
+
+Rollups are computed from the fields stored by the ingest worker
+(ingest-ft.py), which keeps them current: after stamping a batch of spots it
+recomputes the rows of the minutes that batch touched. Recomputing whole
+minutes (rather than incrementing counters) keeps updates idempotent when a
+spot is stamped twice.
+
+Configuration (environment / .env):
+    SPOT_ROLLUPS=1   Answer /tbsummary windows longer than the spot cache from
+                     the rollups (needs ingest-ft.py running)
+
+Project: HamSCI Personal Space Weather Station Dashboard Development
+"""
+
+import os
+
+from pymongo import ASCENDING, ReplaceOne
+
+from bands import BAND_EDGES, CONTEST_BANDS
+from spotdb import cursor_batches, window_start
+
+ROLLUP_COLLECTION = "spot_rollups"
+
+ROLLUPS_ENABLED = os.getenv('SPOT_ROLLUPS', '0') == '1'
+
+ROLLUP_INDEXES = [
+    [("ts", ASCENDING)],
+    [("ts", ASCENDING), ("band", ASCENDING)],
+]
+
+# Raw spot fields -> rollup key fields
+ROLLUP_KEY = {
+    "ts": "$ts",
+    "band": "$band_name",
+    "mode": "$mode",
+    "cq_zone": "$tx_cq_zone",
+    "rx_callsign": "$rx_callsign",
+}
+
+
+def _rollup_pipeline(match):
+    return [
+        {"$match": match},
+        {"$group": {
+            "_id": ROLLUP_KEY,
+            "count": {"$sum": 1},
+            "snr_min": {"$min": "$snr"},
+            "snr_max": {"$max": "$snr"},
+            "snr_sum": {"$sum": "$snr"},
+        }},
+    ]
+
+
+def _write_rollups(rollups, rows, batch_size=1000, empty=False):
+    written = 0
+    for batch in cursor_batches(rows, batch_size):
+        if empty:
+            rollups.insert_many([{**row["_id"], **row} for row in batch], ordered=False)
+        else:
+            requests = [ReplaceOne({"_id": row["_id"]}, {**row["_id"], **row}, upsert=True) for row in batch]
+            rollups.bulk_write(requests, ordered=False)
+        written += len(batch)
+    return written
+
+
+def update_rollups(spots, rollups, minutes):
+    """
+    Recompute the rollup rows of the given minutes from the raw spots.
+
+    Args:
+        spots (pymongo.collection.Collection): The stamped spots collection
+        rollups (pymongo.collection.Collection): The rollup collection
+        minutes (iterable[datetime]): Spot minutes (ts values) to recompute
+
+    Returns:
+        int: Number of rollup rows written
+    """
+    minutes = sorted({m for m in minutes if m is not None})
+    if not minutes:
+        return 0
+    match = {"ts": {"$in": minutes}, "enriched": {"$exists": True}}
+    return _write_rollups(rollups, spots.aggregate(_rollup_pipeline(match)))
+
+
+def rebuild_rollups(spots, rollups, batch_size=1000, empty=False):
+    """
+    Recompute every rollup row from all stamped spots (used after a backfill).
+
+    Args:
+        spots (pymongo.collection.Collection): The stamped spots collection
+        rollups (pymongo.collection.Collection): The rollup collection
+        batch_size (int): Rows per bulk write
+        empty (bool): The rollup collection is known to be empty (e.g. just
+            dropped), so rows are inserted instead of upserted
+
+    Returns:
+        int: Number of rollup rows written
+    """
+    match = {"ts": {"$ne": None}, "enriched": {"$exists": True}}
+    rows = spots.aggregate(_rollup_pipeline(match), allowDiskUse=True)
+    return _write_rollups(rollups, rows, batch_size, empty)
+
+
+def ensure_rollup_indexes(rollups):
+    """
+    Create the rollup indexes if they are missing.
+
+    Args:
+        rollups (pymongo.collection.Collection): The rollup collection
+    """
+    for keys in ROLLUP_INDEXES:
+        rollups.create_index(keys)
+
+
+def rollup_count_pipeline(minutes, band="CBs", modes=None, rx_callsign=None):
+    """
+    Aggregation pipeline summing rollup rows by CQ zone, band and mode over the last N minutes.
+
+    Args:
+        minutes (int): Window in minutes
+        band (str): Band name, "CBs" for the contest bands, or None for all
+        modes (list[str]): Modes to include (lowercase), or None for all
+        rx_callsign (str): Only count this receiver's spots, or None for all
+
+    Returns:
+        list[dict]: Pipeline for the rollup collection; it yields rows of
+        ``{"_id": {"cq_zone", "band", "mode"}, "count"}``
+
+    Example:
+        >>> next(db["spot_rollups"].aggregate(rollup_count_pipeline(2880, modes=["ft8"])))
+        {'_id': {'cq_zone': 14, 'band': '20m', 'mode': 'ft8'}, 'count': 5213}
+    """
+    match = {"ts": {"$gte": window_start(minutes)}}
+    if band == "CBs":
+        match["band"] = {"$in": CONTEST_BANDS}
+    elif band in BAND_EDGES:
+        match["band"] = band
+    if modes:
+        match["mode"] = {"$in": modes}
+    if rx_callsign:
+        match["rx_callsign"] = rx_callsign
+    return [
+        {"$match": match},
+        {"$group": {
+            "_id": {"cq_zone": "$cq_zone", "band": "$band", "mode": "$mode"},
+            "count": {"$sum": "$count"},
+        }},
+    ]
@@ -0,0 +1,278 @@
+"""
+HamSCI Contesting and DXing Dashboard - Shared Spot Cache
+
+Process-wide cache of enriched spots, bucketed by minute. Every open map and
+table tab polls for the same recent window, so instead of re-querying MongoDB
+for the whole window on every request the cache keeps the last
+SPOT_CACHE_MINUTES of spots in memory and only fetches documents inserted
+since its high-water mark (the largest ObjectId seen). Requests for any window
+up to that size are answered by slicing buckets. Spots are also kept in the
+order they were loaded so live clients can ask for just the spots added after
+a cursor.
+
+ObjectIds only roughly follow insert order: writers in different processes
+(or on hosts with skewed clocks) can insert a spot with a smaller _id than one
+already loaded. Each refresh therefore re-reads the ObjectIds of the last
+SPOT_CACHE_OVERLAP_SECONDS before the high-water mark and skips the ones it
+already holds.
+
+Every worker process keeps its own cache, about 1 KB per spot (including the
+band opening detector and statistics it feeds), so a busy receiver costs tens
+of MB per worker for a day of spots. Longer windows are read from MongoDB
+(or the per-minute rollups) instead.
+
+Configuration (environment / .env):
+    SPOT_CACHE_MINUTES          Longest window kept in memory (default 60, 0 disables)
+    SPOT_CACHE_REFRESH_SECONDS  Minimum seconds between incremental refreshes (default 15)
+    SPOT_CACHE_OVERLAP_SECONDS  ObjectId time re-read on each refresh for late inserts (default 120)
+    SPOT_STREAM_SECONDS         Seconds between live update events (default: refresh interval)
+    SPOT_STREAM_LIFETIME_SECONDS  Seconds before a live update stream ends and the
+                                browser reconnects (default 300)
+
+Project: HamSCI Personal Space Weather Station Dashboard Development
+"""
+
+import bisect
+from datetime import timedelta
+import itertools
+import os
+import threading
+import time
+
+from bson import ObjectId
+from pymongo import ASCENDING
+
+from spotdb import cursor_batches, spot_time_query, window_start
+
+SPOT_CACHE_MINUTES = int(os.getenv('SPOT_CACHE_MINUTES', '60'))
+SPOT_CACHE_REFRESH_SECONDS = float(os.getenv('SPOT_CACHE_REFRESH_SECONDS', '15'))
+SPOT_CACHE_OVERLAP_SECONDS = float(os.getenv('SPOT_CACHE_OVERLAP_SECONDS', '120'))
+SPOT_STREAM_SECONDS = float(os.getenv('SPOT_STREAM_SECONDS', str(SPOT_CACHE_REFRESH_SECONDS)))
+SPOT_STREAM_LIFETIME_SECONDS = float(os.getenv('SPOT_STREAM_LIFETIME_SECONDS', '300'))
+
+
+class SpotCache:
+    """
+    Minute-bucketed cache of enriched spots with incremental refresh.
+
+    Args:
+        collection (pymongo.collection.Collection): The spots collection
+        enrich (callable): Turns a batch (list) of raw documents into spot
+            dicts with a ``minute`` (datetime) key, in the same order; spots
+            without a minute are dropped
+        projection (dict): Fields to read from each document (must include _id)
+        query (dict): Extra filter for the documents to cache, e.g. one
+            receiver's spots in a shared collection (see receivers.receiver_query())
+        window_minutes (int): Oldest data kept, in minutes
+        refresh_seconds (float): Minimum time between refreshes
+        overlap_seconds (float): ObjectId time before the high-water mark
+            re-read on each refresh, for spots inserted out of _id order
+        listeners (list[callable]): Each called with every batch of newly
+            cached spots, in arrival order, e.g. band_openings.OpeningDetector.add
+        auto_refresh (bool): Query MongoDB from refresh() and the cache reads;
+            False when the caller loads documents itself (see load())
+    """
+
+    def __init__(self, collection, enrich, projection=None, query=None,
+                 window_minutes=SPOT_CACHE_MINUTES, refresh_seconds=SPOT_CACHE_REFRESH_SECONDS,
+                 overlap_seconds=SPOT_CACHE_OVERLAP_SECONDS, listeners=(), auto_refresh=True):
+        self.collection = collection
+        self.enrich = enrich
+        self.projection = projection
+        self.query = query or {}
+        self.window_minutes = window_minutes
+        self.refresh_seconds = refresh_seconds
+        self.overlap = timedelta(seconds=overlap_seconds)
+        self.listeners = list(listeners)
+        self.auto_refresh = auto_refresh
+
+        self._buckets = {}       # minute -> list of spots, in arrival order
+        self._minutes = []       # sorted bucket keys
+        self._arrivals = []      # spots in the order they were loaded, for changes()
+        self._arrival_ids = []   # _id of each entry in _arrivals
+        self._arrival_seqs = []  # load sequence number of each entry in _arrivals
+        self._positions = {}     # _id -> load sequence number of every cached spot
+        self._sequence = itertools.count()
+        self._high_water = None  # largest _id loaded so far
+        self._last_refresh = 0.0
+        self._lock = threading.Lock()
+
+    def covers(self, minutes):
+        """
+        Check whether a lastInterval window can be served from the cache.
+
+        Args:
+            minutes (int): Requested window in minutes
+
+        Returns:
+            bool: True if the window fits inside the cached range
+        """
+        return 0 < minutes <= self.window_minutes
+
+    def refresh(self, force=False):
+        """
+        Load documents inserted since the last refresh and evict old buckets.
+
+        The first call loads the whole cached window with a time-range query;
+        later calls only ask for ``_id`` values above the high-water mark less
+        the overlap, skipping spots already cached. Calls within
+        ``refresh_seconds`` of the previous one return immediately, so
+        concurrent requests share one database round trip. Without ``force``
+        nothing is read while ``auto_refresh`` is off.
+
+        Args:
+            force (bool): Refresh even if the previous one was recent
+        """
+        if not force and not self.auto_refresh:
+            return
+        with self._lock:
+            now = time.monotonic()
+            if not force and now - self._last_refresh < self.refresh_seconds:
+                return
+            cursor = self.collection.find(self._refresh_query(), self.projection).sort([("_id", ASCENDING)])
+            for docs in cursor_batches(cursor):
+                self._load(docs)
+            self._evict()
+            self._last_refresh = now
+
+    # The async server (asgi-ft.py) turns auto_refresh off, runs the refresh
+    # query on its asyncio client and hands the documents over with these
+
+    def refresh_due(self):
+        """True if refresh() would query MongoDB now."""
+        return time.monotonic() - self._last_refresh >= self.refresh_seconds
+
+    def refresh_query(self):
+        """MongoDB filter of the next refresh, read in ``_id`` order with ``projection``."""
+        with self._lock:
+            return self._refresh_query()
+
+    def load(self, docs):
+        """Add a batch of documents of the refresh_query(), in ``_id`` order."""
+        with self._lock:
+            self._load(docs)
+
+    def finish_refresh(self):
+        """Evict old buckets and restart the refresh interval after load()."""
+        with self._lock:
+            self._evict()
+            self._last_refresh = time.monotonic()
+
+    def _refresh_query(self):
+        if self._high_water is None:
+            query = spot_time_query(self.window_minutes)
+        else:
+            overlap_start = ObjectId.from_datetime(self._high_water.generation_time - self.overlap)
+            query = {"_id": {"$gt": overlap_start}}
+        if self.query:
+            query = {"$and": [query, self.query]}
+        return query
+
+    def _load(self, docs):
+        docs = [doc for doc in docs if doc["_id"] not in self._positions]
+        if not docs:
+            return
+        ids = [doc["_id"] for doc in docs]
+        self._high_water = max(ids[-1], self._high_water) if self._high_water else ids[-1]
+        added = []
+        oldest = window_start(self.window_minutes)
+        for spot_id, spot in zip(ids, self.enrich(docs)):
+            minute = spot.get("minute")
+            # a late spot already past the window would be evicted and re-read
+            if minute is None or minute < oldest:
+                continue
+            added.append(spot)
+            bucket = self._buckets.get(minute)
+            if bucket is None:
+                bucket = self._buckets[minute] = []
+                bisect.insort(self._minutes, minute)
+            bucket.append(spot)
+            sequence = next(self._sequence)
+            self._arrivals.append(spot)
+            self._arrival_ids.append(spot_id)
+            self._arrival_seqs.append(sequence)
+            self._positions[spot_id] = sequence
+        for listener in self.listeners:
+            listener(added)
+
+    def _evict(self):
+        oldest = window_start(self.window_minutes)
+        cut = bisect.bisect_left(self._minutes, oldest)
+        for minute in self._minutes[:cut]:
+            del self._buckets[minute]
+        del self._minutes[:cut]
+        if not cut:
+            return
+
+        # Late spots can sit anywhere in arrival order, so check every one
+        arrivals, arrival_ids, arrival_seqs = [], [], []
+        for spot, spot_id, sequence in zip(self._arrivals, self._arrival_ids, self._arrival_seqs):
+            if spot["minute"] < oldest:
+                del self._positions[spot_id]
+                continue
+            arrivals.append(spot)
+            arrival_ids.append(spot_id)
+            arrival_seqs.append(sequence)
+        self._arrivals, self._arrival_ids, self._arrival_seqs = arrivals, arrival_ids, arrival_seqs
+
+    def window(self, minutes):
+        """
+        Return cached spots from the last N minutes, oldest first.
+
+        Refreshes the cache first if it is due (see refresh()). The returned list holds
+        references to the cached spot dicts, which must not be modified.
+
+        Args:
+            minutes (int): Window length in minutes (see covers())
+
+        Returns:
+            list[dict]: Enriched spots in chronological order
+        """
+        spots, _ = self.changes(None, minutes)
+        return spots
+
+    def changes(self, cursor=None, minutes=None):
+        """
+        Return the spots added after a cursor, plus the cursor to use next.
+
+        Refreshes the cache first if it is due (see refresh()). Without a cursor the whole
+        window of the last ``minutes`` is returned (a full resync). Expired
+        spots are not reported individually; clients drop spots older than
+        spotdb.window_start(minutes) themselves.
+
+        The cursor is the _id of the last spot loaded, so spots loaded late
+        (with a smaller _id) are still returned after it. A cursor this cache
+        does not hold (e.g. from another worker process, or already expired)
+        is compared by _id instead.
+
+        Args:
+            cursor (ObjectId): Cursor returned by a previous call, or None
+            minutes (int): Window for a full resync (see covers())
+
+        Returns:
+            tuple: (list[dict] of spots in load order, ObjectId cursor or None)
+        """
+        self.refresh()
+        if cursor is None:
+            threshold = window_start(minutes)
+            with self._lock:
+                start = bisect.bisect_left(self._minutes, threshold)
+                spots = []
+                for minute in self._minutes[start:]:
+                    spots.extend(self._buckets[minute])
+                return spots, self._last_loaded()
+
+        with self._lock:
+            sequence = self._positions.get(cursor)
+            if sequence is None:
+                spots = [spot for spot_id, spot in zip(self._arrival_ids, self._arrivals) if spot_id > cursor]
+            else:
+                spots = self._arrivals[bisect.bisect_right(self._arrival_seqs, sequence):]
+            return spots, self._last_loaded() or cursor
+
+    def _last_loaded(self):
+        return self._arrival_ids[-1] if self._arrival_ids else self._high_water
+
+    def __len__(self):
+        with self._lock:
+            return sum(len(bucket) for bucket in self._buckets.values())
@@ -0,0 +1,206 @@
+"""
+HamSCI Contesting and DXing Dashboard - Spot Enrichment
+
+Turns raw WSPRDaemon spot documents into enriched spots: transmitter
+coordinates and zones from the grid table, the band derived from the
+frequency, and the spot minute. The dashboard enriches spots as it reads them;
+the ingest worker (ingest-ft.py) runs the same code once per document and
+stores the result, so reads can filter on zones inside MongoDB and skip the
+lookups entirely.
+
+Stored fields (set by ingest-ft.py):
+    ts                      UTC datetime of the spot (same as spotdb.py migrate)
+    tx_lat, tx_lon          Transmitter coordinates (None for an invalid grid)
+    tx_cq_zone, tx_itu_zone Transmitter zones
+    tx_country, tx_continent
+    band_name               Band derived from the frequency (e.g. "20m")
+    enriched                ENRICH_VERSION the fields were computed with
+
+Configuration (environment / .env):
+    SPOT_ENRICHED=1   Push country/continent/zone filters into MongoDB queries
+                      (only once ingest-ft.py has backfilled every spot)
+
+Project: HamSCI Personal Space Weather Station Dashboard Development
+"""
+
+import os
+
+from pymongo import ASCENDING, UpdateOne
+
+from bands import frequencies_to_bands
+from grid_table import GridInfo
+from spotdb import cursor_batches, spot_timestamp
+
+# Bump when the stored fields or how they are computed change, so the ingest
+# worker re-stamps existing spots
+ENRICH_VERSION = 1
+
+ENRICHED_QUERY = os.getenv('SPOT_ENRICHED', '0') == '1'
+
+ENRICHED_FIELDS = [
+    "tx_lat", "tx_lon", "tx_cq_zone", "tx_itu_zone", "tx_country", "tx_continent",
+    "band_name", "enriched",
+]
+
+# Indexes for zone filters on the stored fields (created by ingest-ft.py)
+ENRICHED_INDEXES = [
+    [("ts", ASCENDING), ("tx_cq_zone", ASCENDING)],
+    [("ts", ASCENDING), ("tx_country", ASCENDING)],
+    [("ts", ASCENDING), ("tx_continent", ASCENDING)],
+]
+
+# Country name used by the "All but US" filter (NAME_LONG in world.geojson)
+US_COUNTRY = "United States"
+
+
+def enrich_spots(docs, grid_table):
+    """
+    Attach grid table and band information to a batch of spot documents.
+
+    Documents already stamped by the ingest worker reuse their stored fields.
+    For the rest, each distinct grid in the batch is resolved once
+    (GridTable.lookup_many) and all frequencies are mapped to bands with one
+    searchsorted (frequencies_to_bands), instead of per-document calls.
+
+    Args:
+        docs (list[dict]): Spot documents as read from MongoDB
+        grid_table (GridTable): Locator lookup table
+
+    Returns:
+        list[dict]: The same documents with added keys:
+            - tx: GridInfo of the transmitter grid (None if invalid)
+            - band_name: Band derived from the frequency (e.g. "20m")
+            - minute: UTC datetime of the spot (None if date/time are malformed)
+    """
+    pending = [doc for doc in docs if doc.get("enriched") != ENRICH_VERSION]
+    if pending:
+        tx_infos = grid_table.lookup_many([doc.get("grid") for doc in pending])
+        band_names = frequencies_to_bands([doc.get("frequency") for doc in pending])
+        for doc, tx_info, band_name in zip(pending, tx_infos, band_names):
+            doc["tx"] = tx_info
+            doc["band_name"] = band_name
+
+    for doc in docs:
+        if "tx" not in doc:
+            doc["tx"] = stored_tx_info(doc)
+        # Migrated documents already carry the parsed timestamp
+        doc["minute"] = doc.get("ts") or spot_timestamp(doc.get("date"), doc.get("time"))
+    return docs
+
+
+def stored_tx_info(doc):
+    """
+    Rebuild the transmitter GridInfo from a stamped document.
+
+    Args:
+        doc (dict): Document with the ENRICHED_FIELDS
+
+    Returns:
+        GridInfo: Transmitter location and zones, or None for an invalid grid
+    """
+    if doc.get("tx_lat") is None:
+        return None
+    return GridInfo(doc["tx_lat"], doc["tx_lon"], doc.get("tx_cq_zone"), doc.get("tx_itu_zone"),
+                    doc.get("tx_country"), doc.get("tx_continent"))
+
+
+def enrichment_fields(spot):
+    """
+    Fields the ingest worker stores for an enriched spot.
+
+    Args:
+        spot (dict): Spot returned by enrich_spots()
+
+    Returns:
+        dict: ``$set`` document
+    """
+    tx = spot["tx"]
+    return {
+        "ts": spot["minute"],
+        "tx_lat": tx.lat if tx else None,
+        "tx_lon": tx.lon if tx else None,
+        "tx_cq_zone": tx.cq_zone if tx else None,
+        "tx_itu_zone": tx.itu_zone if tx else None,
+        "tx_country": tx.country if tx else None,
+        "tx_continent": tx.continent if tx else None,
+        "band_name": str(spot["band_name"]),
+        "enriched": ENRICH_VERSION,
+    }
+
+
+# Fields the ingest worker needs to read from a raw document
+SOURCE_PROJECTION = {"grid": 1, "frequency": 1, "date": 1, "time": 1}
+
+
+def stamp_spots(collection, docs, grid_table):
+    """
+    Enrich a batch of raw documents and store the result in one bulk write.
+
+    Args:
+        collection (pymongo.collection.Collection): The spots collection
+        docs (list[dict]): Documents with at least SOURCE_PROJECTION and _id
+        grid_table (GridTable): Locator lookup table
+
+    Returns:
+        int: Number of documents updated
+    """
+    if not docs:
+        return 0
+    for doc in docs:
+        doc.pop("enriched", None)  # always recompute
+    requests = [
+        UpdateOne({"_id": spot["_id"]}, {"$set": enrichment_fields(spot)})
+        for spot in enrich_spots(docs, grid_table)
+    ]
+    return collection.bulk_write(requests, ordered=False).modified_count
+
+
+def backfill_enrichment(collection, grid_table, batch_size=1000):
+    """
+    Stamp every spot that is missing the current enrichment.
+
+    Args:
+        collection (pymongo.collection.Collection): The spots collection
+        grid_table (GridTable): Locator lookup table
+        batch_size (int): Number of documents per bulk write
+
+    Returns:
+        int: Number of documents updated
+    """
+    cursor = collection.find({"enriched": {"$ne": ENRICH_VERSION}}, SOURCE_PROJECTION)
+    return sum(stamp_spots(collection, docs, grid_table) for docs in cursor_batches(cursor, batch_size))
+
+
+def geo_query(country=None, continent=None, cq_zone=None, itu_zone=None):
+    """
+    Build MongoDB filters on the stored transmitter zones.
+
+    Mirrors the web app's matches_geo_filters(). Only meaningful once every
+    spot in the queried window has been stamped (see ENRICHED_QUERY).
+
+    Args:
+        country (str): Country name, "nonUS" for everything but the US, or None
+        continent (str): Continent name or None
+        cq_zone (int): CQ zone number or None
+        itu_zone (int): ITU zone number or None
+
+    Returns:
+        list[dict]: Filter clauses to AND into a spot query
+
+    Example:
+        >>> geo_query(country="nonUS", cq_zone=14)
+        [{'tx_country': {'$ne': 'United States'}, 'tx_lat': {'$ne': None}}, {'tx_cq_zone': 14}]
+    """
+    clauses = []
+    if country == "nonUS":
+        # Invalid grids can't be placed in any zone, so they never match
+        clauses.append({"tx_country": {"$ne": US_COUNTRY}, "tx_lat": {"$ne": None}})
+    elif country:
+        clauses.append({"tx_country": country})
+    if continent:
+        clauses.append({"tx_continent": continent})
+    if cq_zone:
+        clauses.append({"tx_cq_zone": cq_zone})
+    if itu_zone:
+        clauses.append({"tx_itu_zone": itu_zone})
+    return clauses
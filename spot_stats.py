@@ -0,0 +1,214 @@
+"""
+HamSCI Contesting and DXing Dashboard - Streaming SNR and Drift Statistics
+
+Keeps SNR (and, for WSPR, drift) distributions per band x transmitter CQ
+zone x mode x time bucket, updated as spots arrive, so /stats can answer
+"how strong is 15m to Europe" for any recent window by merging a few
+buckets instead of rescanning raw spots.
+
+SNR and drift are whole numbers in a narrow range (about -40..+40 dB and
+-4..+4 Hz), so each distribution is an exact histogram (value -> count):
+adding a spot is one dict increment, merging buckets or receivers is adding
+counts, and quantiles are exact. A histogram holds a few dozen entries at
+most, less than a t-digest or KLL sketch would for the same data.
+
+The statistics are fed by the spot cache (see spot_cache.py), which loads
+its whole window on start; buckets older than STATS_RETENTION_HOURS are
+dropped.
+
+Configuration (environment / .env):
+    STATS_BUCKET_MINUTES=15     Time resolution of /stats windows
+    STATS_RETENTION_HOURS=24    History kept in memory
+
+Example:
+    >>> stats = SpotStats()
+    >>> stats.add(enrich_spots(docs))
+    >>> stats_records(stats.merged(window_start(60), datetime.utcnow()))[0]
+    {'band': '20m', 'cq_zone': 14, 'mode': 'ft8', 'count': 212,
+     'snr': {'median': -12, 'p90': -3, 'min': -24, 'max': 8}}
+
+Project: HamSCI Personal Space Weather Station Dashboard Development
+"""
+
+from collections import Counter
+from datetime import datetime, timedelta
+import math
+import os
+import threading
+
+STATS_BUCKET_MINUTES = int(os.getenv('STATS_BUCKET_MINUTES', '15'))
+STATS_RETENTION_HOURS = float(os.getenv('STATS_RETENTION_HOURS', '24'))
+
+# Fields a /stats request can group by, in key order
+STATS_GROUPS = ("band", "cq_zone", "mode")
+
+# Modes whose drift is reported (FT8/FT4 decoders do not measure it)
+DRIFT_MODES = ("wspr",)
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+class Histogram:
+    """
+    Exact distribution of whole-number values, mergeable by addition.
+
+    Args:
+        counts (collections.Counter): Value -> count to start from
+    """
+
+    __slots__ = ("counts",)
+
+    def __init__(self, counts=None):
+        self.counts = counts if counts is not None else Counter()
+
+    def add(self, value):
+        self.counts[round(value)] += 1
+
+    def merge(self, other):
+        self.counts.update(other.counts)
+
+    def __len__(self):
+        return sum(self.counts.values())
+
+    def quantile(self, q):
+        """
+        Nearest-rank quantile.
+
+        Args:
+            q (float): Quantile in [0, 1], e.g. 0.5 for the median
+
+        Returns:
+            int: Smallest value with at least q of the values at or below it,
+            or None if the histogram is empty
+        """
+        total = len(self)
+        if not total:
+            return None
+        # rounded first so that e.g. 0.9 x 10 ranks 9, not 10
+        rank = max(1, math.ceil(round(q * total, 9)))
+        seen = 0
+        for value in sorted(self.counts):
+            seen += self.counts[value]
+            if seen >= rank:
+                return value
+
+    def summary(self):
+        """Median, 90th percentile, minimum and maximum, or None if empty."""
+        if not self.counts:
+            return None
+        return {"median": self.quantile(0.5), "p90": self.quantile(0.9),
+                "min": min(self.counts), "max": max(self.counts)}
+
+
+class SpotStats:
+    """
+    SNR and drift histograms per band x CQ zone x mode x time bucket for one receiver.
+
+    Args:
+        bucket_minutes (int): Bucket length in minutes
+        retention_hours (float): History kept
+    """
+
+    def __init__(self, bucket_minutes=STATS_BUCKET_MINUTES, retention_hours=STATS_RETENTION_HOURS):
+        self.bucket_minutes = bucket_minutes
+        self.retention = timedelta(hours=retention_hours)
+        self._buckets = {}   # bucket start -> (band, cq_zone, mode) -> [snr Histogram, drift Histogram]
+        self._lock = threading.Lock()
+
+    def bucket_of(self, minute):
+        """Start of the bucket holding a minute (naive UTC datetime)."""
+        minutes = (minute - _EPOCH) // timedelta(minutes=1)
+        return _EPOCH + timedelta(minutes=minutes - minutes % self.bucket_minutes)
+
+    def add(self, spots):
+        """
+        Add spots to their buckets and drop buckets past the retention.
+
+        Args:
+            spots (iterable[dict]): Enriched spots (see spot_enrich.py);
+                spots without a minute are skipped
+        """
+        with self._lock:
+            newest = None
+            for spot in spots:
+                minute = spot.get("minute")
+                if minute is None:
+                    continue
+                bucket_start = self.bucket_of(minute)
+                if newest is None or bucket_start > newest:
+                    newest = bucket_start
+                tx = spot["tx"]
+                key = (spot["band_name"], tx.cq_zone if tx else None, spot.get("mode"))
+                bucket = self._buckets.setdefault(bucket_start, {})
+                histograms = bucket.get(key)
+                if histograms is None:
+                    histograms = bucket[key] = [Histogram(), Histogram()]
+                if spot.get("snr") is not None:
+                    histograms[0].add(spot["snr"])
+                if key[2] in DRIFT_MODES and spot.get("drift") is not None:
+                    histograms[1].add(spot["drift"])
+            if newest is not None:
+                oldest = newest - self.retention
+                for bucket_start in [b for b in self._buckets if b < oldest]:
+                    del self._buckets[bucket_start]
+
+    def merged(self, start, end, selected=None, group_by=STATS_GROUPS, into=None):
+        """
+        Merge the histograms of the buckets in a window.
+
+        Args:
+            start, end (datetime): Window (naive UTC); buckets starting in
+                [bucket_of(start), end) are merged
+            selected (callable): Takes a (band, cq_zone, mode) key and returns
+                False to leave it out, or None for all keys
+            group_by (tuple[str]): STATS_GROUPS fields to keep apart; the others are merged
+            into (dict): Result of a previous call to merge into (e.g. another receiver's)
+
+        Returns:
+            dict: Group (tuple of the group_by values) -> [snr Histogram, drift Histogram]
+        """
+        groups = into if into is not None else {}
+        positions = [STATS_GROUPS.index(field) for field in group_by]
+        first = self.bucket_of(start)
+        with self._lock:
+            for bucket_start, bucket in self._buckets.items():
+                if not first <= bucket_start < end:
+                    continue
+                for key, (snr, drift) in bucket.items():
+                    if selected is not None and not selected(key):
+                        continue
+                    group = tuple(key[position] for position in positions)
+                    histograms = groups.get(group)
+                    if histograms is None:
+                        histograms = groups[group] = [Histogram(), Histogram()]
+                    histograms[0].merge(snr)
+                    histograms[1].merge(drift)
+        return groups
+
+
+def stats_records(groups, group_by=STATS_GROUPS):
+    """
+    Summarize merged histograms (see SpotStats.merged()).
+
+    Args:
+        groups (dict): Group -> [snr Histogram, drift Histogram]
+        group_by (tuple[str]): Fields of the group tuples
+
+    Returns:
+        list[dict]: One record per group with more than zero SNR values,
+        busiest first, containing the group_by fields plus:
+            - count: Spots with an SNR
+            - snr: {"median", "p90", "min", "max"} in dB
+            - drift: Same for drift in Hz (only if any WSPR spot had one)
+    """
+    records = []
+    for group, (snr, drift) in groups.items():
+        count = len(snr)
+        if not count:
+            continue
+        record = {**dict(zip(group_by, group)), "count": count, "snr": snr.summary()}
+        if drift.counts:
+            record["drift"] = drift.summary()
+        records.append(record)
+    records.sort(key=lambda record: (-record["count"], [str(record[field]) for field in group_by]))
+    return records
@@ -0,0 +1,391 @@
+"""
+HamSCI Contesting and DXing Dashboard - Spot Database Access
+
+MongoDB connection settings, index management and the timestamp migration for
+the WSPRDaemon ``spots`` collection.
+
+WSPRDaemon stores each spot's time as separate ``date`` (YYMMDD) and ``time``
+(HHMM) strings, which can only be range-queried with an ``$or`` and sort
+incorrectly across a century rollover. This module adds a native BSON datetime
+field, ``ts``, to every spot so the dashboard can query a time window with a
+single index range scan:
+
+    python spotdb.py migrate                  # backfill ts on existing spots
+    python spotdb.py migrate --follow         # ...then keep stamping new inserts
+    python spotdb.py migrate --ttl-days 60    # also expire spots after 60 days
+
+Absolute time ranges (``start``/``end``) are read in pages ordered by
+``(ts, _id)``: each page continues after the last spot of the previous one
+(keyset pagination), so no query ever skips over or holds more than one page.
+
+Configuration (environment / .env):
+    SPOT_PAGE_SIZE=1000     Spots per page of a start/end range
+    SPOT_PAGE_MAX=5000      Largest page a client may ask for
+
+Project: HamSCI Personal Space Weather Station Dashboard Development
+"""
+
+import argparse
+from datetime import datetime, timedelta, timezone
+from itertools import islice
+import os
+import time
+
+from dotenv import load_dotenv
+from pymongo import ASCENDING, MongoClient, UpdateOne
+from pymongo.errors import OperationFailure
+
+# Load environment variables from .env file
+load_dotenv()
+
+# Database Configuration
+# Connect to MongoDB instance running WSPRDaemon database
+# Database stores decoded WSPR, FT8, and FT4 spots from the PSWS receiver
+MONGODB_HOST = os.getenv('MONGODB_HOST', 'localhost')
+MONGODB_PORT = os.getenv('MONGODB_PORT', '27017')
+MONGODB_USERNAME = os.getenv('MONGODB_USERNAME', 'admin')
+MONGODB_PASSWORD = os.getenv('MONGODB_PASSWORD')
+MONGODB_DATABASE = os.getenv('MONGODB_DATABASE', 'wspr_db')
+
+# Optional retention policy (NFR-SCALE-03): expire spots this many days after ts
+SPOT_TTL_DAYS = os.getenv('SPOT_TTL_DAYS')
+
+# Set SPOT_TIME_QUERY=legacy to only query the date/time strings. The default
+# ts query also matches spots without ts on their date/time strings, so it
+# works before and during the migration as well, just more slowly.
+LEGACY_TIME_QUERY = os.getenv('SPOT_TIME_QUERY', 'ts') == 'legacy'
+
+# Page size of start/end range queries (see keyset_query())
+SPOT_PAGE_SIZE = int(os.getenv('SPOT_PAGE_SIZE', '1000'))
+SPOT_PAGE_MAX = int(os.getenv('SPOT_PAGE_MAX', '5000'))
+
+# Indexes created/verified at startup. The ts index doubles as the TTL index when
+# a retention period is configured. Band filters are frequency ranges, so the
+# band index is keyed on frequency. The (ts, _id) indexes serve the keyset
+# pages of range queries without an in-memory sort.
+SPOT_INDEXES = [
+    [("ts", ASCENDING)],
+    [("ts", ASCENDING), ("_id", ASCENDING)],
+    [("ts", ASCENDING), ("frequency", ASCENDING)],
+    [("ts", ASCENDING), ("mode", ASCENDING)],
+    [("rx_callsign", ASCENDING), ("ts", ASCENDING), ("_id", ASCENDING)],
+]
+
+# Sort order of range pages; _id breaks ties between spots of the same minute
+KEYSET_SORT = [("ts", ASCENDING), ("_id", ASCENDING)]
+
+
+def mongodb_uri():
+    """
+    Build the MongoDB connection URI from the environment settings.
+
+    Returns:
+        str: mongodb:// URI
+
+    Raises:
+        ValueError: If MONGODB_PASSWORD is not set
+    """
+    if not MONGODB_PASSWORD:
+        raise ValueError("MONGODB_PASSWORD environment variable is not set. Please create a .env file (see .env.example)")
+    return f"mongodb://{MONGODB_USERNAME}:{MONGODB_PASSWORD}@{MONGODB_HOST}:{MONGODB_PORT}"
+
+
+def get_database():
+    """
+    Connect to the WSPRDaemon MongoDB database.
+
+    Returns:
+        pymongo.database.Database: Handle to MONGODB_DATABASE
+
+    Raises:
+        ValueError: If MONGODB_PASSWORD is not set
+    """
+    client = MongoClient(mongodb_uri())
+    return client[MONGODB_DATABASE]
+
+
+def get_async_database():
+    """
+    Connect to the WSPRDaemon MongoDB database with PyMongo's asyncio client.
+
+    Used by the async server (asgi-ft.py); needs pymongo 4.13 or newer.
+
+    Returns:
+        pymongo.asynchronous.database.AsyncDatabase: Handle to MONGODB_DATABASE
+
+    Raises:
+        ValueError: If MONGODB_PASSWORD is not set
+    """
+    from pymongo import AsyncMongoClient
+
+    client = AsyncMongoClient(mongodb_uri())
+    return client[MONGODB_DATABASE]
+
+
+def spot_timestamp(date, time_str):
+    """
+    Convert WSPRDaemon date/time strings to a UTC datetime.
+
+    Args:
+        date (str): Date in YYMMDD format (e.g., "260107")
+        time_str (str): Time in HHMM format (e.g., "1430")
+
+    Returns:
+        datetime: Naive UTC datetime, or None if the strings are malformed
+
+    Example:
+        >>> spot_timestamp("260107", "1430")
+        datetime.datetime(2026, 1, 7, 14, 30)
+    """
+    try:
+        return datetime.strptime(f"{date}{time_str}", "%y%m%d%H%M")
+    except (TypeError, ValueError):
+        return None
+
+
+def window_start(minutes):
+    """
+    Oldest spot minute inside a window of the last N minutes.
+
+    Spot times have minute resolution, so the threshold is truncated to the
+    minute.
+
+    Args:
+        minutes (int): Window length in minutes
+
+    Returns:
+        datetime: Naive UTC datetime
+    """
+    threshold = datetime.utcnow() - timedelta(minutes=minutes)
+    return threshold.replace(second=0, microsecond=0)
+
+
+def spot_time_query(lastInterval):
+    """
+    Build the MongoDB filter for spots within the last N minutes.
+
+    Args:
+        lastInterval (int|str): Number of minutes to look back from current time
+
+    Returns:
+        dict: MongoDB filter (empty if lastInterval is missing or invalid)
+    """
+    if not lastInterval:
+        return {}
+    try:
+        minutes = int(lastInterval)
+    except ValueError:
+        return {}  # Invalid interval, return all documents
+
+    threshold = window_start(minutes)
+
+    threshold_date = f"{threshold.year % 100:02d}{threshold.month:02d}{threshold.day:02d}"
+    threshold_time = f"{threshold.hour:02d}{threshold.minute:02d}"
+    # Query for documents with date > threshold OR (date == threshold AND time >= threshold)
+    string_query = {"$or": [
+        {"date": {"$gt": threshold_date}},
+        {"date": threshold_date, "time": {"$gte": threshold_time}}
+    ]}
+    if LEGACY_TIME_QUERY:
+        return string_query
+
+    # Range scan on the native ts datetime (see migrate below), plus spots not
+    # stamped yet (an unmigrated database, or spots inserted since the last
+    # migrate --follow pass) matched on their strings. Missing ts values are
+    # indexed as null, so that branch only reads the unstamped spots.
+    return {"$or": [{"ts": {"$gte": threshold}}, {"ts": {"$exists": False}, **string_query}]}
+
+
+def parse_time(value):
+    """
+    Parse an ISO 8601 time from a query parameter.
+
+    Args:
+        value (str): e.g. "2026-10-10T14:30Z", "2026-10-10T14:30" or "2026-10-10";
+            times without an offset are taken as UTC
+
+    Returns:
+        datetime: Naive UTC datetime
+
+    Raises:
+        ValueError: If the value is not an ISO 8601 date/time
+
+    Example:
+        >>> parse_time("2026-10-10T16:30+02:00")
+        datetime.datetime(2026, 10, 10, 14, 30)
+    """
+    parsed = datetime.fromisoformat(value.strip())
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def spot_range_query(start, end):
+    """
+    Build the MongoDB filter for spots in an absolute time range.
+
+    Args:
+        start (datetime): First instant included (naive UTC)
+        end (datetime): First instant excluded (naive UTC)
+
+    Returns:
+        dict: MongoDB filter on ts
+    """
+    return {"ts": {"$gte": start, "$lt": end}}
+
+
+def keyset_query(ts, oid):
+    """
+    Build the MongoDB filter for spots after a page position.
+
+    Spots sort by (ts, _id) (KEYSET_SORT); the next page starts after the
+    last spot of the previous one, so the database seeks straight to it on
+    the (ts, _id) index instead of skipping the earlier pages.
+
+    Args:
+        ts (datetime): ts of the last spot already returned
+        oid (ObjectId): _id of that spot
+
+    Returns:
+        dict: MongoDB filter
+    """
+    return {"ts": {"$gte": ts}, "$or": [{"ts": {"$gt": ts}}, {"_id": {"$gt": oid}}]}
+
+
+def spot_sort():
+    """
+    Sort order for spot queries, oldest first (chronological display order).
+
+    Returns:
+        list: PyMongo sort specification
+    """
+    if LEGACY_TIME_QUERY:
+        return [("date", ASCENDING), ("time", ASCENDING)]
+    return [("ts", ASCENDING)]
+
+
+def cursor_batches(cursor, size=1000):
+    """
+    Group documents from a cursor (or any iterable) into lists.
+
+    Args:
+        cursor (iterable): Documents, e.g. a pymongo Cursor
+        size (int): Maximum documents per batch
+
+    Yields:
+        list: Up to ``size`` documents, in cursor order
+    """
+    it = iter(cursor)
+    while batch := list(islice(it, size)):
+        yield batch
+
+
+async def async_cursor_batches(cursor, size=1000):
+    """
+    Group documents from an async cursor into lists (see cursor_batches()).
+
+    Args:
+        cursor (AsyncCursor): Documents, e.g. from AsyncCollection.find()
+        size (int): Maximum documents per batch
+
+    Yields:
+        list: Up to ``size`` documents, in cursor order
+    """
+    batch = []
+    async for doc in cursor:
+        batch.append(doc)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def ensure_indexes(collection, ttl_days=None, indexes=SPOT_INDEXES):
+    """
+    Create the spot indexes if they are missing.
+
+    Safe to call on every startup; existing indexes are left alone. When
+    ``ttl_days`` is given the ts index is created (or updated in place with
+    collMod) as a TTL index so MongoDB deletes spots older than the retention
+    period. Without ``ttl_days`` an existing TTL setting is kept.
+
+    Args:
+        collection (pymongo.collection.Collection): The spots collection
+        ttl_days (int): Retention period in days, or None for no TTL change
+        indexes (list): Index key lists to create (default SPOT_INDEXES)
+    """
+    existing = {tuple(info["key"]): info for info in collection.index_information().values()}
+    ttl_seconds = int(ttl_days) * 86400 if ttl_days else None
+
+    for keys in indexes:
+        is_ts_index = keys == [("ts", ASCENDING)]
+        info = existing.get(tuple(keys))
+        if info is None:
+            options = {"expireAfterSeconds": ttl_seconds} if is_ts_index and ttl_seconds else {}
+            collection.create_index(keys, **options)
+        elif is_ts_index and ttl_seconds and info.get("expireAfterSeconds") != ttl_seconds:
+            collection.database.command(
+                "collMod", collection.name,
+                index={"keyPattern": dict(keys), "expireAfterSeconds": ttl_seconds},
+            )
+
+
+def backfill_timestamps(collection, batch_size=1000):
+    """
+    Add ``ts`` to every spot that does not have one yet.
+
+    Documents are updated in bulk batches. Spots whose date/time strings
+    cannot be parsed get ``ts: None`` so they are not revisited.
+
+    Args:
+        collection (pymongo.collection.Collection): The spots collection
+        batch_size (int): Number of updates per bulk write
+
+    Returns:
+        int: Number of documents updated
+    """
+    updated = 0
+    batch = []
+    cursor = collection.find({"ts": {"$exists": False}}, {"date": 1, "time": 1})
+    for doc in cursor:
+        ts = spot_timestamp(doc.get("date"), doc.get("time"))
+        batch.append(UpdateOne({"_id": doc["_id"]}, {"$set": {"ts": ts}}))
+        if len(batch) >= batch_size:
+            updated += collection.bulk_write(batch, ordered=False).modified_count
+            batch = []
+    if batch:
+        updated += collection.bulk_write(batch, ordered=False).modified_count
+    return updated
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Spot database maintenance")
+    sub = parser.add_subparsers(dest="command", required=True)
+    migrate = sub.add_parser("migrate", help="backfill ts and create indexes")
+    migrate.add_argument("--ttl-days", type=int, default=SPOT_TTL_DAYS,
+                         help="expire spots this many days after ts (30-90 recommended)")
+    migrate.add_argument("--batch-size", type=int, default=1000)
+    migrate.add_argument("--follow", action="store_true",
+                         help="keep stamping newly inserted spots")
+    migrate.add_argument("--poll", type=float, default=10.0,
+                         help="seconds between passes with --follow")
+    args = parser.parse_args()
+
+    collection = get_database()['spots']
+    try:
+        ensure_indexes(collection, ttl_days=args.ttl_days)
+    except OperationFailure as err:
+        print(f"Could not create indexes: {err}")
+
+    while True:
+        updated = backfill_timestamps(collection, batch_size=args.batch_size)
+        if updated or not args.follow:
+            print(f"Stamped ts on {updated} spots")
+        if not args.follow:
+            break
+        time.sleep(args.poll)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+"""
+HamSCI Contesting and DXing Dashboard - Startup Time Report
+
+Records how long each phase of server startup takes, so the effect of
+startup changes (lazy zone loading, dropped imports) can be tracked. The
+dashboard logs one line per process (INFO on the Flask app logger) when
+web-ft.py has loaded:
+
+    Startup 0.62 s: imports 0.41 s, receivers 0.08 s, grid table 0.01 s, ... peak RSS 88 MB
+
+Project: HamSCI Personal Space Weather Station Dashboard Development
+"""
+
+import sys
+import time
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+
+def peak_rss_mb():
+    """
+    Peak resident set size of this process.
+
+    Returns:
+        float: Megabytes, or None where the platform does not report it
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+class StartupReport:
+    """
+    Stopwatch for named startup phases.
+
+    Example:
+        >>> report = StartupReport()
+        >>> report.mark("imports")
+        >>> report.summary()
+        'Startup 0.41 s: imports 0.41 s, peak RSS 88 MB'
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages = []
+        self._last = self.started
+
+    def mark(self, name):
+        """
+        Close the current phase.
+
+        Args:
+            name (str): Label for the time since the previous mark
+        """
+        now = time.perf_counter()
+        self.stages.append((name, now - self._last))
+        self._last = now
+
+    def summary(self):
+        """
+        Format the phases recorded so far.
+
+        Returns:
+            str: One-line report with the total, each phase and peak RSS
+        """
+        parts = [f"{name} {seconds:.2f} s" for name, seconds in self.stages]
+        peak = peak_rss_mb()
+        if peak is not None:
+            parts.append(f"peak RSS {peak:.0f} MB")
+        return f"Startup {self._last - self.started:.2f} s: " + ", ".join(parts)
@@ -4,10 +4,16 @@
  * Interactive Leaflet map for visualizing HF propagation using WSPR, FT8, and FT4 digital mode spots.
  * This script handles:
  * - Loading and displaying propagation spots on a world map
- * - Client-side filtering by band, country, continent, CQ zone, ITU zone, and mode
- * - Real-time updates with configurable auto-reload intervals
+ * - Server-side filtering by band, country, continent, CQ zone, ITU zone, and mode
+ * - Live updates over Server-Sent Events (/spots/stream): new spots are drawn
+ *   and expired ones removed without redrawing the map; timed reloads remain
+ *   available and are used automatically if the stream is unavailable
+ * - Replay of a past range (/spots/replay) at accelerated speed, e.g. to
+ *   review how the bands opened during last weekend's contest
+ * - Heatmap of Maidenhead cells (/spots?aggregate=cells) when zoomed out, so
+ *   a busy window is a few hundred rectangles instead of thousands of paths
  * - Band-specific colored markers (star icons) for visual identification
- * - Geographic lookups using Turf.js point-in-polygon operations
+ * - CQ zone outline overlay (zone labels placed with Turf.js)
  * - Session storage for filter persistence across page reloads
  *
  * Author: Owen Ruzanski (KD3ALD)
@@ -17,61 +23,18 @@
  * Dependencies:
  * - Leaflet.js (map library)
  * - Leaflet.ExtraMarkers (colored star markers)
- * - Turf.js (geospatial analysis - point in polygon)
- * - GeoJSON data files (countries, continents, CQ zones, ITU zones)
+ * - Turf.js (polygon centers for CQ zone labels)
+ * - CQ zone GeoJSON (zone outline overlay)
+ *
+ * Country, continent, CQ zone and ITU zone filtering is done by the server
+ * (/spots) using precomputed zone attributes, so the browser no longer loads
+ * boundary polygons or runs point-in-polygon tests for every spot.
  */
 
-// Global arrays to store GeoJSON feature collections for geographic lookups
-// These are loaded asynchronously on page load
-let countryFeat = [];      // Country boundary polygons (~250 countries)
-let continentFeat = [];    // Continent boundary polygons (7 continents)
-let cqZoneFeat = [];       // CQ zone polygons (40 zones for amateur radio contests)
-let ITUZoneFeat = [];      // ITU zone polygons (90 zones for telecommunications)
-
-// Contest bands filter - limits display to the 6 traditional HF contest bands
-// Excludes WARC bands (30m, 17m, 12m) where contesting is prohibited
-const CONTEST_BANDS = ["160m", "80m", "40m", "20m", "15m", "10m"];
+// CQ zone polygons (40 zones for amateur radio contests), loaded on page load for the outline overlay
+let cqZoneFeat = [];
 
 
-/**
- * Load country boundary polygons from GeoJSON file.
- *
- * Fetches the countries.geojson file (14MB) containing boundary polygons
- * for all world countries. Used for country-based filtering.
- *
- * @async
- * @returns {Promise<void>}
- */
-async function loadCountryPolygons() {
-  try {
-    const res = await fetch("js/countries.geojson");
-    const data = await res.json();
-    countryFeat = data.features;
-    console.log("Loaded", countryFeat.length, "country polygons");
-  } catch (err) {
-    console.error("Failed to load countries.geojson", err);
-  }
-}
-
-/**
- * Load continent boundary polygons from GeoJSON file.
- *
- * Fetches the continents.geojson file (4KB) containing polygons for
- * the 7 continents. Used for continent-based filtering.
- *
- * @async
- * @returns {Promise<void>}
- */
-async function loadContinentPolygons() {
-  try {
-    const res = await fetch("js/continents.geojson");
-    const data = await res.json();
-    continentFeat = data.features;
-    console.log("Loaded", continentFeat.length, "continent polygons")
-  } catch (e) {
-    console.error("Failed to load continent GeoJSON", e);
-  }
-}
 // async function loadCqZones() {
 //   try {
 //     const res = await fetch("js/cqzones.geojson");
@@ -95,14 +58,43 @@ async function loadContinentPolygons() {
 //   }
 // }
 
+// Simplified CQ zone outlines per zoom band from /zones/manifest.json (built by
+// zone_assets.py); empty if the server has none, then the full GeoJSON is used
+let cqZoneLevels = null;
+let cqZoneUrl = null;
+
+async function loadZoneLevels(layer) {
+  try {
+    const res = await fetch("/zones/manifest.json");
+    if (!res.ok) return [];
+    const manifest = await res.json();
+    return manifest.layers[layer].levels;
+  } catch (e) {
+    return [];
+  }
+}
+
+// Outline file for the current zoom: the first band whose max_zoom covers it
+function cqZoneFile() {
+  const zoom = map.getZoom();
+  const level = cqZoneLevels.find(l => l.max_zoom === null || zoom <= l.max_zoom);
+  return level ? level.url : "js/cqzones.geojson";
+}
+
   async function loadCqZones() {
     try {
-      const res = await fetch("js/cqzones.geojson");
+      if (cqZoneLevels === null) cqZoneLevels = await loadZoneLevels("cq_zone");
+      const url = cqZoneFile();
+      if (url === cqZoneUrl) return;
+      cqZoneUrl = url;
+
+      const res = await fetch(url);
       const data = await res.json();
       cqZoneFeat = data.features;
-      console.log("Loaded", cqZoneFeat.length, "CQ zones");
+      console.log("Loaded", cqZoneFeat.length, "CQ zones from", url);
 
       // Remove old layer if it exists
+      const shown = cqZoneBordersLayer && map.hasLayer(cqZoneBordersLayer);
       if (cqZoneBordersLayer) {
         map.removeLayer(cqZoneBordersLayer);
       }
@@ -116,32 +108,34 @@ async function loadContinentPolygons() {
         }
       });
 
-      // Add CQ zone number labels
-      cqZoneLabelsLayer = L.layerGroup();
-
-      cqZoneFeat.forEach(feature => {
-          const zoneNum = feature.properties.cq_zone_number;
-
-          // Compute the center of the polygon
-          const center = turf.center(feature).geometry.coordinates; 
-          const lat = center[1];
-          const lon = center[0];
-
-          // Add a simple Leaflet div marker
-          const label = L.divIcon({
-              className: "cq-zone-label",
-              html: `<b>${zoneNum}</b>`,
-              iconSize: [20, 20],
-              iconAnchor: [10, 10]
-          });
-
-          const marker = L.marker([lat, lon], { icon: label });
-          cqZoneLabelsLayer.addLayer(marker);
-      });
+      // Add CQ zone number labels (once; they do not depend on the zoom)
+      if (!cqZoneLabelsLayer) {
+        cqZoneLabelsLayer = L.layerGroup();
+
+        cqZoneFeat.forEach(feature => {
+            const zoneNum = feature.properties.cq_zone_number;
+
+            // Center of the polygon: precomputed by the server, or computed here
+            // for the full GeoJSON
+            const [lat, lon] = feature.properties.label ||
+              turf.center(feature).geometry.coordinates.slice().reverse();
+
+            // Add a simple Leaflet div marker
+            const label = L.divIcon({
+                className: "cq-zone-label",
+                html: `<b>${zoneNum}</b>`,
+                iconSize: [20, 20],
+                iconAnchor: [10, 10]
+            });
+
+            const marker = L.marker([lat, lon], { icon: label });
+            cqZoneLabelsLayer.addLayer(marker);
+        });
+      }
 
       // Add it only if checkbox is checked
       const cb = document.getElementById("cqOutline");
-      if (cb && cb.checked) {
+      if (shown || (cb && cb.checked)) {
         cqZoneBordersLayer.addTo(map);
       }
 
@@ -151,16 +145,6 @@ async function loadContinentPolygons() {
   }
 
 
-async function loadITUZones() {
-  try {
-    const res = await fetch("js/ituzones.geojson");
-    const data = await res.json();
-    ITUZoneFeat = data.features;
-    console.log("Loaded", ITUZoneFeat.length, "ITU Zones");
-  } catch (e) {
-    console.error("Failed to load ITU Zones", e);
-  }
-}
 // generate cq-zones select
 const select1 = document.getElementById("cqZoneFilter");
 
@@ -178,95 +162,6 @@ for (let i = 1; i <= 90; i++) {
   opt.textContent = i;
   select2.appendChild(opt);
 }
-/**
- * Lookup country name from geographic coordinates.
- *
- * Uses Turf.js point-in-polygon test against country boundary polygons
- * to determine which country contains the given coordinates.
- *
- * @param {number} lat - Latitude in decimal degrees
- * @param {number} lon - Longitude in decimal degrees
- * @returns {string} Country name or "Unknown" if not found
- *
- * @example
- * lookupCountry(40.7128, -74.0060) // "United States of America"
- */
-function lookupCountry(lat, lon) {
-  const pt = turf.point([lon, lat]);
-  for (const feature of countryFeat) {
-    if (turf.booleanPointInPolygon(pt, feature)) {
-      return feature.properties.name || "Unknown";
-    }
-  }
-  return "Unknown";
-}
-
-/**
- * Lookup continent name from geographic coordinates.
- *
- * @param {number} lat - Latitude in decimal degrees
- * @param {number} lon - Longitude in decimal degrees
- * @returns {string|null} Continent name or null if not found
- *
- * @example
- * lookupContinent(40.7128, -74.0060) // "North America"
- */
-function lookupContinent(lat, lon) {
-  const pt = turf.point([lon, lat]);
-  for (const feature of continentFeat) {
-    if (turf.booleanPointInPolygon(pt, feature)) {
-      return feature.properties.continent || "Unknown";
-    }
-  }
-  return null;
-}
-
-/**
- * Lookup CQ zone number from geographic coordinates.
- *
- * CQ zones are numbered 1-40 and are used for amateur radio
- * contests and awards (e.g., Worked All Zones - WAZ).
- *
- * @param {number} lat - Latitude in decimal degrees
- * @param {number} lon - Longitude in decimal degrees
- * @returns {string} CQ zone number (1-40) or "Unknown"
- *
- * @example
- * lookupCqZone(40.7128, -74.0060) // "5" (New York is in CQ zone 5)
- */
-function lookupCqZone(lat, lon) {
-  const pt = turf.point([lon, lat]);
-  for (const feature of cqZoneFeat) {
-    if (turf.booleanPointInPolygon(pt, feature)) {
-      return String(feature.properties.cq_zone_number);
-    }
-  }
-  return "Unknown";
-}
-
-/**
- * Lookup ITU zone number from geographic coordinates.
- *
- * ITU zones are numbered 1-90 and are defined by the International
- * Telecommunication Union for amateur radio purposes.
- *
- * @param {number} lat - Latitude in decimal degrees
- * @param {number} lon - Longitude in decimal degrees
- * @returns {string} ITU zone number (1-90) or "Unknown"
- *
- * @example
- * lookupITUZone(40.7128, -74.0060) // "8" (New York is in ITU zone 8)
- */
-function lookupITUZone(lat, lon) {
-  const pt = turf.point([lon, lat]);
-  for (const feature of ITUZoneFeat) {
-    if (turf.booleanPointInPolygon(pt, feature)) {
-      return String(feature.properties.itu_zone_number);
-    }
-  }
-  return "Unknown";
-}
-
 //format date
 // removed date input conversion helper (UI no longer supports date filtering)
 
@@ -281,6 +176,9 @@ var map = L.map('map').setView([20, 0], 2);
 
 //cq zone overlay
 let cqZoneBordersLayer = null;
+let cqZoneLabelsLayer = null;
+// Swap in the outline file for the new zoom band
+map.on("zoomend", loadCqZones);
 
 
 
@@ -408,250 +306,451 @@ function reverseWsprDate(dateStr) {
 // band counts out for tables / charts
 let bandCountsOut = {};
 
+//all possible color options
+const markerColors = [
+  'red', 'orange-dark', 'orange', 'yellow', 'blue-dark',
+  'cyan', 'purple', 'violet', 'pink',
+  'green-dark', 'green', 'green-light',
+  'black', 'white'
+];
 
-async function loadSpots() {
-
-  //all possible color options
-  const markerColors = [
-    'red', 'orange-dark', 'orange', 'yellow', 'blue-dark',
-    'cyan', 'purple', 'violet', 'pink',
-    'green-dark', 'green', 'green-light',
-    'black', 'white'
-  ];
-  //band color map
-  const bandColorMap = {
-    '160m': 'black',
-    '80m': 'red',
-    '60m': 'orange-dark',
-    '40m': 'orange',
-    '30m': 'yellow',
-    '20m': 'green',
-    '17m': 'green-light',
-    '15m': 'cyan',
-    '12m': 'blue-dark',
-    '10m': 'blue-dark',
-    '6m': 'purple',
-    '4m': 'violet',
-    '2m': 'pink',
-    '70cm': 'white',
-    'unknown': 'green-dark'
-  };
-  
-  
-  const markers = {};
-  markerColors.forEach(color => {
-    markers[color] = L.ExtraMarkers.icon({
-      icon: 'fa-coffee',
-      markerColor: color,
-      shape: 'star',
-      prefix: 'fa',
+// star icons per color, created on first use (ExtraMarkers loads after this script)
+let markerIcons = null;
+function getMarkerIcons() {
+  if (!markerIcons) {
+    markerIcons = {};
+    markerColors.forEach(color => {
+      markerIcons[color] = L.ExtraMarkers.icon({
+        icon: 'fa-coffee',
+        markerColor: color,
+        shape: 'star',
+        prefix: 'fa',
+      });
     });
-  });
-  
+  }
+  return markerIcons;
+}
 
-// load all params, build url , load json
+// Links currently drawn: link id -> { link, band, decodes, layers }
+// One path and two markers per TX -> RX link (tx, rx, band, mode), not per
+// decode. Links from /spots?aggregate=links arrive complete (decodes is null);
+// decodes from live updates are folded into their link and kept in `decodes`
+// ({id, time, snr}) so expired ones can be taken off again.
+const drawnLinks = new Map();
+// Spot ids already folded into a link, so a repeated delta is not counted twice
+const seenSpots = new Set();
+// Links whose decodes changed since their popups were last rendered
+const dirtyLinks = new Set();
+let bandCounts = {};
+let decodeCount = 0;
+// Callsigns of the receivers with drawn spots, for the title
+const receiverSigns = new Set();
+
+// Zoomed out, transmitters are drawn binned into Maidenhead cells
+// (/spots?aggregate=cells) instead of one path per link
+const cellLayer = L.layerGroup().addTo(map);
+// Precision of the drawn cells ("field" or "square"), null while links are drawn
+let cellView = null;
+let cellCount = 0;
+
+// load all params and build the /spots query string
+function spotQueryParams() {
   const lastInterval = document.getElementById("lastInterval").value || getQueryParam("lastInterval") || 15;
   const selectedBand = getQueryParam("band") || document.getElementById("bandFilter").value;
   const selectedCountry = document.getElementById("countryFilter").value;
   const selectedContinent = document.getElementById("continentFilter").value;
   const selectedCqZone = document.getElementById("cqZoneFilter").value;
   const selectedITUZone = document.getElementById("ITUZoneFilter").value;
+  const allowWSPR = document.getElementById("modeWSPR").checked;
+  const allowFT8  = document.getElementById("modeFT8").checked;
+  const allowFT4  = document.getElementById("modeFT4").checked;
+  const selectedModes = [];
+  if (allowWSPR) selectedModes.push("wspr");
+  if (allowFT8)  selectedModes.push("ft8");
+  if (allowFT4)  selectedModes.push("ft4");
+
+  // All filtering happens on the server; only matching spots are returned
   const queryParams = new URLSearchParams();
   queryParams.set("lastInterval", lastInterval);
-  // no date/time params sent to server; server only supports lastInterval
   if (selectedBand) queryParams.set("band", selectedBand);
   if (selectedCountry) queryParams.set("country", selectedCountry);
   if (selectedContinent) queryParams.set("continent", selectedContinent)
-  const res = await fetch(`/spots?${queryParams.toString()}`);
-  //console.log(`/spots?${queryParams.toString()}`)
-  const spots = await res.json();
+  // "CBs" is a band selection, not a CQ zone
+  if (selectedCqZone && selectedCqZone !== "CBs") queryParams.set("cqzone", selectedCqZone);
+  if (selectedITUZone) queryParams.set("ITUzone", selectedITUZone);
+  // None or all modes checked means "All modes"
+  if (selectedModes.length > 0 && selectedModes.length < 3) queryParams.set("mode", selectedModes.join(","));
+  // Receivers to show (?rx=id,id); the server defaults to all of them
+  const selectedReceivers = getQueryParam("rx");
+  if (selectedReceivers) queryParams.set("rx", selectedReceivers);
+  return queryParams;
+}
 
-  // set spot info h3 and title
-  const readableDate = `${lastInterval} minutes`; // show the minutes window
-  const readableTime = "recent";
-  const countryName = selectedCountry || "all countries";
-  const bandName1 = getQueryParam("band") || "All Bands"
+// remove every drawn link and cell
+function clearSpots() {
+  drawnLinks.forEach(entry => entry.layers.forEach(layer => map.removeLayer(layer)));
+  drawnLinks.clear();
+  cellLayer.clearLayers();
+  cellView = null;
+  cellCount = 0;
+  seenSpots.clear();
+  dirtyLinks.clear();
+  bandCounts = {};
+  decodeCount = 0;
+  receiverSigns.clear();
+}
 
+// same id as the server's link records (links.py)
+function linkId(spot) {
+  return `${spot.tx_sign}_${spot.rx_sign}_${spot.band}_${spot.mode}`;
+}
 
-  layers.forEach(layer => map.removeLayer(layer));
-  layers = [];
+function validCoordinates(item) {
+  return !(
+    isNaN(item.tx_lat) || isNaN(item.tx_lon) ||
+    isNaN(item.rx_lat) || isNaN(item.rx_lon) ||
+    item.tx_lat < -90 || item.tx_lat > 90 ||
+    item.tx_lon < -180 || item.tx_lon > 180 ||
+    item.rx_lat < -90 || item.rx_lat > 90 ||
+    item.rx_lon < -180 || item.rx_lon > 180
+  );
+}
 
-  let bandCounts = {};
-  let firstRxLat = null;
-  let firstRxLon = null;
-  let centered = true;
-  let mapped = 0;
+// draw the path and TX/RX markers of a link
+function drawLink(link) {
+  //freq to band (band/mode/geo filters were already applied by the server)
+  const bandName = frequencyToBand(link.frequency) || 'unknown';
+
+  receiverSigns.add(link.rx_sign);
+  const title = document.getElementById("title");
+  title.textContent = receiverSigns.size > 1
+    ? `WSPR Spots From ${[...receiverSigns].join(", ")} PSWS Receivers`
+    : `WSPR Spots From ${link.rx_sign} PSWS Receiver`
+
+  //colored markers
+  const markers = getMarkerIcons();
+  const markerColor = bandColorMap[bandName] || 'black';
+  const icon = markers[markerColor] || markers['black'];
+  if (!markers[markerColor]) {
+    console.warn(`Missing marker color for band: ${bandName}, color: ${markerColor}`);
+  }
 
-  //map each spot 
-  const spotCountsMap = {};
-  spots.forEach(spot => {
-    const key = `${spot.tx_sign}_${spot.rx_sign}_${spot.frequency}`;
-    spotCountsMap[key] = (spotCountsMap[key] || 0) + 1;
-    if (!centered && spot.rx_lat && spot.rx_lon) {
-      map.setView([spot.rx_lat, spot.rx_lon]);
-      centered = true;
-    }
-    if (
-      isNaN(spot.tx_lat) || isNaN(spot.tx_lon) ||
-      isNaN(spot.rx_lat) || isNaN(spot.rx_lon) ||
-      spot.tx_lat < -90 || spot.tx_lat > 90 ||
-      spot.tx_lon < -180 || spot.tx_lon > 180 ||
-      spot.rx_lat < -90 || spot.rx_lat > 90 ||
-      spot.rx_lon < -180 || spot.rx_lon > 180
-    ) {
-      return; // skip invalid coordinates
-    }
-    // FILTER BY MODE (WSPR, FT8, FT4)
-    const modeLower = (spot.mode || "").toLowerCase();
+  const path = L.polyline([
+    [link.tx_lat, link.tx_lon],
+    [link.rx_lat, link.rx_lon]
+  ], { color: 'grey' }).addTo(map);
+  const txMarker = L.marker([link.tx_lat, link.tx_lon], { icon: icon }).addTo(map);
+  const rxMarker = L.marker([link.rx_lat, link.rx_lon]).addTo(map);
 
-    const allowWSPR = document.getElementById("modeWSPR").checked;
-    const allowFT8  = document.getElementById("modeFT8").checked;
-    const allowFT4  = document.getElementById("modeFT4").checked;
+  const entry = { link, band: bandName, decodes: null, layers: [path, txMarker, rxMarker] };
+  drawnLinks.set(link.id, entry);
+  return entry;
+}
 
-    if (!allowWSPR && !allowFT8 && !allowFT4) {
-        // treat as "All modes"
-    } else {
-        if (modeLower === "wspr" && !allowWSPR) return;
-        if (modeLower === "ft8"  && !allowFT8)  return;
-        if (modeLower === "ft4"  && !allowFT4)  return;
-    }
+// popup body shared by the path and both markers
+function linkPopup(link, heading) {
+  const snr = link.count > 1
+    ? `${link.snr_last} dB (${link.snr_min} to ${link.snr_max})`
+    : `${link.snr_last} dB`;
+  const heard = link.count > 1
+    ? `${parseWsprTime(link.first_seen)} to ${parseWsprTime(link.last_seen)}`
+    : parseWsprTime(link.last_seen);
+  return `${heading}
+    <b>SNR:</b> ${snr}<br>
+    <b>Drift:</b> ${link.drift}<br>
+    <b>Freq:</b> ${link.frequency} MHz<br>
+    <b>Time:</b> ${heard}<br>
+    <b>Band:</b> ${link.band}<br>
+    <b>Decoded Spots:</b> ${link.count}<br>
+    <b>Mode:</b> ${link.mode.toUpperCase()}
+  `;
+}
 
-    //map by country
-    const tx_country = lookupCountry(spot.tx_lat, spot.tx_lon);
-    if (selectedCountry === "nonUS") {
-      if (tx_country === "United States of America") return;  // skip US
-    }
+function bindLinkPopups(entry) {
+  const link = entry.link;
+  const tx = `<a href="https://qrz.com/db/${link.tx_sign}">${link.tx_sign}</a>`;
+  const [path, txMarker, rxMarker] = entry.layers;
+  path.bindPopup(linkPopup(link, `<b>TX:</b> ${tx} ➔ <b>RX:</b> ${link.rx_sign}<br>`));
+  txMarker.bindPopup(linkPopup(link, `<b>Received Spot by ${link.rx_sign}</b><br><b>TX:</b> ${tx}<br>`));
+  rxMarker.bindPopup(linkPopup(link, `<b>Receiver</b><br><b>RX:</b> ${link.rx_sign}<br><b>TX:</b> ${tx}<br>`));
+}
 
-    else if (selectedCountry && selectedCountry !== "" && selectedCountry !== "all") {
-      if (tx_country !== selectedCountry) return;  // skip non-matching country
+// draw one link record from /spots?aggregate=links
+function addLink(link) {
+  if (drawnLinks.has(link.id) || !validCoordinates(link)) return;
+  const entry = drawLink(link);
+  bandCounts[entry.band] = (bandCounts[entry.band] || 0) + link.count;
+  decodeCount += link.count;
+  bindLinkPopups(entry);
 }
-    //map by cont.
-    const tx_continent = lookupContinent(spot.tx_lat, spot.tx_lon);
-    if(selectedContinent && tx_continent !== selectedContinent){
-      return; //skip spot
-    }
-    //map by cq zone
-    const tx_cqzone = lookupCqZone(spot.tx_lat, spot.tx_lon);
 
-    // If user selected "All zones" (blank), skip filtering
-    if (selectedCqZone === "" || selectedCqZone === null) {
-      // do nothing
-    }
-    // Normal numeric zone filtering
-    else if (selectedCqZone !== "CBs") {   // Do NOT zone-filter CBs mode
-      if (tx_cqzone !== String(selectedCqZone)) {
-        return; // Skip spots not in this CQ zone
-      }
-    }
+// fold one decode from a live update into its link
+function addSpot(spot) {
+  if (seenSpots.has(spot.id) || !validCoordinates(spot)) return;
+  seenSpots.add(spot.id);
+  const id = linkId(spot);
+  let entry = drawnLinks.get(id);
+  if (!entry) {
+    entry = drawLink({
+      id, tx_sign: spot.tx_sign, rx_sign: spot.rx_sign, band: spot.band, mode: spot.mode,
+      tx_lat: spot.tx_lat, tx_lon: spot.tx_lon, rx_lat: spot.rx_lat, rx_lon: spot.rx_lon,
+      frequency: spot.frequency, first_seen: spot.time,
+    });
+    entry.decodes = [];
+  }
+  // the latest decode sets the position, frequency and drift shown
+  Object.assign(entry.link, {
+    tx_lat: spot.tx_lat, tx_lon: spot.tx_lon, frequency: spot.frequency, drift: spot.drift,
+    last_seen: spot.time,
+  });
+  entry.decodes.push({ id: spot.id, time: spot.time, snr: spot.snr });
+  bandCounts[entry.band] = (bandCounts[entry.band] || 0) + 1;
+  decodeCount += 1;
+  dirtyLinks.add(entry);
+}
+
+// recompute the counts and SNR range of links changed by addSpot/expireSpots
+function refreshLinks() {
+  dirtyLinks.forEach(entry => {
+    if (drawnLinks.get(entry.link.id) !== entry) return;
+    const decodes = entry.decodes;
+    const snrs = decodes.map(decode => decode.snr).filter(snr => snr !== null && snr !== undefined);
+    Object.assign(entry.link, {
+      count: decodes.length,
+      first_seen: decodes[0].time,
+      last_seen: decodes[decodes.length - 1].time,
+      snr_last: decodes[decodes.length - 1].snr,
+      snr_min: snrs.length ? Math.min(...snrs) : null,
+      snr_max: snrs.length ? Math.max(...snrs) : null,
+    });
+    bindLinkPopups(entry);
+  });
+  dirtyLinks.clear();
+}
 
-    //map by itu zone
-     const tx_ITUzone = lookupITUZone(spot.tx_lat, spot.tx_lon);
-    if(selectedITUZone && tx_ITUzone !== selectedITUZone){
-      return; //skip spot
+function removeDecodes(entry, count) {
+  bandCounts[entry.band] -= count;
+  if (!bandCounts[entry.band]) delete bandCounts[entry.band];
+  decodeCount -= count;
+}
+
+// drop decodes older than the window cutoff ("YYMMDD HHMM", same format as spot.time),
+// and links with none left
+function expireSpots(cutoff) {
+  drawnLinks.forEach((entry, id) => {
+    if (entry.link.last_seen < cutoff) {
+      entry.layers.forEach(layer => map.removeLayer(layer));
+      removeDecodes(entry, entry.decodes ? entry.decodes.length : entry.link.count);
+      if (entry.decodes) entry.decodes.forEach(decode => seenSpots.delete(decode.id));
+      drawnLinks.delete(id);
+      return;
     }
+    if (!entry.decodes || entry.decodes[0].time >= cutoff) return;
+    const kept = entry.decodes.filter(decode => decode.time >= cutoff);
+    entry.decodes.forEach(decode => { if (decode.time < cutoff) seenSpots.delete(decode.id); });
+    removeDecodes(entry, entry.decodes.length - kept.length);
+    entry.decodes = kept;
+    dirtyLinks.add(entry);
+  });
+}
 
-    
-    //freq to band
-    // const bandName = frequencyToBand(spot.frequency) || 'unknown';
-    // if (selectedBand && bandName !== selectedBand) {
-    //   return; // skip this spot if it doesn't match the filter
-    // }
-    // bandCounts[bandName] = (bandCounts[bandName] || 0) + 1;
+// refresh the spot counter, heading text and band legend
+function updateSpotInfo() {
+  const lastInterval = document.getElementById("lastInterval").value || getQueryParam("lastInterval") || 15;
+  const selectedCountry = document.getElementById("countryFilter").value;
 
+  // set spot info h3 and title
+  const readableDate = `${lastInterval} minutes`; // show the minutes window
+  const countryName = selectedCountry || "all countries";
+  const bandName1 = getQueryParam("band") || "All Bands"
+  const shapes = cellView
+    ? `in ${cellCount} grid ${cellView}${cellCount !== 1 ? "s" : ""}`
+    : `on ${drawnLinks.size} path${drawnLinks.size !== 1 ? "s" : ""}`;
 
-    //freq to band
-    const bandName = frequencyToBand(spot.frequency) || 'unknown';
+  //dynamic num spots mapped
+  if (decodeCount > 0) {
+    const spotInfo = document.getElementById("spot-info");
+    const replayed = replayClock ? ` up to ${replayClock} UTC (replay)` : "";
+    spotInfo.textContent = `Found ${decodeCount} spot${decodeCount !== 1 ? "s" : ""} ${shapes} from ${countryName} for last ${readableDate}${replayed} on ${bandName1}`;
+  }
 
-    // "Contest Bands Only" mode
-    if (selectedBand === "CBs") {
-      if (!CONTEST_BANDS.includes(bandName)) {
-        return; // skip non-contest bands
-      }
-    }
-    // Normal single-band filter
-    else if (selectedBand && bandName !== selectedBand) {
-      return; // skip this spot if it doesn't match the selected band
-    }
+  spotCountControl.update(bandCounts);
+  bandCountsOut = bandCounts;
+}
 
-    bandCounts[bandName] = (bandCounts[bandName] || 0) + 1;
 
+// rebuild spot objects from a format=columns response (see wire_format.py)
+function decodeColumns(table) {
+  const spots = [];
+  for (let i = 0; i < table.count; i++) {
+    const spot = { ...table.constants };
+    for (const [field, column] of Object.entries(table.columns)) {
+      const dictionary = table.dictionaries[field];
+      spot[field] = dictionary ? dictionary[column[i]] : column[i];
+    }
+    spots.push(spot);
+  }
+  return spots;
+}
 
-    //dynamic num spots mapped and title
-    mapped++;
-    const spotInfo = document.getElementById("spot-info");
-    spotInfo.textContent = `Found ${mapped} spot${mapped !== 1 ? "s" : ""} from ${countryName} for last ${readableDate} on ${bandName1}`;
-    const title = document.getElementById("title");
-    title.textContent = `WSPR Spots From ${spot.rx_sign} PSWS Receiver`
+// cell size for the current zoom, or null to draw individual links
+function cellPrecision() {
+  const zoom = map.getZoom();
+  if (zoom <= 1) return "field";
+  if (zoom <= 4) return "square";
+  return null;
+}
 
-    //num decoded per spot
-    const spotKey = `${spot.tx_sign}_${spot.rx_sign}_${spot.frequency}`;
-    const spotCount = spotCountsMap[spotKey];
-    
+// draw one cell record from /spots?aggregate=cells, shaded by decode count
+// and colored by its busiest band
+function addCell(cell, maxCount) {
+  const [band] = Object.entries(cell.bands).sort(([, a], [, b]) => b - a)[0];
+  const hex = colorHexMap[bandColorMap[band] || 'black'] || '000000';
+  const bands = Object.entries(cell.bands)
+    .sort(([a], [b]) => bandOrder.indexOf(a) - bandOrder.indexOf(b))
+    .map(([name, count]) => `${name}: ${count}`)
+    .join("<br>");
+  L.rectangle(cell.bounds, {
+    color: `#${hex}`,
+    weight: 1,
+    fillOpacity: 0.15 + 0.6 * Math.sqrt(cell.count / maxCount),
+  }).bindPopup(`
+    <b>Grid ${cellView}:</b> ${cell.cell}<br>
+    <b>Decoded Spots:</b> ${cell.count}<br>
+    <b>Transmitters:</b> ${cell.stations}<br>
+    <b>Best SNR:</b> ${cell.best_snr} dB<br>
+    <b>Last Heard:</b> ${parseWsprTime(cell.last_seen)}<br>
+    ${bands}
+  `).addTo(cellLayer);
+  Object.entries(cell.bands).forEach(([name, count]) => {
+    bandCounts[name] = (bandCounts[name] || 0) + count;
+  });
+  decodeCount += cell.count;
+  cellCount += 1;
+}
 
-    //colored markers
-    const markerColor = bandColorMap[bandName] || 'black';
-    const icon = markers[markerColor] || markers['black'];
+async function loadCells(precision) {
+  const params = spotQueryParams();
+  params.set("aggregate", "cells");
+  params.set("cell", precision);
+  params.set("format", "columns");
+  const res = await fetch(`/spots?${params.toString()}`);
+  const cells = decodeColumns(await res.json());
+
+  clearSpots();
+  cellView = precision;
+  // records arrive busiest first
+  const maxCount = cells.length ? cells[0].count : 1;
+  cells.forEach(cell => addCell(cell, maxCount));
+  updateSpotInfo();
+}
 
+async function loadSpots() {
+  const precision = cellPrecision();
+  if (precision) return loadCells(precision);
+  // one record per TX -> RX link instead of per decode, in the columnar
+  // format: constant receiver fields and repeated callsigns/bands are sent
+  // once instead of on every link
+  const params = spotQueryParams();
+  params.set("aggregate", "links");
+  params.set("format", "columns");
+  const res = await fetch(`/spots?${params.toString()}`);
+  const links = decodeColumns(await res.json());
+
+  clearSpots();
+  links.forEach(addLink);
+  updateSpotInfo();
+  console.log(bandCountsOut)
+}
 
-    const path = L.polyline([
-      [spot.tx_lat, spot.tx_lon],
-      [spot.rx_lat, spot.rx_lon]
-    ], { color: 'grey' }).addTo(map);
+// Live updates: /spots/stream sends the window once, then only new spots
+let spotStream = null;
+// Cursor of the last delta applied (for /spots?since= polling)
+let spotCursor = null;
+
+// apply a delta from /spots/stream or /spots?since=
+function applySpotUpdate(update) {
+  if (update.reset) clearSpots();
+  update.spots.forEach(addSpot);
+  expireSpots(update.cutoff);
+  refreshLinks();
+  updateSpotInfo();
+  spotCursor = update.cursor;
+}
+
+// fetch only the spots added since the last delta
+async function pollSpotChanges() {
+  const params = spotQueryParams();
+  params.set("since", spotCursor || "0");
+  const res = await fetch(`/spots?${params.toString()}`);
+  if (res.ok) applySpotUpdate(await res.json());
+}
 
-    if (!markers[markerColor]) {
-      console.warn(`Missing marker color for band: ${bandName}, color: ${markerColor}`);
+function startLiveUpdates() {
+  stopLiveUpdates();
+  spotStream = new EventSource(`/spots/stream?${spotQueryParams().toString()}`);
+  spotStream.onmessage = (event) => applySpotUpdate(JSON.parse(event.data));
+  spotStream.onerror = () => {
+    // CLOSED means the server refused the stream (e.g. spot cache disabled
+    // or window too long); fall back to polling for deltas. Otherwise the
+    // browser reconnects by itself (the server also ends each stream after a
+    // few minutes) and the new stream resumes after the last event's id.
+    if (spotStream && spotStream.readyState === EventSource.CLOSED) {
+      console.warn("Live updates unavailable, falling back to polling");
+      stopLiveUpdates();
+      spotCursor = null;
+      pollSpotChanges();
+      reloadTimer = setInterval(pollSpotChanges, 30 * 1000);
     }
-    //make tx markers
-    const txMarker = L.marker([spot.tx_lat, spot.tx_lon], {
-      icon: icon
-    }).addTo(map);
-    txMarker.bindPopup(`
-      <b>Received Spot by ${spot.rx_sign}</b><br>
-      <b>TX:</b> <a href="https://qrz.com/db/${spot.tx_sign}">${spot.tx_sign}</a><br>
-      <b>SNR:</b> ${spot.snr} dB<br>
-      <b>Drift:</b> ${spot.drift}<br>
-      <b>Freq:</b> ${spot.frequency} MHz<br>
-      <b>Time:</b> ${parseWsprTime(spot.time)}<br>
-      <b>Band:</b> ${spot.band} <br>
-      <b>Mode:</b>  ${spot.mode.toUpperCase()}
-
-    `);
-
-    //make rx markers
-    const rxMarker = L.marker([spot.rx_lat, spot.rx_lon]).addTo(map);
-    rxMarker.bindPopup(`
-      <b>Receiver</b><br>
-      <b>RX:</b> ${spot.rx_sign}<br>
-      <b>TX:</b> <a href="https://qrz.com/db/${spot.tx_sign}">${spot.tx_sign}</a><br>
-      <b>SNR:</b> ${spot.snr} dB<br>
-      <b>Drift:</b> ${spot.drift}<br>
-      <b>Freq:</b> ${spot.frequency} MHz<br>
-      <b>Time:</b> ${parseWsprTime(spot.time)}<br>
-      <b>Band:</b> ${spot.band}</br>
-      <b>Mode:</b>  ${spot.mode.toUpperCase()}
-
-    `);
-
-    path.bindPopup(`
-      <b>TX:</b> <a href="https://qrz.com/db/${spot.tx_sign}">${spot.tx_sign}</a> ➔ <b>RX:</b> ${spot.rx_sign}<br>
-      <b>SNR:</b> ${spot.snr} dB<br>
-      <b>Drift:</b> ${spot.drift}<br>
-      <b>Freq:</b> ${spot.frequency} MHz<br>
-      <b>Time:</b> ${parseWsprTime(spot.time)}<br>
-      <b>Band:</b> ${spot.band} <br>
-      <b>Decoded Spots:</b> ${spotCount} </br>
-      <b>Mode:</b>  ${spot.mode.toUpperCase()}
-
-    `);
-
-    layers.push(path, txMarker, rxMarker);
+  };
+}
 
-    
-  });
+function stopLiveUpdates() {
+  if (spotStream) {
+    spotStream.close();
+    spotStream = null;
+  }
+}
 
-  spotCountControl.update(bandCounts);
-  bandCountsOut = bandCounts;
-  console.log(bandCountsOut)
+// Replay: /spots/replay sends one event per replayed minute, in the
+// /spots/stream format, plus the minute being replayed
+let replayClock = null;
+
+function startReplay() {
+  const start = document.getElementById("replayStart").value;
+  if (!start) return;
+  setReloadInterval(0);
+  // datetime-local values have no offset; the inputs are labelled UTC
+  const params = spotQueryParams();
+  params.set("start", `${start}Z`);
+  const end = document.getElementById("replayEnd").value;
+  if (end) params.set("end", `${end}Z`);
+  params.set("speed", document.getElementById("replaySpeed").value);
+  spotStream = new EventSource(`/spots/replay?${params.toString()}`);
+  spotStream.onmessage = (event) => {
+    const update = JSON.parse(event.data);
+    replayClock = update.time;
+    applySpotUpdate(update);
+    // the last event; closing keeps the browser from starting over
+    if (update.done) stopLiveUpdates();
+  };
+  spotStream.onerror = () => {
+    if (spotStream && spotStream.readyState === EventSource.CLOSED) {
+      console.warn("Replay unavailable");
+      stopLiveUpdates();
+    }
+  };
+}
+
+// reload with the current filters, live or one-off
+function refreshSpots() {
+  if (document.getElementById("reloadInterval").value === "live") {
+    setReloadInterval("live");
+  } else {
+    stopLiveUpdates();
+    replayClock = null;
+    loadSpots();
+  }
 }
 
 //reload interval
@@ -660,8 +759,17 @@ let reloadTimer = null;
 function setReloadInterval(seconds) {
   if (reloadTimer) {
     clearInterval(reloadTimer);
+    reloadTimer = null;
   }
-  if (seconds > 0) {
+  stopLiveUpdates();
+  replayClock = null;
+  if (seconds === "live" && cellPrecision()) {
+    // cells are not streamed; refetch them while zoomed out
+    loadSpots();
+    reloadTimer = setInterval(loadSpots, 30 * 1000);
+  } else if (seconds === "live") {
+    startLiveUpdates();
+  } else if (seconds > 0) {
     reloadTimer = setInterval(() => {
       window.location.reload();
     }, seconds * 1000);
@@ -671,12 +779,7 @@ function setReloadInterval(seconds) {
 
 
 window.addEventListener('DOMContentLoaded', async () => {
-  await loadCountryPolygons();
-  await loadContinentPolygons();
   await loadCqZones();
-  await loadITUZones();
-  //console.log(lookupContinent(40.7128, -74.0060))
-  //console.log(lookupCqZone(40.7128, -74.0060))
 
 
   const update = document.getElementById("updateButton")
@@ -702,21 +805,30 @@ window.addEventListener('DOMContentLoaded', async () => {
   const continentSaved = sessionStorage.getItem("continent") || getQueryParam("continent")
   const CQZoneSaved = sessionStorage.getItem("cqzone") || getQueryParam("cqzone")
   const ITUZoneSaved = sessionStorage.getItem("ITUzone") || getQueryParam("ITUzone")
-  if (savedInterval) {
-    select.value = savedInterval;
-    setReloadInterval(parseInt(savedInterval, 10));
-  }
+  if (savedInterval) select.value = savedInterval;
   if (intervalSaved) intervalInput.value = intervalSaved;
   if (countrySaved) countrySelect.value = countrySaved;
   if (continentSaved) continentSelect.value = continentSaved;
   if(CQZoneSaved) cqZoneSelect.value = CQZoneSaved
   if(ITUZoneSaved) ITUZoneSelect.value = ITUZoneSaved
-  loadSpots();
 
+  // "live" streams updates (and sends the initial window); otherwise load once
+  const parseReload = (value) => value === "live" ? "live" : parseInt(value, 10);
+  setReloadInterval(parseReload(select.value));
+  if (select.value !== "live") loadSpots();
+
+
+  document.getElementById("replayButton").addEventListener("click", startReplay);
+
+  // switch between cells and links (or cell sizes) when the zoom crosses a
+  // threshold; a replay keeps drawing links
+  map.on("zoomend", () => {
+    if (!replayClock && cellPrecision() !== cellView) refreshSpots();
+  });
 
   select.addEventListener("change", () => {
     
-    const interval = parseInt(select.value, 10);
+    const interval = parseReload(select.value);
     sessionStorage.setItem("reloadInterval", interval);
     setReloadInterval(interval);
   });
@@ -761,8 +873,7 @@ window.addEventListener('DOMContentLoaded', async () => {
     const country = document.getElementById("countryFilter").value;
     sessionStorage.setItem("country", country);
 
-    // Do NOT pass "nonUS" to the backend — client filters it
-    if (country && country !== "nonUS") {
+    if (country) {
       params.set("country", country);
     } else {
       params.delete("country");
@@ -799,7 +910,7 @@ window.addEventListener('DOMContentLoaded', async () => {
     window.history.replaceState(null, "", newUrl);
 
     // Now load spots with new params
-    loadSpots();
+    refreshSpots();
     //window.location.reload();
   });
 
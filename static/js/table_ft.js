@@ -2,15 +2,19 @@
  * HamSCI Contesting Dashboard - Table View (table_ft.js)
  *
  * Provides a tabular view of band openings organized by geographic region.
- * Aggregates WSPR/FT8/FT4 spots from the last N minutes and displays counts
- * in a matrix format showing which bands are open to which regions.
+ * Fetches the region x band x mode spot counts for the last N minutes from
+ * /tbsummary (aggregated on the server) and displays them in a matrix format
+ * showing which bands are open to which regions.
  *
  * Features:
- * - Regional grouping based on CQ zones
+ * - Regional grouping based on CQ zones (mapping lives in regions.py)
  * - Displays only the 6 contest bands (160m, 80m, 40m, 20m, 15m, 10m)
  * - Highlights active bands with green background when threshold is met
  * - Mode filtering (WSPR/FT8/FT4)
- * - Auto-reload capability with configurable intervals
+ * - Live updates over Server-Sent Events (/tbspots/stream): counts are
+ *   adjusted as spots arrive and expire, with timed reloads as a fallback
+ * - Band opening alerts (/openings/stream): paths the server finds busier
+ *   than usual for the hour are outlined, and openings/closings are listed
  *
  * Author: Owen Ruzanski (KD3ALD)
  * Organization: University of Scranton (W3USR), Frankford Radio Club
@@ -23,162 +27,220 @@ let reloadTimer = null;
 /**
  * Configure automatic spot reloading interval.
  *
- * @param {number} seconds - Reload interval in seconds (0 to disable)
+ * @param {number|string} seconds - Reload interval in seconds (0 to disable),
+ *   or "live" to stream updates instead of polling
  */
 function setReloadInterval(seconds) {
   if (reloadTimer) clearInterval(reloadTimer);
+  reloadTimer = null;
+  stopLiveUpdates();
 
-  if (seconds > 0) {
+  if (seconds === "live") {
+    startLiveUpdates();
+  } else if (seconds > 0) {
     reloadTimer = setInterval(() => {
       loadSpots();
     }, seconds * 1000);
   }
 }
 
-// Station callsign for display purposes
-const call = "KD3ALD"
+// Live update stream and the spots it has delivered that are still in the window
+let spotStream = null;
+let liveSpots = [];
+let liveCounts = {};
+let spotCursor = null;
 
 /**
- * CQ Zone to Region mapping.
+ * Stream table spots from /tbspots/stream and keep the counts current.
  *
- * Maps the 40 CQ zones to human-readable geographic regions
- * for display in the table view. Allows operators to quickly
- * identify which parts of the world are reachable on each band.
+ * The first event carries the whole window; later events carry only new
+ * spots plus a cutoff time, and spots older than the cutoff are subtracted.
+ * Falls back to polling /tbspots?since= if the server refuses the stream.
+ */
+function startLiveUpdates() {
+  stopLiveUpdates();
+  const { params, threshold } = tableParams();
+  spotStream = new EventSource(`/tbspots/stream?${params.toString()}`);
+
+  spotStream.onmessage = (event) => applySpotUpdate(JSON.parse(event.data), threshold);
+
+  spotStream.onerror = () => {
+    if (spotStream && spotStream.readyState === EventSource.CLOSED) {
+      console.warn("Live updates unavailable, falling back to polling");
+      stopLiveUpdates();
+      spotCursor = null;
+      pollSpotChanges();
+      reloadTimer = setInterval(pollSpotChanges, 30 * 1000);
+    }
+  };
+}
+
+/**
+ * Apply a delta from /tbspots/stream or /tbspots?since= to the counts.
+ *
+ * @param {Object} update - {reset, cursor, cutoff, spots}
+ * @param {number} threshold - Green threshold for buildTable
+ */
+function applySpotUpdate(update, threshold) {
+  if (update.reset) {
+    liveSpots = [];
+    liveCounts = {};
+  }
+  for (const spot of update.spots) {
+    liveSpots.push(spot);
+    countSpot(spot, 1);
+  }
+  // "YYMMDD HHMM" strings sort chronologically
+  const kept = [];
+  for (const spot of liveSpots) {
+    if (spot.time >= update.cutoff) kept.push(spot); else countSpot(spot, -1);
+  }
+  liveSpots = kept;
+  spotCursor = update.cursor;
+  buildTable(liveCounts, TABLE_BANDS, threshold);
+}
+
+/**
+ * Fetch only the spots added since the last delta (polling fallback).
+ *
+ * @async
+ * @returns {Promise<void>}
+ */
+async function pollSpotChanges() {
+  const { params, threshold } = tableParams();
+  params.set("since", spotCursor || "0");
+  const res = await fetch(`/tbspots?${params.toString()}`);
+  if (res.ok) applySpotUpdate(await res.json(), threshold);
+}
+
+function stopLiveUpdates() {
+  if (spotStream) {
+    spotStream.close();
+    spotStream = null;
+  }
+}
+
+function countSpot(spot, delta) {
+  const bands = liveCounts[spot.region] = liveCounts[spot.region] || {};
+  bands[spot.band] = (bands[spot.band] || 0) + delta;
+}
+
+// Reload with the current settings, live or one-off
+function refreshSpots() {
+  if (document.getElementById("reloadInterval").value === "live") {
+    setReloadInterval("live");
+  } else {
+    loadSpots();
+  }
+}
+
+// Band opening alerts: region -> band -> true for open paths, plus the latest events
+let openingStream = null;
+let openPaths = {};
+let openingEvents = [];
+
+/**
+ * Follow /openings/stream for the contest bands and selected modes.
  *
- * Region Categories:
- * - Europe: Western/Central Europe
- * - Caribbean: Caribbean islands
- * - South America: All of South America
- * - Japan: Japanese islands
- * - Africa: African continent
- * - VK: Australia/New Zealand
- * - YB: Indonesia
- * - China: Mainland China
- * - UA9: Asiatic Russia (Siberia)
- * - Indian: Indian subcontinent
- * - Middle East: Middle Eastern countries
- * - Thailand: Southeast Asia (Thailand region)
- * - North America: USA, Canada, Alaska, Mexico
- * - Oceania: Pacific islands
+ * Each event lists the paths open now (outlined in the table) and any new
+ * opening/closing events, which are shown newest first below the table.
  */
-const regionZones = {
-    "Europe":       [14, 15, 16, 20],
-    "Caribbean":    [8],
-    "South America":[9, 10, 11, 12, 13],
-    "Japan":        [25],
-    "Africa":       [33, 34, 35, 36, 37, 38, 39],
-    "VK":           [29, 30],
-    "YB":           [27, 28],
-    "China":        [23, 24],
-    "UA9":          [17, 18, 19],
-    "Indian":       [22],
-    "Middle East":  [21],
-    "Thailand":     [26],
-    "North America":[1, 2, 3, 4, 5, 6, 7, 40],
-    "Oceania":      [31, 32]
+function startOpeningAlerts() {
+  if (openingStream) openingStream.close();
+  const { params, threshold } = tableParams();
+  params.delete("lastInterval");
+  openingStream = new EventSource(`/openings/stream?${params.toString()}`);
+  openingStream.onmessage = (event) => {
+    const update = JSON.parse(event.data);
+    openPaths = {};
+    for (const path of update.open) {
+      (openPaths[path.region] = openPaths[path.region] || {})[path.band] = true;
+    }
+    openingEvents = update.events.reverse().concat(openingEvents).slice(0, 10);
+    document.getElementById("openingsLog").innerHTML = openingEvents.map(e =>
+      `${e.time.slice(7, 9)}:${e.time.slice(9)} UTC ${e.band} ${(e.mode || "").toUpperCase()} ${e.type} to ${e.region}` +
+      ` (${e.rate}/min, usually ${e.baseline}/min)`
+    ).join("<br>");
+    if (lastCounts) buildTable(lastCounts, TABLE_BANDS, threshold);
   };
-  
+  openingStream.onerror = () => {
+    if (openingStream && openingStream.readyState === EventSource.CLOSED) {
+      console.warn("Band opening alerts unavailable");
+      openingStream = null;
+    }
+  };
+}
+
+// Receivers shown in the table (?rx=id,id selects them; default: all)
+const receiverIds = new URLSearchParams(window.location.search).get("rx");
+
+// Station callsign(s) for display purposes, filled in from /receivers
+let call = "KD3ALD"
+
+async function loadReceivers() {
+  const res = await fetch("/receivers");
+  if (!res.ok) return;
+  const wanted = (receiverIds || "").split(",").filter(Boolean);
+  const receivers = await res.json();
+  const selected = receivers.filter(r => wanted.includes(r.id));
+  call = (selected.length ? selected : receivers).map(r => r.callsign).join(", ");
+}
+
+// The 6 contest bands shown in the table
+const TABLE_BANDS = ["160m","80m","40m","20m","15m","10m"];
+
   /**
-   * Map CQ zone number to geographic region name.
+   * Fetch the region x band spot counts and rebuild the table.
    *
-   * @param {number|string} cqZone - CQ zone number (1-40)
-   * @returns {string} Region name or "Unknown" if invalid zone
+   * Mode filtering and region aggregation happen on the server; the
+   * response is already the finished region -> band -> mode matrix.
    *
-   * @example
-   * getRegionFromCQ(5)  // "North America" (CQ zone 5 is eastern USA)
-   * getRegionFromCQ(14) // "Europe" (CQ zone 14 is Western Europe)
+   * @async
+   * @returns {Promise<void>}
    */
-  function getRegionFromCQ(cqZone) {
-    // Convert to number safely
-    const num = Number(cqZone);
-
-    // Validate zone number (1-40)
-    if (!num || num < 1 || num > 40) {
-      return "Unknown";
-    }
+  async function loadSpots() {
+    const { params, threshold } = tableParams();
+    const res = await fetch(`/tbsummary?${params.toString()}`);
+    const summary = await res.json();
 
-    // Search for zone in region mapping
-    for (const [region, zones] of Object.entries(regionZones)) {
-      if (zones.includes(num)) return region;
+    // region → band → count (summed over the selected modes)
+    const counts = {};
+    for (const [region, bandModes] of Object.entries(summary.counts)) {
+      counts[region] = {};
+      for (const [band, modeCounts] of Object.entries(bandModes)) {
+        counts[region][band] = Object.values(modeCounts).reduce((a, b) => a + b, 0);
+      }
     }
 
-    // Zone not in any defined region
-    return "Unknown";
+    buildTable(counts, TABLE_BANDS, threshold);
   }
 
-
   /**
-   * Parse spot timestamp from database format to JavaScript Date.
+   * Read the table settings into query parameters for the summary/stream.
    *
-   * Database stores dates as "YYMMDD HHMM" strings in UTC.
-   * Example: "260107 1430" = January 7, 2026 at 14:30 UTC
-   *
-   * @param {string} t - Timestamp string in "YYMMDD HHMM" format
-   * @returns {Date} JavaScript Date object in UTC
-   *
-   * @example
-   * parseTableTime("260107 1430") // Date object: 2026-01-07 14:30:00 UTC
+   * @returns {{params: URLSearchParams, threshold: number}}
    */
-  function parseTableTime(t) {
-    const yy = Number(t.slice(0, 2)) + 2000;  // YY → YYYY
-    const mm = Number(t.slice(2, 4)) - 1;     // Month (0-11 for JS Date)
-    const dd = Number(t.slice(4, 6));         // Day
-    const HH = Number(t.slice(7, 9));         // Hour
-    const MM = Number(t.slice(9, 11));        // Minute
-    return new Date(Date.UTC(yy, mm, dd, HH, MM));
-  }
-  
-  async function loadSpots() {
+  function tableParams() {
     const mins = Number(document.getElementById("lastInterval").value) || 15;
     const threshold = Number(document.getElementById("threshold").value) || 1;
-  
-    const res = await fetch(`/tbspots?lastInterval=${mins}`);
-    const spots = await res.json();
-  
-    const now = Date.now();
-    const cutoff = now - mins * 60 * 1000;
-  
-    // Filter time
-    const recent = spots.filter(s => parseTableTime(s.time).getTime() >= cutoff);
-  
-    // region → band → count
-    const counts = {};
-    const bands = ["160m","80m","40m","20m","15m","10m"];
-    const total = 0;
-  
-    recent.forEach(s => {
-      // MODE FILTER
-      const allowWSPR = document.getElementById("modeWSPR").checked;
-      const allowFT8  = document.getElementById("modeFT8").checked;
-      const allowFT4  = document.getElementById("modeFT4").checked;
-
-      // Normalize mode from backend (wspr / ft8 / ft4)
-      const mode = (s.mode || "").toLowerCase();
-
-      // If none selected → treat as "all modes"
-      if (!allowWSPR && !allowFT8 && !allowFT4) {
-          // allow everything
-      } else {
-          if (mode === "wspr" && !allowWSPR) return;
-          if (mode === "ft8"  && !allowFT8)  return;
-          if (mode === "ft4"  && !allowFT4)  return;
-      }
 
-      const region = getRegionFromCQ(s.cq_zone);
-      if (!region) return;
-  
-      const band = s.band;  // ✔ using backend band directly
-      if (!bands.includes(band)) return;
-  
-      if (!counts[region]) counts[region] = {};
-      if (!counts[region][band]) counts[region][band] = 0;
-      counts[region][band]++;
-    });
-  
-    buildTable(counts, bands, threshold);
+    // MODE FILTER (none or all checked → all modes)
+    const modes = [];
+    if (document.getElementById("modeWSPR").checked) modes.push("wspr");
+    if (document.getElementById("modeFT8").checked)  modes.push("ft8");
+    if (document.getElementById("modeFT4").checked)  modes.push("ft4");
+
+    const params = new URLSearchParams({ lastInterval: mins, band: "CBs" });
+    if (modes.length > 0 && modes.length < 3) params.set("mode", modes.join(","));
+    if (receiverIds) params.set("rx", receiverIds);
+    return { params, threshold };
   }
   
+  // last counts drawn, so opening alerts can redraw the table
+  let lastCounts = null;
+
   function buildTable(counts, bands, threshold) {
+    lastCounts = counts;
     let total = 0;
     for (const region of Object.keys(counts)) {
         for (const band of bands) {
@@ -213,11 +275,13 @@ const regionZones = {
       html += "<tr>";
       bands.forEach(b => {
         const v = counts[r1]?.[b] || 0;
-        html += `<td class='${v >= threshold ? "value" : ""}'>${v || ""}</td>`;
+        const opening = openPaths[r1]?.[b] ? " opening" : "";
+        html += `<td class='${v >= threshold ? "value" : ""}${opening}'>${v || ""}</td>`;
       });
       bands.forEach(b => {
         const v = counts[r2]?.[b] || 0;
-        html += `<td class='${v >= threshold ? "value" : ""}'>${v || ""}</td>`;
+        const opening = openPaths[r2]?.[b] ? " opening" : "";
+        html += `<td class='${v >= threshold ? "value" : ""}${opening}'>${v || ""}</td>`;
       });
       html += "</tr>";
     }
@@ -227,20 +291,24 @@ const regionZones = {
     document.getElementById("spotsTableContainer").innerHTML = html;
   }
   
-  document.getElementById("updateButton").addEventListener("click", loadSpots);
-  window.addEventListener("DOMContentLoaded", function(){
-    loadSpots()
+  document.getElementById("updateButton").addEventListener("click", () => {
+    refreshSpots();
+    startOpeningAlerts();
+  });
+  window.addEventListener("DOMContentLoaded", async function(){
+    await loadReceivers();
     const reloadSelect = document.getElementById("reloadInterval");
+    const parseReload = (value) => value === "live" ? "live" : Number(value);
 
-    // restore any saved setting
+    // restore any saved setting; "live" sends the initial window itself
     const savedInterval = sessionStorage.getItem("tableReloadInterval");
-    if (savedInterval) {
-    reloadSelect.value = savedInterval;
-    setReloadInterval(Number(savedInterval));
-    }
+    if (savedInterval) reloadSelect.value = savedInterval;
+    setReloadInterval(parseReload(reloadSelect.value));
+    if (reloadSelect.value !== "live") loadSpots();
+    startOpeningAlerts();
 
     reloadSelect.addEventListener("change", () => {
-    const seconds = Number(reloadSelect.value);
+    const seconds = parseReload(reloadSelect.value);
     sessionStorage.setItem("tableReloadInterval", seconds);
     setReloadInterval(seconds);
     });
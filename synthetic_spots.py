@@ -0,0 +1,241 @@
+"""
+HamSCI Contesting and DXing Dashboard - Synthetic Spot Generator
+
+Generates WSPRDaemon-shaped spot documents for benchmarks (bench-ft.py) and
+local development, so query and enrichment performance can be measured
+without a live receiver database. The generator models:
+
+- a fixed pool of transmitting stations, clustered where amateur activity is
+  (Europe, North America, Japan, ...) with a thin worldwide background, each
+  with a 6- or 4-character locator and a home mode
+- a configurable spots-per-minute rate with a daily cycle
+- band and mode mixes (weights per band / mode)
+- contest periods: during a contest the rate is multiplied and the WARC bands
+  fall silent, like a CQ WW or ARRL DX weekend
+- a small share of malformed grids ("RR73", ""), as FT8 decodes produce
+
+Output is deterministic for a given seed.
+
+Example:
+    >>> from synthetic_spots import SpotGenerator
+    >>> docs = list(SpotGenerator(spots_per_minute=50, seed=1).spots(minutes=60))
+    >>> sorted(docs[0])
+    ['band', 'callsign', 'date', 'drift', 'frequency', 'grid', 'mode', 'rx_callsign', 'snr', 'time', 'ts']
+
+Project: HamSCI Personal Space Weather Station Dashboard Development
+"""
+
+from datetime import datetime, timedelta, timezone
+import math
+import random
+
+import maidenhead
+
+# Relative share of spots per band at a northern-hemisphere receiver
+BAND_MIX = {
+    "160m": 2, "80m": 6, "40m": 18, "30m": 8, "20m": 30,
+    "17m": 7, "15m": 12, "12m": 3, "10m": 10, "6m": 4,
+}
+
+MODE_MIX = {"ft8": 70, "ft4": 10, "wspr": 20}
+
+# Bands without contests (see bands.py)
+WARC_BANDS = {"30m", "17m", "12m"}
+
+# Dial frequencies in MHz per band and mode; decodes land a little above
+DIAL_FREQUENCIES = {
+    "160m": {"ft8": 1.840, "ft4": 1.840, "wspr": 1.8366},
+    "80m": {"ft8": 3.573, "ft4": 3.575, "wspr": 3.5686},
+    "40m": {"ft8": 7.074, "ft4": 7.0475, "wspr": 7.0386},
+    "30m": {"ft8": 10.136, "ft4": 10.140, "wspr": 10.1387},
+    "20m": {"ft8": 14.074, "ft4": 14.080, "wspr": 14.0956},
+    "17m": {"ft8": 18.100, "ft4": 18.104, "wspr": 18.1046},
+    "15m": {"ft8": 21.074, "ft4": 21.140, "wspr": 21.0946},
+    "12m": {"ft8": 24.915, "ft4": 24.919, "wspr": 24.9246},
+    "10m": {"ft8": 28.074, "ft4": 28.180, "wspr": 28.1246},
+    "6m": {"ft8": 50.313, "ft4": 50.318, "wspr": 50.293},
+}
+
+# Audio passband of each mode above the dial frequency, in Hz
+AUDIO_OFFSETS = {"ft8": (200, 3000), "ft4": (200, 3000), "wspr": (1400, 1600)}
+
+# (mean dB, spread dB, lowest decodable dB) per mode
+SNR_MODEL = {"ft8": (-10, 7, -24), "ft4": (-8, 6, -17), "wspr": (-18, 7, -31)}
+
+# Activity clusters: (lat, lon, lat spread, lon spread, weight, callsign prefixes)
+ACTIVITY_CLUSTERS = [
+    (50.0, 10.0, 6.0, 12.0, 34, ("DL", "G", "F", "I", "EA", "PA", "OK", "SP")),
+    (40.0, -80.0, 5.0, 8.0, 20, ("K", "W", "N", "VE")),
+    (38.0, -115.0, 6.0, 7.0, 8, ("K", "W", "N")),
+    (55.0, 60.0, 6.0, 30.0, 6, ("UA", "R", "UN")),
+    (36.0, 138.0, 3.0, 4.0, 8, ("JA", "JH", "JR")),
+    (-32.0, 145.0, 5.0, 8.0, 4, ("VK",)),
+    (-23.0, -47.0, 8.0, 8.0, 5, ("PY", "LU")),
+    (-28.0, 26.0, 5.0, 6.0, 2, ("ZS",)),
+    (18.0, -70.0, 4.0, 8.0, 3, ("KP4", "HI", "CO")),
+    (25.0, 80.0, 8.0, 15.0, 4, ("VU", "BY", "HS")),
+]
+
+# Share of stations placed uniformly anywhere on the globe
+BACKGROUND_SHARE = 0.04
+
+# Share of spots whose grid field is not a usable locator
+MALFORMED_GRIDS = ("RR73", "", "73", "R-12")
+MALFORMED_SHARE = 0.005
+
+
+def contest_weekends(start, end):
+    """
+    Weekend contest periods (Saturday 00:00 to Monday 00:00 UTC) in a range.
+
+    Args:
+        start (datetime): Range start (naive UTC)
+        end (datetime): Range end (naive UTC)
+
+    Returns:
+        list[tuple[datetime, datetime]]: (start, end) of each weekend that
+        overlaps the range
+
+    Example:
+        >>> contest_weekends(datetime(2026, 11, 25), datetime(2026, 12, 1))
+        [(datetime.datetime(2026, 11, 28, 0, 0), datetime.datetime(2026, 11, 30, 0, 0))]
+    """
+    saturday = datetime(start.year, start.month, start.day) - timedelta(days=(start.weekday() - 5) % 7)
+    periods = []
+    while saturday < end:
+        period = (saturday, saturday + timedelta(days=2))
+        if period[1] > start:
+            periods.append(period)
+        saturday += timedelta(days=7)
+    return periods
+
+
+def _weighted(rng, weights):
+    names = list(weights)
+    return rng.choices(names, weights=[weights[name] for name in names])[0]
+
+
+class SpotGenerator:
+    """
+    Reproducible source of synthetic spot documents for one receiver.
+
+    Args:
+        spots_per_minute (float): Average spots per minute outside contests
+        band_mix (dict): Band -> relative weight (default BAND_MIX)
+        mode_mix (dict): Mode -> relative weight (default MODE_MIX)
+        stations (int): Size of the transmitting station pool
+        contests (list[tuple[datetime, datetime]]): Contest periods (naive UTC)
+        contest_factor (float): Rate multiplier during contests
+        rx_callsign (str): Receiver callsign stored in each spot
+        seed (int): Random seed
+    """
+
+    def __init__(self, spots_per_minute=50, band_mix=None, mode_mix=None, stations=2000,
+                 contests=(), contest_factor=4.0, rx_callsign="KD3ALD", seed=0):
+        self.spots_per_minute = spots_per_minute
+        self.band_mix = dict(band_mix or BAND_MIX)
+        self.mode_mix = dict(mode_mix or MODE_MIX)
+        self.contests = list(contests)
+        self.contest_factor = contest_factor
+        self.rx_callsign = rx_callsign
+        self.rng = random.Random(seed)
+        self.stations = [self._station(number) for number in range(stations)]
+        self._contest_mix = {band: weight for band, weight in self.band_mix.items() if band not in WARC_BANDS}
+
+    def _station(self, number):
+        rng = self.rng
+        if rng.random() < BACKGROUND_SHARE:
+            lat = math.degrees(math.asin(rng.uniform(-1, 1)))  # uniform over the sphere
+            lon = rng.uniform(-180, 180)
+            prefix = rng.choice(("VP8", "ZL", "5B", "9J", "A6", "TF", "KH6"))
+        else:
+            lat, lon, lat_spread, lon_spread, _, prefixes = rng.choices(
+                ACTIVITY_CLUSTERS, weights=[cluster[4] for cluster in ACTIVITY_CLUSTERS])[0]
+            lat = max(-89.9, min(89.9, rng.gauss(lat, lat_spread)))
+            lon = (rng.gauss(lon, lon_spread) + 180) % 360 - 180
+            prefix = rng.choice(prefixes)
+        suffix = "".join(rng.choice("ABCDEFGHIJKLMNOPQRSTUVWXYZ") for _ in range(rng.choice((2, 3))))
+        grid = maidenhead.to_maiden(lat, lon, precision=3 if rng.random() < 0.7 else 2)
+        return {
+            "callsign": f"{prefix}{number % 10}{suffix}",
+            "grid": grid,
+            "lat": lat,
+            "lon": lon,
+            "mode": _weighted(rng, self.mode_mix),
+        }
+
+    def in_contest(self, minute):
+        """Check whether a minute falls in one of the contest periods."""
+        return any(start <= minute < end for start, end in self.contests)
+
+    def rate(self, minute):
+        """
+        Expected spots in one minute.
+
+        Args:
+            minute (datetime): Minute (naive UTC)
+
+        Returns:
+            float: Average spots for that minute, following a daily cycle that
+            peaks around 15 UTC, times contest_factor during contests
+        """
+        daily = 1 + 0.35 * math.cos(2 * math.pi * (minute.hour + minute.minute / 60 - 15) / 24)
+        return self.spots_per_minute * daily * (self.contest_factor if self.in_contest(minute) else 1)
+
+    def spot(self, minute, contest=False):
+        """
+        Generate one spot document.
+
+        Args:
+            minute (datetime): Spot minute (naive UTC)
+            contest (bool): Use the contest band mix
+
+        Returns:
+            dict: WSPRDaemon spot document with ``ts``
+        """
+        rng = self.rng
+        station = rng.choice(self.stations)
+        # Most stations stay in their home mode; some switch
+        mode = station["mode"] if rng.random() < 0.8 else _weighted(rng, self.mode_mix)
+        band = _weighted(rng, self._contest_mix if contest and self._contest_mix else self.band_mix)
+        low, high = AUDIO_OFFSETS[mode]
+        frequency = round(DIAL_FREQUENCIES[band][mode] + rng.uniform(low, high) / 1e6, 6)
+        mean, spread, floor = SNR_MODEL[mode]
+        grid = station["grid"]
+        if rng.random() < MALFORMED_SHARE:
+            grid = rng.choice(MALFORMED_GRIDS)
+        return {
+            "callsign": station["callsign"],
+            "rx_callsign": self.rx_callsign,
+            "grid": grid,
+            "frequency": frequency,
+            "band": band,
+            "mode": mode,
+            "snr": max(floor, min(25, round(rng.gauss(mean, spread)))),
+            "drift": rng.choice((-1, 0, 0, 0, 0, 1)) if mode == "wspr" else 0,
+            "date": minute.strftime("%y%m%d"),
+            "time": minute.strftime("%H%M"),
+            "ts": minute,
+        }
+
+    def spots(self, minutes, end=None):
+        """
+        Generate the spots of a time range, oldest first.
+
+        Args:
+            minutes (int): Length of the range in minutes
+            end (datetime): Last minute of the range (naive UTC, default: now)
+
+        Yields:
+            dict: Spot documents in time order
+        """
+        if end is None:
+            end = datetime.now(timezone.utc).replace(tzinfo=None)
+        end = end.replace(second=0, microsecond=0)
+        for offset in range(minutes - 1, -1, -1):
+            minute = end - timedelta(minutes=offset)
+            contest = self.in_contest(minute)
+            # Decode counts vary by about +-20% from one cycle to the next
+            count = round(self.rate(minute) * self.rng.uniform(0.8, 1.2))
+            for _ in range(count):
+                yield self.spot(minute, contest)
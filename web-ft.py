@@ -6,7 +6,7 @@ Contesting and DXing Dashboard. It provides real-time HF propagation data for am
 by fetching WSPR, FT8, and FT4 digital mode spots from a MongoDB database.
 
 The application supports multiple filtering options including:
-- Time-based filtering (last N minutes)
+- Time-based filtering (last N minutes, or an absolute start/end range read in pages)
 - Band filtering (160m through 2m)
 - Country/continent filtering
 - CQ zone and ITU zone filtering
@@ -17,302 +17,1831 @@ Organization: University of Scranton (W3USR), Frankford Radio Club
 Project: HamSCI Personal Space Weather Station Dashboard Development
 """
 
-from flask import Flask, jsonify, render_template, request
-from pymongo import MongoClient
-import maidenhead
-from geopy.geocoders import Nominatim
-from datetime import datetime, timedelta
-app = Flask(__name__,static_url_path='', static_folder='static', template_folder='templates')
-import geopandas as gpd
-from shapely.geometry import shape, Point
-import json
+from startup_report import StartupReport
+
+startup = StartupReport()
+
+from flask import Flask, Response, g, jsonify, render_template, request, send_file, stream_with_context
 import os
-from dotenv import load_dotenv
+import time
+from bson import ObjectId
+from bson.errors import InvalidId
+import pymongo
+from pymongo import ASCENDING
+from pymongo.errors import PyMongoError
+app = Flask(__name__,static_url_path='', static_folder='static', template_folder='templates')
+
+# Startup report and warnings go to app.logger (stderr unless configured otherwise)
+app.logger.setLevel(os.getenv('LOG_LEVEL', 'INFO').upper())
+
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+import contextvars
+from datetime import datetime, timedelta
+from functools import partial
+import heapq
+from itertools import islice
+
+from band_openings import OpeningDetector
+from bands import BAND_EDGES, CONTEST_BANDS, band_query, band_selected, band_switch
+from grid_table import load_grid_table
+from grid_cells import CELL_PRECISIONS, CellAggregator, cell_pipeline
+from links import LinkAggregator
+from metrics import (CACHE_LOOKUPS, METRICS_ENABLED, PROMETHEUS_CONTENT_TYPE, Gauge, count_spots,
+                     finish_timings, record_stage, render_metrics, stage, start_timings, timed_batches)
+from profiler import PROFILER_ENABLED, folded, sample_stacks
+from receivers import load_receivers, receiver_collection, receiver_query, select_receivers
+from regions import region_from_cq
+from response_cache import (RESPONSE_CACHE_SECONDS, ResponseCache, cache_key, cacheable_window,
+                            choose_encoding, compress)
+from rollups import ROLLUP_COLLECTION, ROLLUPS_ENABLED, rollup_count_pipeline
+from spot_enrich import ENRICHED_FIELDS, ENRICHED_QUERY, US_COUNTRY, enrich_spots, geo_query
+from spot_stats import STATS_GROUPS, SpotStats, stats_records
+from spot_cache import SPOT_CACHE_MINUTES, SPOT_STREAM_LIFETIME_SECONDS, SPOT_STREAM_SECONDS, SpotCache
+from startup_report import peak_rss_mb
+from spotdb import (KEYSET_SORT, LEGACY_TIME_QUERY, SPOT_PAGE_MAX, SPOT_PAGE_SIZE, SPOT_TTL_DAYS,
+                    cursor_batches, ensure_indexes, keyset_query, parse_time, spot_range_query, spot_sort,
+                    spot_time_query, window_start)
+from wire_format import COLUMNAR_FORMATS, encode_columns, msgpack, requested_format
+from zone_assets import find_zone_asset
+from zones import shared_zone_lookup
+
+startup.mark("imports")
+
+# Database Configuration
+# PSWS receivers shown on the dashboard and the MongoDB source of each
+# (receivers.json, see receivers.py). Without a registry file this is the
+# single KD3ALD receiver read from the environment / .env settings (see spotdb.py)
+receivers = load_receivers()
+
+# Create/verify the ts indexes (and the optional TTL retention index). An
+# unreachable database only costs a few seconds here: the app still starts
+# and queries connect once MongoDB is back.
+for receiver in receivers:
+    try:
+        with pymongo.timeout(5):
+            ensure_indexes(receiver_collection(receiver), ttl_days=SPOT_TTL_DAYS)
+    except PyMongoError as err:
+        app.logger.warning("Could not verify spot indexes for %s: %s", receiver.id, err)
+startup.mark("receivers")
+
+# Precomputed Maidenhead locator -> coordinates/zones table (built on first run,
+# memory-mapped afterwards), so geo enrichment is a table lookup per distinct grid
+grid_table = load_grid_table()
+startup.mark("grid table")
+
+# Zone polygons (CQ/ITU zones, countries, continents; see zones.py) are only
+# needed for locators the grid table cannot answer, so they are loaded from the
+# compact zone file on first use. ZONE_PRELOAD=1 loads them now instead: with
+# gunicorn --preload, forked workers then share them copy-on-write.
+if os.getenv('ZONE_PRELOAD', '0') == '1':
+    grid_table.zone_lookup = shared_zone_lookup()
+    startup.mark("zones")
+
+
+
+def get_cq_zone(lat, lon):
+    """
+    Determine which CQ zone contains a given geographic coordinate.
+
+    CQ zones are geographical regions defined by CQ Magazine for amateur radio
+    contesting and awards programs. There are 40 CQ zones worldwide. The lookup
+    goes through the STRtree in zones.py rather than testing every zone polygon.
+
+    Args:
+        lat (float): Latitude in decimal degrees (-90 to 90)
+        lon (float): Longitude in decimal degrees (-180 to 180)
+
+    Returns:
+        int: CQ zone number (1-40) if found, None otherwise
+
+    Example:
+        >>> get_cq_zone(40.7128, -74.0060)  # New York City
+        5
+    """
+    return shared_zone_lookup().cq_zone.lookup(lat, lon)
+
+
+# Fields each fetcher reads from a spot document; everything else stays in MongoDB.
+# Each includes the fields stored by the ingest worker, so stamped documents
+# skip the grid table (see spot_enrich.enrich_spots())
+TABLE_PROJECTION = {
+    "grid": 1, "frequency": 1, "date": 1, "time": 1, "mode": 1, **dict.fromkeys(ENRICHED_FIELDS, 1),
+}
+MAP_PROJECTION = {
+    "grid": 1, "frequency": 1, "band": 1, "mode": 1, "snr": 1, "drift": 1,
+    "date": 1, "time": 1, "callsign": 1, "rx_callsign": 1, **dict.fromkeys(ENRICHED_FIELDS, 1),
+}
+# The spot cache serves both views, so it keeps the union of both, plus ts
+CACHE_PROJECTION = {**TABLE_PROJECTION, **MAP_PROJECTION, "ts": 1}
+
+# Documents fetched per cursor round trip while streaming
+CURSOR_BATCH_SIZE = 1000
+
+
+def spot_query(lastInterval=15, band=None, modes=None, country=None, continent=None,
+               cq_zone=None, itu_zone=None, receiver=None, start=None, end=None):
+    """
+    Build the MongoDB filter for a spot request.
+
+    Time, band and mode filters are pushed into the database query so only
+    matching documents leave MongoDB. With SPOT_ENRICHED=1 the geographic
+    filters are too, using the fields stored by ingest-ft.py; otherwise they
+    are ignored here and applied with matches_geo_filters().
+
+    Args:
+        lastInterval (int|str): Number of minutes to look back
+        band (str): Band name (e.g. "20m"), "CBs" for contest bands, or None for all
+        modes (list[str]): Modes to include (e.g. ["wspr", "ft8"]), or None for all
+        country, continent, cq_zone, itu_zone: See matches_geo_filters()
+        receiver (Receiver): Receiver whose spots are wanted (adds its
+            rx_callsign filter when it shares a collection), or None
+        start, end (datetime): Absolute time range (naive UTC) used instead
+            of lastInterval when start is given
+
+    Returns:
+        dict: MongoDB filter
+
+    Example:
+        >>> spot_query(15, band="20m", modes=["ft8"])
+        {'$and': [{'$or': [...]}, {'frequency': {'$gte': 14.0, '$lt': 14.35}}, {'mode': {'$in': ['ft8']}}]}
+    """
+    clauses = []
+    time_query = spot_range_query(start, end) if start is not None else spot_time_query(lastInterval)
+    if time_query:
+        clauses.append(time_query)
+    if band:
+        band_filter = band_query(band)
+        if band_filter:
+            clauses.append(band_filter)
+    if modes:
+        clauses.append({"mode": {"$in": [m.lower() for m in modes]}})
+    if ENRICHED_QUERY:
+        clauses.extend(geo_query(country, continent, cq_zone, itu_zone))
+    if receiver is not None and receiver_query(receiver):
+        clauses.append(receiver_query(receiver))
+
+    if not clauses:
+        return {}
+    return clauses[0] if len(clauses) == 1 else {"$and": clauses}
+
+
+def matches_geo_filters(tx_info, country=None, continent=None, cq_zone=None, itu_zone=None):
+    """
+    Check a transmitter's precomputed zone attributes against geographic filters.
+
+    Args:
+        tx_info (GridInfo): Grid table entry for the transmitter (None if invalid grid)
+        country (str): Country name, "nonUS" for everything but the US, or None
+        continent (str): Continent name or None
+        cq_zone (int): CQ zone number or None
+        itu_zone (int): ITU zone number or None
+
+    Returns:
+        bool: True if the spot passes every active filter
+    """
+    if not (country or continent or cq_zone or itu_zone):
+        return True
+    if tx_info is None:
+        return False  # Can't place an invalid grid square in any zone
+
+    if country == "nonUS":
+        if tx_info.country == US_COUNTRY:
+            return False
+    elif country and tx_info.country != country:
+        return False
+    if continent and tx_info.continent != continent:
+        return False
+    if cq_zone and tx_info.cq_zone != cq_zone:
+        return False
+    if itu_zone and tx_info.itu_zone != itu_zone:
+        return False
+    return True
+
+
+
+# Data Fetching Functions
+def enrich_batch(docs):
+    """Enrich a list of spot documents with the grid table, timed as the "enrich" stage."""
+    with stage("enrich"):
+        return enrich_spots(docs, grid_table)
+
+
+def enriched(docs):
+    """
+    Stream enriched spots from a cursor, enriching CURSOR_BATCH_SIZE at a time
+    (see spot_enrich.enrich_spots; spots stamped by ingest-ft.py reuse their
+    stored fields). Waiting for the first batch is timed as the "query"
+    stage, later batches as "drain".
+
+    Args:
+        docs (iterable[dict]): Spot documents, e.g. a pymongo Cursor
+
+    Yields:
+        dict: Spots as returned by enrich_spots(), in cursor order
+    """
+    for batch in timed_batches(cursor_batches(docs, CURSOR_BATCH_SIZE)):
+        yield from enrich_batch(batch)
+
+
+def spot_matches(spot, band=None, modes=None, country=None, continent=None,
+                 cq_zone=None, itu_zone=None):
+    """
+    Apply the /spots filters to an enriched spot held in memory.
+
+    Mirrors spot_query() plus matches_geo_filters() for spots served from the
+    spot cache instead of a MongoDB query.
+
+    Args:
+        spot (dict): Spot returned by enrich_spots()
+        band (str): Band name, "CBs" for the contest bands, or None for all bands
+        modes (list[str]): Modes to include, or None for all modes
+        country, continent, cq_zone, itu_zone: See matches_geo_filters()
+
+    Returns:
+        bool: True if the spot passes every active filter
+    """
+    if band == "CBs" or band in BAND_EDGES:
+        if not band_selected(spot["band_name"], band):
+            return False
+    if modes and spot.get("mode") not in modes:
+        return False
+    return matches_geo_filters(spot["tx"], country, continent, cq_zone, itu_zone)
+
+
+# Where one receiver's spots come from: its spots and rollup collections, and
+# a process-wide cache of its last SPOT_CACHE_MINUTES of enriched spots shared
+# by every map and table client (see spot_cache.py; None with SPOT_CACHE_MINUTES=0),
+# which feeds the receiver's band opening detector (see band_openings.py) and
+# SNR/drift statistics (see spot_stats.py)
+SpotSource = namedtuple("SpotSource", ["receiver", "collection", "rollups", "spot_cache", "openings", "stats"])
+
+
+def open_source(receiver):
+    """
+    Set up the collections and spot cache of a receiver.
+
+    Args:
+        receiver (Receiver): Registry entry
+
+    Returns:
+        SpotSource: The receiver's spot source
+    """
+    collection = receiver_collection(receiver)
+    spot_cache = openings = stats = None
+    if SPOT_CACHE_MINUTES > 0:
+        openings = OpeningDetector()
+        stats = SpotStats()
+        spot_cache = SpotCache(collection, partial(enrich_spots, grid_table=grid_table), CACHE_PROJECTION,
+                               query=receiver_query(receiver), listeners=[openings.add, stats.add])
+    return SpotSource(receiver, collection, collection.database[ROLLUP_COLLECTION], spot_cache, openings, stats)
+
+
+spot_sources = {receiver.id: open_source(receiver) for receiver in receivers}
+
+# Requests covering several receivers query them in parallel on this pool
+fan_out_pool = ThreadPoolExecutor(max_workers=max(4, len(spot_sources)), thread_name_prefix="fan-out")
+
+
+def map_sources(func, sources):
+    """
+    Run a per-receiver function on fan_out_pool, one call per source.
+
+    Each call runs in a copy of the caller's context, so its stage timings
+    (metrics.py) count towards the request that started it.
+
+    Args:
+        func (callable): Takes a SpotSource
+        sources (list[SpotSource]): Sources to process
+
+    Returns:
+        iterator: Results in source order
+    """
+    contexts = [contextvars.copy_context() for _ in sources]
+    return fan_out_pool.map(lambda context, source: context.run(func, source), contexts, sources)
+
+
+def source_ids(sources):
+    """Receiver ids of a source selection, for response cache keys."""
+    return [source.receiver.id for source in sources]
+
+
+def selected_sources(ids=None):
+    """
+    Spot sources of the receivers selected by an ``rx`` parameter.
+
+    Args:
+        ids (str): Comma-separated receiver ids, or None for all receivers
+
+    Returns:
+        list[SpotSource]: Sources in registry order
+
+    Raises:
+        ValueError: With a message for the client if an id is unknown
+    """
+    return [spot_sources[receiver.id] for receiver in select_receivers(receivers, ids)]
+
+
+def fan_out(sources, fetch):
+    """
+    Run a per-receiver fetch on each source and merge the spots in time order.
+
+    A single source is streamed straight through. Several sources are fetched
+    in parallel on fan_out_pool, each already in time order, and merged on
+    the spot ``time`` ("YYMMDD HHMM").
+
+    Args:
+        sources (list[SpotSource]): Sources to query
+        fetch (callable): Takes a SpotSource and returns its formatted spots, oldest first
+
+    Returns:
+        iterable[dict]: Formatted spots of all sources, oldest first
+    """
+    if len(sources) == 1:
+        return fetch(sources[0])
+    results = map_sources(lambda source: list(fetch(source)), sources)
+    return heapq.merge(*results, key=lambda spot: spot["time"])
+
+
+def cached_spots(lastInterval, source):
+    """
+    Return the cached spots for a lastInterval window, if the cache covers it.
+
+    Args:
+        lastInterval (int|str): Number of minutes to look back
+        source (SpotSource): Receiver to read
+
+    Returns:
+        list[dict]: Enriched spots oldest first, or None to query MongoDB instead
+    """
+    try:
+        minutes = int(lastInterval)
+    except (TypeError, ValueError):
+        return None
+    if source.spot_cache is None or not source.spot_cache.covers(minutes):
+        if source.spot_cache is not None:
+            CACHE_LOOKUPS.inc(cache="spot", result="miss")
+        return None
+    CACHE_LOOKUPS.inc(cache="spot", result="hit")
+    with stage("cache"):
+        return source.spot_cache.window(minutes)
+
+
+def table_spot(spot, receiver=None):
+    """Format an enriched spot for the table view (see fetch_wspr_spots_tb)."""
+    tx_info = spot["tx"]
+    return {
+        "id": f"${spot.get("_id")}",
+        "band": spot["band_name"],
+        "grid": f"{spot.get('grid')}",
+        "time": f"{spot.get('date')} {spot.get('time')}",
+        "cq_zone": tx_info.cq_zone if tx_info else None,
+        "region": region_from_cq(tx_info.cq_zone if tx_info else None),
+        "mode": f"{spot.get('mode')}",
+    }
+
+
+def map_spot(spot, receiver):
+    """Format an enriched spot heard by a receiver for the map view (see fetch_wspr_spots)."""
+    tx_info = spot["tx"]
+    if tx_info:
+        txlat, txlon = tx_info.lat, tx_info.lon
+    else:
+        # Invalid grid square, use default coordinates (ocean/null island)
+        txlat, txlon = 0, 0
+
+    return {
+        "id": str(spot.get("_id")),
+        "drift": spot.get("drift"),
+        "frequency": spot.get("frequency"),
+        "band": spot.get("band"),
+        "mode": spot.get("mode"),
+        "rx_lat": receiver.lat,
+        "rx_lon": receiver.lon,
+        "rx_sign": spot.get('rx_callsign') or receiver.callsign,
+        "snr": spot.get("snr"),
+        "time": f"{spot.get('date')} {spot.get('time')}",
+        "tx_lat": txlat,
+        "tx_lon": txlon,
+        "tx_sign": spot.get('callsign'),
+    }
+
+
+def cell_spot(spot, receiver=None):
+    """
+    Reduce an enriched spot to the fields binned by aggregate=cells (see grid_cells.py).
+
+    ``grid`` is None for locators the grid table could not place.
+    """
+    return {
+        "grid": spot.get("grid") if spot["tx"] else None,
+        "tx_sign": spot.get("callsign"),
+        "band": spot["band_name"],
+        "snr": spot.get("snr"),
+        "time": f"{spot.get('date')} {spot.get('time')}",
+    }
+
+
+def spot_aggregation(params):
+    """
+    Read the ``aggregate`` (and ``cell``) parameters of a /spots request.
+
+    Args:
+        params (Mapping): Query parameters (Flask request.args or Starlette query_params)
+
+    Returns:
+        tuple: (format_spot, new_aggregator, key): the formatter to fetch
+        spots with, a callable returning an empty LinkAggregator or
+        CellAggregator (None without ``aggregate``), and the parameters to
+        add to the response cache key
+
+    Raises:
+        ValueError: With a message for the client if a parameter is invalid
+    """
+    aggregate = params.get('aggregate')
+    if aggregate is None:
+        return map_spot, None, {}
+    if aggregate == 'links':
+        return map_spot, LinkAggregator, {"aggregate": "links"}
+    if aggregate == 'cells':
+        precision = params.get('cell', 'square')
+        if precision not in CELL_PRECISIONS:
+            raise ValueError(f"cell must be one of {', '.join(CELL_PRECISIONS)}")
+        return cell_spot, partial(CellAggregator, precision), {"aggregate": "cells", "cell": precision}
+    raise ValueError("aggregate must be links or cells")
+
+
+def aggregated(new_aggregator, spots):
+    """Run spots through a new aggregator (see spot_aggregation()) and return its records."""
+    aggregator = new_aggregator()
+    aggregator.add(spots)
+    return aggregator.records()
+
+
+def database_cells(aggregate_key, filters):
+    """
+    Cell precision of an aggregate=cells request that can be binned in MongoDB, or None.
+
+    Country, continent and zone filters need each transmitter's grid table
+    entry, so with them the cells are binned from the spots unless
+    SPOT_ENRICHED=1 runs the filters in the database.
+
+    Args:
+        aggregate_key (dict): Key returned by spot_aggregation()
+        filters (dict): spot_query() filters
+
+    Returns:
+        str: "field" or "square", or None to aggregate the spots instead
+    """
+    if aggregate_key.get("aggregate") != "cells":
+        return None
+    if not ENRICHED_QUERY and any(filters.get(name) for name in ("country", "continent", "cq_zone", "itu_zone")):
+        return None
+    return aggregate_key["cell"]
+
+
+def add_source_cells(aggregator, filters, source, lastInterval=15, start=None, end=None, rows=None):
+    """
+    Bin one receiver's decodes into a CellAggregator.
+
+    A window held in the spot cache is binned from memory; otherwise the
+    cell_pipeline() aggregation groups the decodes in MongoDB.
+
+    Args:
+        aggregator (CellAggregator): Cells to add to
+        filters (dict): spot_query() filters (see database_cells())
+        source (SpotSource): Receiver to read
+        lastInterval (int|str): Number of minutes to look back
+        start, end (datetime): Absolute range (naive UTC) instead of lastInterval
+        rows (list[dict]): Rows of the cell_pipeline() aggregation if the
+            caller has run it (the async server reads them itself), or None
+    """
+    cached = cached_spots(lastInterval, source) if start is None else None
+    if cached is not None:
+        aggregator.add(cell_spot(spot) for spot in cached if spot_matches(spot, **filters))
+        return
+    if rows is None:
+        query = spot_query(lastInterval, receiver=source.receiver, start=start, end=end, **filters)
+        with stage("query"):
+            rows = list(source.collection.aggregate(cell_pipeline(query, aggregator.precision)))
+    aggregator.add_groups(rows)
+
+
+def fetch_cells(precision, filters, sources, lastInterval=15, start=None, end=None):
+    """
+    Cell records of a window or range, binned in MongoDB where it is not cached.
+
+    Args:
+        precision (str): "field" or "square" (see database_cells())
+        filters (dict): spot_query() filters
+        sources (list[SpotSource]): Receivers to include
+        lastInterval (int|str): Number of minutes to look back
+        start, end (datetime): Absolute range (naive UTC) instead of lastInterval
+
+    Returns:
+        list[dict]: Cell records (see grid_cells.CellAggregator.records())
+    """
+    aggregator = CellAggregator(precision)
+    for source in sources:
+        add_source_cells(aggregator, filters, source, lastInterval, start, end)
+    return aggregator.records()
+
+
+def fetch_wspr_spots_tb(lastInterval=15, band=None, modes=None, sources=None):
+    """
+    Fetch WSPR/FT8/FT4 spots for table display with regional aggregation.
+
+    Streams recent spots as simplified data optimized for the table view,
+    which groups spots by geographic region and band. Includes CQ zone
+    information for regional classification. Windows covered by the spot
+    cache are served from memory; longer ones stream from MongoDB.
+
+    Args:
+        lastInterval (int): Number of minutes to look back from current time (default: 15)
+        band (str): Band name (e.g. "20m"), "CBs" for contest bands, or None for all
+        modes (list[str]): Modes to include (e.g. ["wspr", "ft8"]), or None for all
+        sources (list[SpotSource]): Receivers to include, or None for all (see fan_out())
+
+    Returns:
+        iterable[dict]: Spot dictionaries, oldest first, containing:
+            - id: Document ID
+            - band: Amateur radio band (e.g., "20m")
+            - grid: Maidenhead grid square (6-character)
+            - time: Timestamp in "YYMMDD HHMM" format
+            - cq_zone: CQ zone number (1-40)
+            - region: Table region of the CQ zone (see regions.py)
+            - mode: Digital mode ("wspr", "ft8", or "ft4")
+
+    Database Schema:
+        MongoDB documents contain:
+        - date: String in YYMMDD format (e.g., "260107" for January 7, 2026)
+        - time: String in HHMM format (e.g., "1430" for 14:30 UTC)
+        - ts: UTC datetime built from date/time (added by spotdb.py migrate)
+        - grid: Maidenhead grid square of transmitter
+        - frequency: Frequency in MHz
+        - mode: Mode type (wspr/ft8/ft4)
+    """
+    modes = [m.lower() for m in modes] if modes else None
+
+    def fetch(source):
+        spots = cached_spots(lastInterval, source)
+        if spots is not None:
+            spots = (spot for spot in spots if spot_matches(spot, band, modes))
+        else:
+            # Build time-based query using lastInterval parameter and stream only
+            # the fields used below, sorted chronologically by the database
+            query = spot_query(lastInterval, band=band, modes=modes, receiver=source.receiver)
+            docs = source.collection.find(query, TABLE_PROJECTION).sort(spot_sort()).batch_size(CURSOR_BATCH_SIZE)
+            spots = enriched(docs)
+        return (table_spot(spot, source.receiver) for spot in spots)
+
+    return fan_out(sources or list(spot_sources.values()), fetch)
+
+
+def fetch_wspr_spots(lastInterval=15, band=None, modes=None, country=None,
+                     continent=None, cq_zone=None, itu_zone=None, sources=None, format_spot=None):
+    """
+    Fetch WSPR/FT8/FT4 spots for map display with full propagation details.
+
+    Streams recent spots with complete data for map visualization, including
+    both transmitter and receiver coordinates, signal quality metrics, and
+    propagation path information.
+
+    Args:
+        lastInterval (int): Number of minutes to look back from current time (default: 15)
+        band (str): Band name, "CBs" for the contest bands, or None for all bands
+        modes (list[str]): Modes to include (wspr/ft8/ft4), or None for all modes
+        country (str): Transmitter country, "nonUS" for all but the US, or None
+        continent (str): Transmitter continent or None
+        cq_zone (int): Transmitter CQ zone (1-40) or None
+        itu_zone (int): Transmitter ITU zone (1-90) or None
+        sources (list[SpotSource]): Receivers to include, or None for all (see fan_out())
+        format_spot (callable): Formatter called with (spot, receiver) instead
+            of map_spot, e.g. cell_spot
+
+    Returns:
+        iterable[dict]: Spot dictionaries, oldest first, containing:
+            - id: Document ID
+            - tx_sign: Transmitter callsign
+            - tx_lat, tx_lon: Transmitter coordinates (decimal degrees)
+            - rx_sign: Receiver callsign
+            - rx_lat, rx_lon: Receiver coordinates (decimal degrees)
+            - frequency: Frequency in MHz
+            - band: Amateur radio band
+            - mode: Digital mode (wspr/ft8/ft4)
+            - snr: Signal-to-noise ratio in dB
+            - drift: Frequency drift in Hz
+            - time: Timestamp in "YYMMDD HHMM" format
+
+    Notes:
+        - Invalid grid squares default to 0,0 coordinates (equator/prime meridian)
+        - Receiver locations come from the receiver registry (receivers.py)
+        - Windows covered by the spot cache are filtered in memory; otherwise
+          band and mode filters run in MongoDB. Country/continent/zone filters
+          use the precomputed grid table attributes of each transmitter (and
+          also run in MongoDB with SPOT_ENRICHED=1)
+    """
+    modes = [m.lower() for m in modes] if modes else None
+    format_spot = format_spot or map_spot
+
+    def fetch(source):
+        receiver = source.receiver
+        cached = cached_spots(lastInterval, source)
+        if cached is not None:
+            return (
+                format_spot(spot, receiver) for spot in cached
+                if spot_matches(spot, band, modes, country, continent, cq_zone, itu_zone)
+            )
+
+        # Build MongoDB query: time window plus band/mode filters, and stream only
+        # the fields used below, sorted chronologically by the database
+        query = spot_query(lastInterval, band=band, modes=modes, country=country,
+                           continent=continent, cq_zone=cq_zone, itu_zone=itu_zone, receiver=receiver)
+        docs = source.collection.find(query, MAP_PROJECTION).sort(spot_sort()).batch_size(CURSOR_BATCH_SIZE)
+        return (
+            format_spot(spot, receiver) for spot in enriched(docs)
+            if matches_geo_filters(spot["tx"], country, continent, cq_zone, itu_zone)
+        )
+
+    return fan_out(sources or list(spot_sources.values()), fetch)
+
+
+def summary_pipeline(lastInterval, band, modes, receiver):
+    """
+    Aggregation a receiver's /tbsummary rows come from when the spot cache
+    does not cover the window.
+
+    Args:
+        lastInterval (int|str): Number of minutes to look back
+        band (str): Band name, or "CBs" for the contest bands
+        modes (list[str]): Modes to include (lowercase), or None for all
+        receiver (Receiver): Receiver to count
+
+    Returns:
+        tuple: ("rollups", pipeline) to sum the per-minute rollups when
+        SPOT_ROLLUPS=1 (see rollups.py), otherwise ("spots", pipeline) to
+        group the spots by (grid, band, mode)
+    """
+    if ROLLUPS_ENABLED and str(lastInterval).isdigit():
+        return "rollups", rollup_count_pipeline(int(lastInterval), band, modes, rx_callsign=receiver.rx_callsign)
+    return "spots", [
+        {"$match": spot_query(lastInterval, band=band, modes=modes, receiver=receiver)},
+        {"$group": {
+            "_id": {"grid": "$grid", "band": band_switch("$frequency"), "mode": "$mode"},
+            "count": {"$sum": 1},
+        }},
+    ]
+
+
+def summary_rows(lastInterval, band, modes, source, groups=None):
+    """
+    Count one receiver's spots per CQ zone, band and mode (see fetch_table_summary()).
+
+    Args:
+        lastInterval (int|str): Number of minutes to look back
+        band (str): Band name, or "CBs" for the contest bands
+        modes (list[str]): Modes to include (lowercase), or None for all
+        source (SpotSource): Receiver to count
+        groups (list[dict]): Rows of the summary_pipeline() aggregation if the
+            caller has run it (the async server reads them itself), or None
+
+    Returns:
+        list[tuple]: (cq_zone, band_name, mode, count) rows
+    """
+    cached = cached_spots(lastInterval, source)
+    if cached is not None:
+        return [
+            (spot["tx"].cq_zone if spot["tx"] else None, spot["band_name"], spot.get("mode"), 1)
+            for spot in cached if spot_matches(spot, band, modes)
+        ]
+    kind, pipeline = summary_pipeline(lastInterval, band, modes, source.receiver)
+    if groups is None:
+        with stage("query"):
+            groups = list((source.rollups if kind == "rollups" else source.collection).aggregate(pipeline))
+    if kind == "rollups":
+        return [(row["_id"].get("cq_zone"), row["_id"]["band"], row["_id"].get("mode"), row["count"])
+                for row in groups]
+    with stage("enrich"):
+        tx_infos = grid_table.lookup_many([row["_id"].get("grid") for row in groups])
+    return [
+        (tx_info.cq_zone if tx_info else None, row["_id"]["band"], row["_id"].get("mode"), row["count"])
+        for tx_info, row in zip(tx_infos, groups)
+    ]
+
+
+def summary_counts(lastInterval, rows):
+    """
+    Sum summary_rows() into the /tbsummary region x band x mode matrix.
+
+    Args:
+        lastInterval (int|str): Window that was counted
+        rows (iterable[tuple]): (cq_zone, band_name, mode, count) rows of every receiver
+
+    Returns:
+        dict: See fetch_table_summary()
+    """
+    counts = {}
+    total = 0
+    for cq_zone, band_name, mode, count in rows:
+        region = region_from_cq(cq_zone)
+        band_counts = counts.setdefault(region, {}).setdefault(band_name, {})
+        mode = f"{mode}"
+        band_counts[mode] = band_counts.get(mode, 0) + count
+        total += count
+
+    return {"lastInterval": lastInterval, "total": total, "counts": counts}
+
+
+def fetch_table_summary(lastInterval=15, band="CBs", modes=None, sources=None):
+    """
+    Count spots per region, band and mode for the table view.
+
+    Windows covered by the spot cache are counted in memory. Longer windows
+    are summed from the per-minute rollups when SPOT_ROLLUPS=1 (see
+    rollups.py). Otherwise MongoDB filters the window and groups spots by
+    (grid, band, mode) with a $group stage, so only one small row per distinct
+    transmitter grid leaves the database. Each grid is then mapped to its
+    region through the grid table and the counts are summed into the finished
+    matrix.
+
+    Args:
+        lastInterval (int): Number of minutes to look back from current time (default: 15)
+        band (str): Band name, or "CBs" for the 6 contest bands (default)
+        modes (list[str]): Modes to include (wspr/ft8/ft4), or None for all modes
+        sources (list[SpotSource]): Receivers to include, or None for all
+
+    Returns:
+        dict: Summary containing:
+            - lastInterval: Window that was counted, in minutes
+            - total: Number of spots counted
+            - counts: region -> band -> mode -> spot count
+
+    Example:
+        >>> fetch_table_summary(15, modes=["ft8"])
+        {'lastInterval': 15, 'total': 42, 'counts': {'Europe': {'20m': {'ft8': 12}}, ...}}
+    """
+    modes = [m.lower() for m in modes] if modes else None
+    rows_of = partial(summary_rows, lastInterval, band, modes)
+
+    sources = sources or list(spot_sources.values())
+    if len(sources) == 1:
+        rows = rows_of(sources[0])
+    else:
+        rows = [row for source_rows in map_sources(rows_of, sources) for row in source_rows]
+    return summary_counts(lastInterval, rows)
+
+
+def fetch_openings(since=0, band=None, modes=None, sources=None):
+    """
+    Band opening state and events of the selected receivers (see band_openings.py).
+
+    Each receiver's spot cache is refreshed first (if due), which feeds its
+    detector, and minutes that have settled by the wall clock are judged.
+
+    Args:
+        since (int): Only return events with a larger id (0 for all kept events)
+        band (str): Band name, "CBs" for the contest bands, or None for all
+        modes (list[str]): Modes to include (lowercase), or None for all
+        sources (list[SpotSource]): Receivers to include, or None for all;
+            every one must have a spot cache
+
+    Returns:
+        dict: Containing:
+            - cursor: Largest event id returned (send as ``since`` next time)
+            - open: Paths open now, each with ``rx``, region, band, mode,
+              since, rate and baseline
+            - events: Opening/closing events after ``since``, oldest first,
+              each with ``rx`` (see OpeningDetector.events())
+
+    Example:
+        >>> fetch_openings(band="CBs", modes=["ft8"])
+        {'cursor': 42, 'open': [{'rx': 'kd3ald', 'region': 'Europe', 'band': '15m', ...}],
+         'events': [{'id': 42, 'rx': 'kd3ald', 'type': 'opening', ...}]}
+    """
+    sources = sources or list(spot_sources.values())
+    now = datetime.utcnow()
+
+    def selected(record):
+        if band and not band_selected(record["band"], band):
+            return False
+        return not modes or record["mode"] in modes
+
+    open_paths, events = [], []
+    for source in sources:
+        with stage("cache"):
+            source.spot_cache.refresh()
+        source.openings.advance(now)
+        rx_id = source.receiver.id
+        open_paths.extend({"rx": rx_id, **path} for path in source.openings.open_paths() if selected(path))
+        events.extend({"rx": rx_id, **event} for event in source.openings.events(since) if selected(event))
+    events.sort(key=lambda event: event["id"])
+    open_paths.sort(key=lambda path: (path["since"], path["region"], path["band"]))
+    return {
+        "cursor": events[-1]["id"] if events else since,
+        "open": open_paths,
+        "events": events,
+    }
+
+
+def fetch_stats(start, end, band=None, modes=None, cq_zone=None, group_by=STATS_GROUPS, sources=None):
+    """
+    SNR and drift quantiles for a window, merged from the per-bucket histograms (see spot_stats.py).
+
+    Args:
+        start, end (datetime): Window (naive UTC), resolved to whole buckets
+        band (str): Band name, "CBs" for the contest bands, or None for all
+        modes (list[str]): Modes to include (lowercase), or None for all
+        cq_zone (int): Transmitter CQ zone, or None for all
+        group_by (tuple[str]): STATS_GROUPS fields to report separately
+        sources (list[SpotSource]): Receivers to include, or None for all;
+            every one must have a spot cache
+
+    Returns:
+        dict: Containing:
+            - start, end: Window covered ("YYMMDD HHMM", start rounded down to a bucket)
+            - bucket_minutes: Bucket length
+            - stats: One record per group, busiest first (see spot_stats.stats_records())
+
+    Example:
+        >>> fetch_stats(window_start(60), datetime.utcnow(), band="15m", group_by=("cq_zone",))
+        {'start': '261018 1300', 'end': '261018 1412', 'bucket_minutes': 15,
+         'stats': [{'cq_zone': 14, 'count': 212, 'snr': {'median': -12, 'p90': -3, ...}}, ...]}
+    """
+    sources = sources or list(spot_sources.values())
+
+    def selected(key):
+        key_band, key_zone, key_mode = key
+        if band and not band_selected(key_band, band):
+            return False
+        if modes and key_mode not in modes:
+            return False
+        return cq_zone is None or key_zone == cq_zone
+
+    groups = {}
+    for source in sources:
+        with stage("cache"):
+            source.spot_cache.refresh()
+        source.stats.merged(start, end, selected, group_by, into=groups)
+    bucket_minutes = sources[0].stats.bucket_minutes
+    return {
+        "start": sources[0].stats.bucket_of(start).strftime("%y%m%d %H%M"),
+        "end": end.strftime("%y%m%d %H%M"),
+        "bucket_minutes": bucket_minutes,
+        "stats": stats_records(groups, group_by),
+    }
+
+
+def fetch_spot_changes(since, minutes, format_spot, filters, sources=None):
+    """
+    Fetch the spots added after a cursor, for clients that keep the window.
+
+    A cursor holds the largest ObjectId a client has seen from each receiver
+    (see parse_cursor()). Windows covered by the spot cache are answered from
+    memory; otherwise MongoDB is asked for ``_id`` values above the cursor
+    within the window. Without a cursor the whole window is returned and
+    ``reset`` is set.
+
+    Args:
+        since (dict): Receiver id -> ObjectId from a previous response, or None for a full sync
+        minutes (int): Window in minutes
+        format_spot (callable): table_spot or map_spot, called with (spot, receiver)
+        filters (dict): Keyword arguments for spot_matches()
+        sources (list[SpotSource]): Receivers to include, or None for all
+
+    Returns:
+        dict: Delta containing:
+            - reset: True if the client should discard what it has
+            - cursor: Cursor to send as ``since`` next time
+            - cutoff: Drop spots whose time sorts before this ("YYMMDD HHMM")
+            - spots: New spots, oldest first
+
+    Example:
+        >>> fetch_spot_changes({"kd3ald": ObjectId("6ad4e4cf4f8a88f0661646db")}, 15, table_spot, {})
+        {'reset': False, 'cursor': '6ad4e5...', 'cutoff': '261018 1441', 'spots': [...]}
+    """
+    sources = sources or list(spot_sources.values())
+
+    def changes(source):
+        return source_changes(source, (since or {}).get(source.receiver.id), minutes, format_spot, filters)
+
+    if len(sources) == 1:
+        results = [changes(sources[0])]
+    else:
+        results = list(map_sources(changes, sources))
+    return merge_changes(since, minutes, sources, results)
+
+
+def changes_query(after, minutes, receiver):
+    """
+    MongoDB filter for a receiver's spots after a cursor, for windows the
+    spot cache does not cover (read in ``_id`` order with CACHE_PROJECTION).
+
+    Args:
+        after (ObjectId): The receiver's cursor, or None for the whole window
+        minutes (int): Window in minutes
+        receiver (Receiver): Receiver to read
+
+    Returns:
+        dict: MongoDB filter
+    """
+    query = spot_query(minutes, receiver=receiver)
+    if after is not None:
+        query = {"$and": [query, {"_id": {"$gt": after}}]}
+    return query
+
+
+def source_changes(source, after, minutes, format_spot, filters, docs=None):
+    """
+    One receiver's part of fetch_spot_changes().
+
+    Args:
+        source (SpotSource): Receiver to read
+        after (ObjectId): The receiver's cursor, or None for the whole window
+        minutes (int): Window in minutes
+        format_spot (callable): table_spot or map_spot, called with (spot, receiver)
+        filters (dict): Keyword arguments for spot_matches()
+        docs (list[dict]): Documents of the changes_query() if the caller has
+            read them (the async server does), or None
+
+    Returns:
+        tuple: (formatted spots, the receiver's next cursor)
+    """
+    if source.spot_cache is not None and source.spot_cache.covers(minutes):
+        CACHE_LOOKUPS.inc(cache="spot", result="hit")
+        with stage("cache"):
+            spots, cursor = source.spot_cache.changes(after, minutes)
+    else:
+        if docs is None:
+            docs = source.collection.find(changes_query(after, minutes, source.receiver), CACHE_PROJECTION) \
+                .sort([("_id", ASCENDING)]).batch_size(CURSOR_BATCH_SIZE)
+        spots = list(enriched(docs))
+        cursor = spots[-1]["_id"] if spots else after
+    formatted = [format_spot(spot, source.receiver) for spot in spots if spot_matches(spot, **filters)]
+    return formatted, cursor
+
+
+def merge_changes(since, minutes, sources, results):
+    """
+    Merge the source_changes() results of several receivers into one delta.
+
+    Args:
+        since (dict): Cursor the delta follows, or None for a full sync
+        minutes (int): Window in minutes
+        sources (list[SpotSource]): Receivers read
+        results (list[tuple]): source_changes() result of each source, in the same order
+
+    Returns:
+        dict: See fetch_spot_changes()
+    """
+    cursors = {source.receiver.id: cursor for source, (_, cursor) in zip(sources, results)}
+
+    return {
+        "reset": since is None,
+        "cursor": format_cursor(cursors),
+        "cutoff": window_start(minutes).strftime("%y%m%d %H%M"),
+        "spots": list(heapq.merge(*(spots for spots, _ in results), key=lambda spot: spot["time"])),
+    }
+
+
+def parse_cursor(since, sources):
+    """
+    Parse a ``since`` cursor into one ObjectId per receiver.
+
+    A cursor is a plain ObjectId when one receiver is selected, or
+    ``id:ObjectId`` pairs joined by commas for several (see format_cursor()).
+    A plain ObjectId applies to every selected receiver.
+
+    Args:
+        since (str): Cursor from a previous response, or "0"/"" for a full sync
+        sources (list[SpotSource]): Selected receivers
+
+    Returns:
+        dict: Receiver id -> ObjectId, or None for a full sync
+
+    Raises:
+        InvalidId: If a cursor part is not an ObjectId
+
+    Example:
+        >>> parse_cursor("kd3ald:6ad4e4cf4f8a88f0661646db", selected_sources())
+        {'kd3ald': ObjectId('6ad4e4cf4f8a88f0661646db')}
+    """
+    if since in (None, "", "0"):
+        return None
+    if ":" not in since:
+        return {source.receiver.id: ObjectId(since) for source in sources}
+    cursors = {}
+    for part in since.split(","):
+        rx_id, _, oid = part.partition(":")
+        cursors[rx_id.strip()] = ObjectId(oid)
+    return cursors
+
+
+def format_cursor(cursors):
+    """
+    Format per-receiver cursors for a response (see parse_cursor()).
+
+    Args:
+        cursors (dict): Receiver id -> ObjectId (or None if nothing seen yet)
+
+    Returns:
+        str: Cursor string, or None if no receiver has spots yet
+    """
+    seen = {rx_id: cursor for rx_id, cursor in cursors.items() if cursor}
+    if not seen:
+        return None
+    if len(cursors) == 1:
+        return str(next(iter(seen.values())))
+    return ",".join(f"{rx_id}:{cursor}" for rx_id, cursor in seen.items())
+
+
+# Page cursors carry each ts as milliseconds since this instant
+EPOCH = datetime(1970, 1, 1)
+
+
+def parse_page_cursor(after):
+    """
+    Parse an ``after`` page cursor into one position per receiver.
+
+    A position is the ts and ObjectId of the last spot a receiver contributed
+    to the previous page, written ``id:<ts in ms>.<ObjectId>``; receivers are
+    joined by commas (see format_page_cursor()).
+
+    Args:
+        after (str): ``next`` of a previous page, or None/"" for the first page
+
+    Returns:
+        dict: Receiver id -> (ts datetime, ObjectId)
+
+    Raises:
+        ValueError, InvalidId: If the cursor is malformed
+
+    Example:
+        >>> parse_page_cursor("kd3ald:1791642600000.6ad4e4cf4f8a88f0661646db")
+        {'kd3ald': (datetime.datetime(2026, 10, 10, 14, 30), ObjectId('6ad4e4cf4f8a88f0661646db'))}
+    """
+    if not after:
+        return {}
+    positions = {}
+    for part in after.split(","):
+        rx_id, _, position = part.partition(":")
+        millis, _, oid = position.partition(".")
+        positions[rx_id.strip()] = (EPOCH + timedelta(milliseconds=int(millis)), ObjectId(oid))
+    return positions
+
+
+def format_page_cursor(positions):
+    """
+    Format per-receiver page positions for a response (see parse_page_cursor()).
+
+    Args:
+        positions (dict): Receiver id -> (ts datetime, ObjectId)
+
+    Returns:
+        str: Cursor string
+    """
+    return ",".join(f"{rx_id}:{(ts - EPOCH) // timedelta(milliseconds=1)}.{oid}"
+                    for rx_id, (ts, oid) in positions.items())
+
+
+def parse_range(params):
+    """
+    Read the start/end/limit/after parameters of a range request.
+
+    Args:
+        params (Mapping): Query parameters (Flask request.args or Starlette query_params)
+
+    Returns:
+        tuple: (start, end, limit, after) with naive UTC datetimes, the page
+        size capped at SPOT_PAGE_MAX and the parsed ``after`` cursor
+
+    Raises:
+        ValueError: With a message for the client if a parameter is invalid
+    """
+    if LEGACY_TIME_QUERY:
+        raise ValueError("start/end need the ts field (run python spotdb.py migrate)")
+    try:
+        start = parse_time(params.get('start', ''))
+        end = parse_time(params['end']) if params.get('end') else datetime.utcnow()
+    except ValueError:
+        raise ValueError("start and end must be ISO 8601 UTC times, e.g. 2026-10-10T14:30Z") from None
+    if end <= start:
+        raise ValueError("end must be after start")
+    try:
+        limit = int(params.get('limit', SPOT_PAGE_SIZE))
+    except ValueError:
+        raise ValueError("limit must be a number of spots") from None
+    try:
+        after = parse_page_cursor(params.get('after'))
+    except (InvalidId, ValueError):
+        raise ValueError("after must be the next cursor of a previous page") from None
+    return start, end, max(1, min(limit, SPOT_PAGE_MAX)), after
+
+
+def fetch_spot_page(start, end, after, limit, format_spot, projection, filters, sources=None):
+    """
+    Fetch one page of spots from an absolute time range.
+
+    Each receiver is asked for up to ``limit + 1`` spots after its position
+    in ``after``, in (ts, _id) order (see spotdb.keyset_query()), and the
+    first ``limit`` of the merged spots form the page. A request never holds
+    more than one page, however many days the range covers.
+
+    Args:
+        start, end (datetime): Range (naive UTC); end is excluded
+        after (dict): Positions from parse_page_cursor(), empty for the first page
+        limit (int): Spots per page
+        format_spot (callable): table_spot or map_spot, called with (spot, receiver)
+        projection (dict): Fields to read (TABLE_PROJECTION or MAP_PROJECTION)
+        filters (dict): spot_query() filters (band, modes, country, ...); the
+            geographic ones are also checked on the enriched spots
+        sources (list[SpotSource]): Receivers to include, or None for all
+
+    Returns:
+        dict: Page containing:
+            - start, end: The range ("YYYY-MM-DDTHH:MM:SSZ")
+            - next: Cursor to send as ``after`` for the next page, or None
+              after the last page
+            - spots: Formatted spots, oldest first (fewer than ``limit``
+              when geographic filters drop spots; keep following ``next``)
+
+    Example:
+        >>> fetch_spot_page(datetime(2026, 10, 10), datetime(2026, 10, 12), {}, 1000, table_spot,
+        ...                 TABLE_PROJECTION, {})
+        {'start': '2026-10-10T00:00:00Z', 'end': '2026-10-12T00:00:00Z', 'next': 'kd3ald:1791...', 'spots': [...]}
+    """
+    sources = sources or list(spot_sources.values())
+
+    def read(source):
+        query = page_query(start, end, after, filters, source.receiver)
+        docs = source.collection.find(query, {**projection, "ts": 1}).sort(KEYSET_SORT) \
+            .limit(limit + 1).batch_size(limit + 1)
+        return list(enriched(docs))
 
-# Load environment variables from .env file
-load_dotenv()
+    if len(sources) == 1:
+        results = [read(sources[0])]
+    else:
+        results = list(map_sources(read, sources))
+    return assemble_page(start, end, after, limit, format_spot, filters, sources, results)
 
-# Database Configuration
-# Connect to MongoDB instance running WSPRDaemon database
-# Database stores decoded WSPR, FT8, and FT4 spots from the PSWS receiver
-MONGODB_HOST = os.getenv('MONGODB_HOST', 'localhost')
-MONGODB_PORT = os.getenv('MONGODB_PORT', '27017')
-MONGODB_USERNAME = os.getenv('MONGODB_USERNAME', 'admin')
-MONGODB_PASSWORD = os.getenv('MONGODB_PASSWORD')
-MONGODB_DATABASE = os.getenv('MONGODB_DATABASE', 'wspr_db')
-
-if not MONGODB_PASSWORD:
-    raise ValueError("MONGODB_PASSWORD environment variable is not set. Please create a .env file (see .env.example)")
-
-# Construct MongoDB connection URI
-MONGODB_URI = f"mongodb://{MONGODB_USERNAME}:{MONGODB_PASSWORD}@{MONGODB_HOST}:{MONGODB_PORT}"
-client = MongoClient(MONGODB_URI)
-db = client[MONGODB_DATABASE]
-collection = db['spots']
-#world = gpd.read_file("https://raw.githubusercontent.com/johan/world.geo.json/master/countries.geo.json")
-
-# Load CQ Zone GeoJSON data for geographic lookups
-# CQ zones are amateur radio operating zones used for contests and awards (40 zones globally)
-with open("static/js/cqzones.geojson") as f:
-    cq_data = json.load(f)
-
-# Build list of (zone_number, shapely_geometry) tuples for point-in-polygon lookups
-cq_zones = []
-for feature in cq_data["features"]:
-    zone_num = feature["properties"]["cq_zone_number"]
-    geometry = shape(feature["geometry"])
-    cq_zones.append((zone_num, geometry))
 
+def page_query(start, end, after, filters, receiver):
+    """
+    MongoDB filter for a receiver's part of a range page (read in KEYSET_SORT
+    order, ``limit + 1`` documents, with ts added to the projection).
 
+    Args:
+        start, end (datetime): Range (naive UTC); end is excluded
+        after (dict): Positions from parse_page_cursor()
+        filters (dict): spot_query() filters
+        receiver (Receiver): Receiver to read
 
-def get_cq_zone(lat, lon):
+    Returns:
+        dict: MongoDB filter
     """
-    Determine which CQ zone contains a given geographic coordinate.
+    query = spot_query(receiver=receiver, start=start, end=end, **filters)
+    position = after.get(receiver.id)
+    if position is not None:
+        query = {"$and": [query, keyset_query(*position)]}
+    return query
 
-    CQ zones are geographical regions defined by CQ Magazine for amateur radio
-    contesting and awards programs. There are 40 CQ zones worldwide.
+
+def assemble_page(start, end, after, limit, format_spot, filters, sources, results):
+    """
+    Merge the enriched page_query() spots of each receiver into one page.
 
     Args:
-        lat (float): Latitude in decimal degrees (-90 to 90)
-        lon (float): Longitude in decimal degrees (-180 to 180)
+        start, end, after, limit, format_spot, filters: As for fetch_spot_page()
+        sources (list[SpotSource]): Receivers read
+        results (list[list[dict]]): Enriched spots of each source, in the same order
 
     Returns:
-        int: CQ zone number (1-40) if found, None otherwise
+        dict: See fetch_spot_page()
+    """
+    merged = heapq.merge(*(
+        [(spot["ts"], spot["_id"], index, spot) for spot in spots] for index, spots in enumerate(results)
+    ))
+    page = list(islice(merged, limit))
+
+    positions = {source.receiver.id: after[source.receiver.id] for source in sources if source.receiver.id in after}
+    taken = [0] * len(sources)
+    for ts, oid, index, _ in page:
+        positions[sources[index].receiver.id] = (ts, oid)
+        taken[index] += 1
+    more = any(len(spots) > count for spots, count in zip(results, taken))
+
+    geo = [filters.get(name) for name in ("country", "continent", "cq_zone", "itu_zone")]
+    return {
+        "start": f"{start:%Y-%m-%dT%H:%M:%SZ}",
+        "end": f"{end:%Y-%m-%dT%H:%M:%SZ}",
+        "next": format_page_cursor(positions) if more else None,
+        "spots": [format_spot(spot, sources[index].receiver) for _, _, index, spot in page
+                  if matches_geo_filters(spot["tx"], *geo)],
+    }
+
+
+def spot_page_response(format_spot, projection, filters, sources):
+    """
+    Answer a ``start`` request on /spots or /tbspots with one page.
 
-    Example:
-        >>> get_cq_zone(40.7128, -74.0060)  # New York City
-        5
+    Args:
+        format_spot (callable): table_spot or map_spot
+        projection (dict): Fields to read
+        filters (dict): spot_query() filters
+        sources (list[SpotSource]): Receivers to include
+
+    Returns:
+        Response: JSON page (see fetch_spot_page()), or a 400 JSON error
     """
-    point = Point(lon, lat)  # Shapely uses (lon, lat) order, not (lat, lon)
+    try:
+        start, end, limit, after = parse_range(request.args)
+    except ValueError as err:
+        return jsonify({"error": str(err)}), 400
+    return jsonify(fetch_spot_page(start, end, after, limit, format_spot, projection, filters, sources))
 
-    for zone_num, geometry in cq_zones:
-        if geometry.contains(point):
-            return zone_num
 
-    return None  # Coordinate not inside any defined CQ zone
+def range_spots(start, end, filters, sources=None, format_spot=None):
+    """
+    Stream every map spot of an absolute range, a page at a time.
+
+    Args:
+        start, end (datetime): Range (naive UTC); end is excluded
+        filters (dict): spot_query() filters
+        sources (list[SpotSource]): Receivers to include, or None for all
+        format_spot (callable): Formatter instead of map_spot, e.g. cell_spot
 
+    Yields:
+        dict: Formatted spots, oldest first
+    """
+    after = {}
+    while True:
+        page = fetch_spot_page(start, end, after, SPOT_PAGE_MAX, format_spot or map_spot, MAP_PROJECTION,
+                               filters, sources)
+        yield from page["spots"]
+        if page["next"] is None:
+            return
+        after = parse_page_cursor(page["next"])
 
 
-def frequency_to_band(freq):
+def range_aggregate_response(format_spot, new_aggregator, filters, sources, precision=None):
     """
-    Convert a frequency in MHz to an amateur radio band designation.
+    Answer a ``start`` request with ``aggregate``: links or cells of the whole range.
 
-    Maps frequencies to standard amateur radio band names based on FCC amateur
-    radio frequency allocations. Used to categorize spots by band for display
-    and filtering purposes.
+    Cells are binned by a MongoDB aggregation where possible (see
+    database_cells()). Otherwise the range is read page by page and only the
+    aggregate is kept, so memory grows with the number of distinct links or
+    cells, not with the number of decodes.
 
     Args:
-        freq (float): Frequency in MHz (e.g., 14.097 for 20 meters)
+        format_spot (callable): Formatter from spot_aggregation()
+        new_aggregator (callable): Aggregator factory from spot_aggregation()
+        filters (dict): spot_query() filters
+        sources (list[SpotSource]): Receivers to include
+        precision (str): Cell precision from database_cells(), or None
 
     Returns:
-        str: Band designation (e.g., "20m", "40m") or "Unknown" if not in an amateur band
+        Response: Link or cell list, or a 400 JSON error
+    """
+    try:
+        start, end, _, _ = parse_range(request.args)
+    except ValueError as err:
+        return jsonify({"error": str(err)}), 400
+    if precision:
+        return coalesced_spots('/spots', None, None,
+                               lambda: fetch_cells(precision, filters, sources, start=start, end=end))
+    return coalesced_spots('/spots', None, None, lambda: aggregated(
+        new_aggregator, range_spots(start, end, filters, sources, format_spot)))
 
-    Example:
-        >>> frequency_to_band(14.097)
-        '20m'
-        >>> frequency_to_band(7.074)
-        '40m'
-    """
-    # Long wave bands
-    if 0.136 <= freq < 0.137:
-        return "2200m"
-    if 0.472 <= freq < 0.479:
-        return "630m"
-
-    # HF bands (most commonly used for DX and contesting)
-    if 1.8 <= freq < 2:
-        return "160m"
-    if 3.5 <= freq < 4:
-        return "80m"
-    if 5.2 <= freq < 5.5:
-        return "60m"
-    if 7.0 <= freq < 7.3:
-        return "40m"
-    if 10.1 <= freq < 10.15:
-        return "30m"  # WARC band (no contests)
-    if 14.0 <= freq < 14.35:
-        return "20m"
-    if 18.068 <= freq < 18.168:
-        return "17m"  # WARC band (no contests)
-    if 21.0 <= freq < 21.45:
-        return "15m"
-    if 24.89 <= freq < 24.99:
-        return "12m"  # WARC band (no contests)
-    if 28.0 <= freq < 29.7:
-        return "10m"
-
-    # VHF/UHF bands
-    if 50.0 <= freq < 54.0:
-        return "6m"
-    if 144.0 <= freq < 148.0:
-        return "2m"
-
-    return "Unknown"
 
+# Fastest replay, in replayed seconds per second (1440: a day per minute)
+REPLAY_MAX_SPEED = float(os.getenv('REPLAY_MAX_SPEED', '1440'))
 
 
+def parse_replay(params):
+    """
+    Read the parameters of a /spots/replay request.
 
-# Data Fetching Functions
-def fetch_wspr_spots_tb(lastInterval=15):
+    Args:
+        params (Mapping): Query parameters
+
+    Returns:
+        tuple: (start, end, speed, minutes): the range (see parse_range()),
+        the speed capped at REPLAY_MAX_SPEED and the displayed window in minutes
+
+    Raises:
+        ValueError: With a message for the client if a parameter is invalid
     """
-    Fetch WSPR/FT8/FT4 spots for table display with regional aggregation.
+    start, end, _, _ = parse_range(params)
+    try:
+        speed = float(params.get('speed', '60'))
+        minutes = int(params.get('lastInterval', '15'))
+    except ValueError:
+        raise ValueError("speed and lastInterval must be numbers") from None
+    if speed <= 0 or minutes <= 0:
+        raise ValueError("speed and lastInterval must be positive")
+    return start, end, min(speed, REPLAY_MAX_SPEED), minutes
+
+
+def replay_events(start, end, speed, minutes, filters, sources):
+    """
+    Replay a past range as /spots/stream events, one per spot minute.
 
-    Retrieves recent spots from MongoDB and returns simplified data optimized
-    for the table view, which groups spots by geographic region and band.
-    Includes CQ zone information for regional classification.
+    Spots are read a page at a time (fetch_spot_page()), so a replay of any
+    length holds one page in memory. Events have the /spots/stream format
+    (``reset`` on the first, ``cutoff`` trailing the replayed minute by
+    ``minutes``) plus ``time``, the replayed minute; the last one also has
+    ``done: true`` so the client closes the stream instead of reconnecting.
 
     Args:
-        lastInterval (int): Number of minutes to look back from current time (default: 15)
+        start, end (datetime): Range to replay (naive UTC)
+        speed (float): Replayed seconds per second of wall time
+        minutes (int): Window shown by the client (sets ``cutoff``)
+        filters (dict): spot_query() filters
+        sources (list[SpotSource]): Receivers to include
+
+    Yields:
+        tuple: (due, event): seconds after the replay starts at which to send
+        the event, and the event dict
+    """
+    spots = range_spots(start, end, filters, sources)
+    pending = next(spots, None)
+    minute = start.replace(second=0, microsecond=0)
+    first = True
+    while minute < end:
+        label = minute.strftime("%y%m%d %H%M")
+        batch = []
+        while pending is not None and pending["time"] <= label:
+            batch.append(pending)
+            pending = next(spots, None)
+        due, event = replay_event(start, minute, speed, minutes, batch, first)
+        yield due, event
+        first = False
+        minute += timedelta(minutes=1)
+    yield replay_done(start, end, speed, event)
+
+
+def replay_event(start, minute, speed, minutes, spots, first):
+    """
+    One replayed minute of replay_events().
+
+    Args:
+        start (datetime): Start of the replayed range
+        minute (datetime): Minute replayed
+        speed (float): Replayed seconds per second of wall time
+        minutes (int): Window shown by the client (sets ``cutoff``)
+        spots (list[dict]): Map spots of the minute
+        first (bool): First event of the replay
 
     Returns:
-        list[dict]: List of spot dictionaries containing:
-            - id: Document ID
-            - band: Amateur radio band (e.g., "20m")
-            - grid: Maidenhead grid square (6-character)
-            - time: Timestamp in "YYMMDD HHMM" format
-            - cq_zone: CQ zone number (1-40)
-            - mode: Digital mode ("wspr", "ft8", or "ft4")
+        tuple: (due, event) as yielded by replay_events()
+    """
+    event = {
+        "reset": first,
+        "cursor": None,
+        "cutoff": (minute - timedelta(minutes=minutes)).strftime("%y%m%d %H%M"),
+        "time": minute.strftime("%y%m%d %H%M"),
+        "spots": spots,
+    }
+    return max(0.0, (minute - start).total_seconds()) / speed, event
 
-    Database Schema:
-        MongoDB documents contain:
-        - date: String in YYMMDD format (e.g., "260107" for January 7, 2026)
-        - time: String in HHMM format (e.g., "1430" for 14:30 UTC)
-        - grid: Maidenhead grid square of transmitter
-        - frequency: Frequency in MHz
-        - mode: Mode type (wspr/ft8/ft4)
+
+def replay_done(start, end, speed, last_event):
+    """Closing (due, event) of replay_events(), after the last replayed minute."""
+    return (end - start).total_seconds() / speed, {**last_event, "reset": False, "spots": [], "done": True}
+
+
+
+
+# Spots serialized per chunk written to the client while streaming
+STREAM_CHUNK_SIZE = 500
+
+
+def serialize_spots(spots, ndjson=False):
+    """
+    Serialize spot dictionaries in chunks of STREAM_CHUNK_SIZE.
+
+    Args:
+        spots (iterable[dict]): Spots produced by one of the fetch generators
+        ndjson (bool): One JSON object per line instead of a JSON array
+
+    Yields:
+        str: Consecutive pieces of the response body
     """
-    query = {}
+    chunk = []
+    first = True
+    count = 0
+    elapsed = 0.0
+    if not ndjson:
+        yield "["
+    for spot in spots:
+        # Only the encoding is timed; pulling the next spot runs the fetch stages
+        start = time.perf_counter()
+        chunk.append(app.json.dumps(spot))
+        elapsed += time.perf_counter() - start
+        count += 1
+        if len(chunk) >= STREAM_CHUNK_SIZE:
+            yield _join_chunk(chunk, first, ndjson)
+            chunk = []
+            first = False
+    if chunk:
+        yield _join_chunk(chunk, first, ndjson)
+    if not ndjson:
+        yield "]"
+    record_stage("serialize", elapsed)
+    count_spots(count)
+
+
+def stream_spots(spots):
+    """
+    Stream spot dictionaries to the client without materializing the list.
+
+    The default format is a JSON array (same as jsonify); ``format=ndjson``
+    sends one JSON object per line instead. Spots are serialized in chunks so
+    peak memory stays flat no matter how wide the time window is.
+
+    Args:
+        spots (iterable[dict]): Spots produced by one of the fetch generators
+
+    Returns:
+        Response: Streaming Flask response
+    """
+    ndjson = request.args.get('format') == 'ndjson'
+    mimetype = "application/x-ndjson" if ndjson else "application/json"
+    return Response(stream_with_context(serialize_spots(spots, ndjson)), mimetype=mimetype)
+
 
-    # Build time-based query using lastInterval parameter
-    # Database stores timestamps as separate date and time strings (not datetime objects)
-    if lastInterval:
-        try:
-            minutes = int(lastInterval)
-            threshold = datetime.utcnow() - timedelta(minutes=minutes)
-            # Convert threshold to database format: YYMMDD and HHMM strings
-            threshold_date = f"{threshold.year % 100:02d}{threshold.month:02d}{threshold.day:02d}"
-            threshold_time = f"{threshold.hour:02d}{threshold.minute:02d}"
-            # Query for documents with date > threshold OR (date == threshold AND time >= threshold)
-            query = {"$or": [
-                {"date": {"$gt": threshold_date}},
-                {"date": threshold_date, "time": {"$gte": threshold_time}}
-            ]}
-        except ValueError:
-            query = {}  # Invalid interval, return all documents
+def _join_chunk(chunk, first, ndjson):
+    if ndjson:
+        return "\n".join(chunk) + "\n"
+    return ("" if first else ",") + ",".join(chunk)
 
-    # Fetch and sort spots (newest first)
-    docs = list(collection.find(query).sort([("date", -1), ("time", -1)]))
 
-    # Reverse to display chronologically (earliest to latest)
-    docs.reverse()
-    results = []
+# Serialized /spots, /tbspots and /tbsummary bodies, shared by identical
+# concurrent requests and revalidated with ETags (see response_cache.py);
+# disabled with RESPONSE_CACHE_SECONDS=0
+response_cache = ResponseCache() if RESPONSE_CACHE_SECONDS > 0 else None
 
-    # Receiver location: FN21ni is KD3ALD station in New Jersey
-    rxlat, rxlon = maidenhead.to_location("FN21ni")
 
-    for doc in docs:
-        # Convert transmitter grid square to coordinates
-        txlat, txlon = maidenhead.to_location(doc.get("grid"))
-        # Lookup CQ zone for regional classification
-        zone = get_cq_zone(txlat, txlon)
-        # Convert frequency to band name
-        band = frequency_to_band(doc.get('frequency'))
+def coalesced_spots(route, lastInterval, filters, fetch):
+    """
+    Answer a spot list request through the response cache when possible.
 
-        results.append({
-            "id": f"${doc.get("_id")}",
-            "band": band,
-            "grid": f"{doc.get('grid')}",
-            "time": f"{doc.get('date')} {doc.get('time')}",
-            "cq_zone": zone,
-            "mode": f"{doc.get('mode')}",
-        })
-    return results
+    Concurrent requests with the same normalized parameters share one fetch
+    and serialization; the body is then reused for RESPONSE_CACHE_SECONDS and
+    carries an ETag, so ``If-None-Match`` revalidations get 304 Not Modified.
+    Windows longer than RESPONSE_CACHE_MAX_MINUTES are streamed uncached.
 
+    ``format=columns``/``format=msgpack`` (or the matching Accept header)
+    select the columnar wire format of wire_format.py; those bodies are
+    always built whole, and cached when the window allows.
 
+    Args:
+        route (str): Endpoint path, part of the cache key
+        lastInterval (str): Window in minutes, or None for a start/end range (never cached)
+        filters (dict): Parsed filters, part of the cache key
+        fetch (callable): Returns the spot iterable when the body has to be built
 
+    Returns:
+        Response: Cached, 304 or streaming spot list, or a 406 JSON error
+    """
+    fmt = requested_format(request.args.get('format'), request.headers.get('Accept'))
+    if fmt == "msgpack" and msgpack is None:
+        return jsonify({"error": "format=msgpack needs the msgpack package on the server"}), 406
+    cacheable = response_cache is not None and cacheable_window(lastInterval)
+
+    if fmt in COLUMNAR_FORMATS:
+        def build():
+            return encode_spot_columns(list(fetch()), fmt)
+    elif cacheable:
+        ndjson = fmt == 'ndjson'
+        mimetype = "application/x-ndjson" if ndjson else "application/json"
+
+        def build():
+            return "".join(serialize_spots(fetch(), ndjson)).encode(), mimetype
+    else:
+        return stream_spots(fetch())
+
+    if not cacheable:
+        body, mimetype = build()
+        encoding = choose_encoding(request.headers.get('Accept-Encoding'), len(body))
+        return encoded_response(compress(body, encoding), mimetype, encoding)
+    return conditional_response(cache_key(route, lastInterval, filters, fmt), build)
+
+
+def encode_spot_columns(spots, fmt):
+    """
+    Encode formatted spots in a columnar format (see wire_format.py).
 
+    Args:
+        spots (list[dict]): Formatted spots
+        fmt (str): "columns" or "msgpack"
 
-def fetch_wspr_spots(lastInterval=15):
+    Returns:
+        tuple: (body bytes, mimetype)
     """
-    Fetch WSPR/FT8/FT4 spots for map display with full propagation details.
+    count_spots(len(spots))
+    with stage("serialize"):
+        return encode_columns(spots, fmt, app.json.dumps)
 
-    Retrieves recent spots from MongoDB and returns complete data for map visualization,
-    including both transmitter and receiver coordinates, signal quality metrics,
-    and propagation path information.
+
+def encoded_response(body, mimetype, encoding):
+    """
+    Wrap an already encoded body in a Response.
 
     Args:
-        lastInterval (int): Number of minutes to look back from current time (default: 15)
+        body (bytes): Body, compressed with ``encoding``
+        mimetype (str): Content type
+        encoding (str): "br", "gzip", or None (see response_cache.choose_encoding())
 
     Returns:
-        list[dict]: List of spot dictionaries containing:
-            - tx_sign: Transmitter callsign
-            - tx_lat, tx_lon: Transmitter coordinates (decimal degrees)
-            - rx_sign: Receiver callsign
-            - rx_lat, rx_lon: Receiver coordinates (decimal degrees)
-            - frequency: Frequency in MHz
-            - band: Amateur radio band
-            - mode: Digital mode (wspr/ft8/ft4)
-            - snr: Signal-to-noise ratio in dB
-            - drift: Frequency drift in Hz
-            - time: Timestamp in "YYMMDD HHMM" format
+        Response: Response with Content-Encoding and Vary set
+    """
+    response = Response(body, mimetype=mimetype)
+    response.headers["Vary"] = "Accept, Accept-Encoding"
+    if encoding:
+        response.headers["Content-Encoding"] = encoding
+    return response
 
-    Notes:
-        - Invalid grid squares default to 0,0 coordinates (equator/prime meridian)
-        - Receiver location hardcoded to FN21ni (KD3ALD station)
-        - Client-side filtering handles band/country/zone filtering
-    """
-    query = {}
-
-    # Build time-based MongoDB query
-    if lastInterval:
-        try:
-            minutes = int(lastInterval)
-            threshold = datetime.utcnow() - timedelta(minutes=minutes)
-            threshold_date = f"{threshold.year % 100:02d}{threshold.month:02d}{threshold.day:02d}"
-            threshold_time = f"{threshold.hour:02d}{threshold.minute:02d}"
-            query = {"$or": [
-                {"date": {"$gt": threshold_date}},
-                {"date": threshold_date, "time": {"$gte": threshold_time}}
-            ]}
-        except ValueError:
-            query = {}
-
-    # Fetch spots from database
-    docs = list(collection.find(query).sort([("date", -1), ("time", -1)]))
-
-    # Reverse to display chronologically (earliest to latest)
-    docs.reverse()
-    results = []
-
-    # Receiver location: FN21ni grid square (northern New Jersey)
-    rxlat, rxlon = maidenhead.to_location("FN21ni")
-
-    for doc in docs:
-        # Attempt to convert transmitter grid to coordinates
-        try:
-            txlat, txlon = maidenhead.to_location(doc.get("grid"))
-        except Exception:
-            # Invalid grid square, use default coordinates (ocean/null island)
-            txlat, txlon = 0, 0
-
-        results.append({
-            "drift": doc.get("drift"),
-            "frequency": doc.get("frequency"),
-            "band": doc.get("band"),
-            "mode": doc.get("mode"),
-            "rx_lat": rxlat,
-            "rx_lon": rxlon,
-            "rx_sign": doc.get('rx_callsign'),
-            "snr": doc.get("snr"),
-            "time": f"{doc.get('date')} {doc.get('time')}",
-            "tx_lat": txlat,
-            "tx_lon": txlon,
-            "tx_sign": doc.get('callsign'),
-        })
-    return results
 
+def conditional_response(key, build):
+    """
+    Serve a response cache entry with its ETag, or 304 if the client has it.
+
+    Args:
+        key (tuple): Key from response_cache.cache_key()
+        build (callable): Returns ``(body bytes, mimetype)`` on a cache miss
+
+    Returns:
+        Response: 200 with the body, or 304 Not Modified
+    """
+    entry = response_cache.get(key, build)
+    encoding = choose_encoding(request.headers.get('Accept-Encoding'), len(entry.body))
+    response = encoded_response(response_cache.encoded(entry, encoding), entry.mimetype, encoding)
+    # Each content encoding is a separate representation with its own tag
+    response.set_etag(f"{entry.etag}-{encoding}" if encoding else entry.etag)
+    # Let browsers keep the body but revalidate it on every reload
+    response.headers["Cache-Control"] = "no-cache"
+    return response.make_conditional(request)
+
+
+def spot_filters():
+    """
+    Read the /spots filter query parameters of the current request.
+
+    Returns:
+        dict: Keyword arguments for fetch_wspr_spots() / spot_matches()
+    """
+    mode = request.args.get('mode')
+    return {
+        "band": request.args.get('band'),
+        "modes": [m.lower() for m in mode.split(',') if m] if mode else None,
+        "country": request.args.get('country'),
+        "continent": request.args.get('continent'),
+        "cq_zone": request.args.get('cqzone', type=int),
+        "itu_zone": request.args.get('ITUzone', type=int),
+    }
+
+
+def table_filters(default_band=None):
+    """
+    Read the table band/mode filter query parameters of the current request.
+
+    Args:
+        default_band (str): Band selection used when ``band`` is not given
+
+    Returns:
+        dict: Keyword arguments for spot_matches()
+    """
+    mode = request.args.get('mode')
+    return {
+        "band": request.args.get('band', default_band),
+        "modes": [m.lower() for m in mode.split(',') if m] if mode else None,
+    }
+
+
+def resume_cursor(last_event_id, sources):
+    """
+    Cursor a reconnecting stream resumes from (its Last-Event-ID header).
+
+    Args:
+        last_event_id (str): Header value, or None
+        sources (list[SpotSource]): Selected receivers
+
+    Returns:
+        dict: Receiver id -> ObjectId (see parse_cursor()), or None to start
+        with the whole window
+    """
+    try:
+        return parse_cursor(last_event_id, sources)
+    except InvalidId:
+        return None
+
+
+def stream_spot_events(lastInterval, format_spot, filters, sources, last_event_id=None):
+    """
+    Push new spots to the client as Server-Sent Events.
+
+    The first event carries the whole window (``reset: true``); after that
+    the spot cache is checked every SPOT_STREAM_SECONDS and each event only
+    carries the spots added since the previous one (see fetch_spot_changes();
+    events have the same format as a ``since`` response). Every event also carries
+    ``cutoff`` ("YYMMDD HHMM"): clients drop spots whose time sorts before it,
+    which is how expired spots leave the display. Events are sent even when
+    nothing is new so the cutoff keeps moving and proxies keep the
+    connection open.
+
+    A stream ends after SPOT_STREAM_LIFETIME_SECONDS so it does not hold a
+    worker forever. The browser then reconnects by itself, sending the
+    cursor of the last event (the SSE ``id``) as Last-Event-ID, and the new
+    stream carries on from there without a reset.
+
+    Args:
+        lastInterval (str): Window in minutes; must be covered by the spot cache
+        format_spot (callable): table_spot or map_spot
+        filters (dict): Keyword arguments for spot_matches()
+        sources (list[SpotSource]): Receivers to include
+        last_event_id (str): Last-Event-ID header of a reconnecting client, or None
+
+    Returns:
+        Response: text/event-stream response, or a JSON error if the spot
+        cache is disabled or does not cover the window
+    """
+    try:
+        minutes = int(lastInterval)
+    except (TypeError, ValueError):
+        return jsonify({"error": "lastInterval must be a number of minutes"}), 400
+    if any(source.spot_cache is None for source in sources):
+        return jsonify({"error": "live updates need the spot cache (SPOT_CACHE_MINUTES > 0)"}), 503
+    if not all(source.spot_cache.covers(minutes) for source in sources):
+        return jsonify({"error": f"lastInterval must be 1-{SPOT_CACHE_MINUTES} minutes"}), 400
+
+    def generate():
+        cursor = resume_cursor(last_event_id, sources)
+        deadline = time.monotonic() + SPOT_STREAM_LIFETIME_SECONDS
+        yield f"retry: {int(SPOT_STREAM_SECONDS * 1000)}\n\n"
+        while True:
+            event = fetch_spot_changes(cursor, minutes, format_spot, filters, sources)
+            if event["cursor"]:
+                cursor = parse_cursor(event["cursor"], sources)
+            yield f"id: {event['cursor'] or ''}\ndata: {app.json.dumps(event)}\n\n"
+            if time.monotonic() >= deadline:
+                return
+            time.sleep(SPOT_STREAM_SECONDS)
+
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    return Response(stream_with_context(generate()), mimetype="text/event-stream", headers=headers)
+
+
+def replay_response(filters, sources):
+    """
+    Stream a /spots/replay request as Server-Sent Events (see replay_events()).
+
+    Args:
+        filters (dict): spot_query() filters
+        sources (list[SpotSource]): Receivers to include
+
+    Returns:
+        Response: text/event-stream response, or a 400 JSON error
+    """
+    try:
+        start, end, speed, minutes = parse_replay(request.args)
+    except ValueError as err:
+        return jsonify({"error": str(err)}), 400
+
+    def generate():
+        started = time.monotonic()
+        for due, event in replay_events(start, end, speed, minutes, filters, sources):
+            delay = started + due - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            yield f"data: {app.json.dumps(event)}\n\n"
+
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    return Response(stream_with_context(generate()), mimetype="text/event-stream", headers=headers)
+
+
+def spot_changes_response(format_spot, filters, sources):
+    """
+    Answer a ``since`` request on /spots or /tbspots with a delta.
+
+    ``since=0`` (or empty) asks for a full sync plus a first cursor.
+
+    Args:
+        format_spot (callable): table_spot or map_spot
+        filters (dict): Keyword arguments for spot_matches()
+        sources (list[SpotSource]): Receivers to include
 
+    Returns:
+        Response: JSON delta (see fetch_spot_changes()), or a 400 JSON error
+    """
+    try:
+        minutes = int(request.args.get('lastInterval', '15'))
+        cursor = parse_cursor(request.args.get('since'), sources)
+    except (InvalidId, TypeError, ValueError):
+        return jsonify({"error": "since must be 0 or a cursor from a previous response"}), 400
+    return jsonify(fetch_spot_changes(cursor, minutes, format_spot, filters, sources))
+
+
+def parse_openings(params, last_event_id=None):
+    """
+    Read the parameters of an /openings or /openings/stream request.
+
+    Args:
+        params (Mapping): Query parameters (Flask request.args or Starlette query_params)
+        last_event_id (str): Last-Event-ID header of a reconnecting stream;
+            replaces ``since`` if it is an event id
+
+    Returns:
+        tuple: (since, band, modes, sources); see fetch_openings()
+
+    Raises:
+        ValueError: With a message for the client if ``since`` is not an event id
+            or ``rx`` names an unknown receiver
+    """
+    try:
+        since = int(params.get('since') or 0)
+    except ValueError:
+        raise ValueError("since must be 0 or a cursor from a previous response")
+    if last_event_id and last_event_id.isdigit():
+        since = int(last_event_id)
+    mode = params.get('mode')
+    modes = [m.lower() for m in mode.split(',') if m] if mode else None
+    return since, params.get('band'), modes, selected_sources(params.get('rx'))
+
+
+def parse_stats(params):
+    """
+    Read the parameters of a /stats request.
+
+    Args:
+        params (Mapping): Query parameters (Flask request.args or Starlette query_params)
+
+    Returns:
+        tuple: Positional arguments for fetch_stats()
 
+    Raises:
+        ValueError: With a message for the client if a parameter is invalid
+    """
+    try:
+        if params.get('start'):
+            start = parse_time(params['start'])
+            end = parse_time(params['end']) if params.get('end') else datetime.utcnow()
+        else:
+            start = window_start(int(params.get('lastInterval', '60')))
+            end = datetime.utcnow()
+    except ValueError:
+        raise ValueError("give lastInterval in minutes or start/end as ISO 8601 UTC times") from None
+    if end <= start:
+        raise ValueError("end must be after start")
+    try:
+        cq_zone = int(params['cqzone']) if params.get('cqzone') else None
+    except ValueError:
+        raise ValueError("cqzone must be a CQ zone number") from None
+    group_by = tuple(field for field in (params.get('by') or ",".join(STATS_GROUPS)).split(',') if field)
+    if not set(group_by) <= set(STATS_GROUPS):
+        raise ValueError(f"by must be a comma-separated list of {', '.join(STATS_GROUPS)}")
+    mode = params.get('mode')
+    modes = [m.lower() for m in mode.split(',') if m] if mode else None
+    return start, end, params.get('band'), modes, cq_zone, group_by, selected_sources(params.get('rx'))
+
+
+def openings_unavailable(sources):
+    """Error for opening requests on receivers without a spot cache, or None."""
+    if any(source.openings is None for source in sources):
+        return "band opening detection needs the spot cache (SPOT_CACHE_MINUTES > 0)"
+    return None
+
+
+# Request metrics (see metrics.py): stage timings are collected per request,
+# sent as a Server-Timing header and summarized on /metrics
+Gauge("dashboard_spot_cache_spots", "Spots held in the spot cache per receiver", ("receiver",),
+      lambda: {(source_id,): len(source.spot_cache)
+               for source_id, source in spot_sources.items() if source.spot_cache is not None})
+Gauge("dashboard_peak_rss_megabytes", "Peak resident set size of this process", (),
+      lambda: {(): peak_rss_mb()})
+
+
+@app.before_request
+def start_request_metrics():
+    if METRICS_ENABLED:
+        g.timings = start_timings()
+
+
+@app.after_request
+def add_server_timing(response):
+    timings = g.get("timings")
+    if timings is not None:
+        response.headers["Server-Timing"] = timings.server_timing()
+        g.status = response.status_code
+    return response
+
+
+@app.teardown_request
+def finish_request_metrics(error=None):
+    # Runs after a streamed body has been sent (stream_with_context)
+    timings = g.pop("timings", None)
+    if timings is not None:
+        route = request.url_rule.rule if request.url_rule else "unmatched"
+        finish_timings(timings, route, g.get("status", 500))
 
 
 # Flask Route Definitions
@@ -359,20 +1888,123 @@ def spots():
 
     Query Parameters:
         lastInterval (str): Minutes to look back (default: "15")
-        band (str): Band filter (optional, client-side filtering preferred)
+        band (str): Band filter, e.g. "20m", or "CBs" for the contest bands (optional)
+        mode (str): Comma-separated modes to include, e.g. "wspr,ft8" (optional)
+        country (str): Transmitter country, or "nonUS" for all but the US (optional)
+        continent (str): Transmitter continent (optional)
+        cqzone (int): Transmitter CQ zone 1-40 (optional)
+        ITUzone (int): Transmitter ITU zone 1-90 (optional)
+        format (str): "ndjson" for newline-delimited JSON, "columns" or "msgpack"
+            for the columnar format of wire_format.py (optional)
+        since (str): Cursor from a previous delta, or "0" to start (optional)
+        rx (str): Comma-separated receiver ids from /receivers (default: all)
+        start, end (str): Absolute ISO 8601 UTC range instead of lastInterval
+            (optional; end defaults to now)
+        limit (int): Spots per page of a start/end range (default: SPOT_PAGE_SIZE)
+        after (str): ``next`` cursor of the previous page (optional)
+
+        aggregate (str): "links" for one record per TX -> RX link instead of
+            one per decode (see links.py), "cells" for transmitters binned
+            into Maidenhead cells (see grid_cells.py); with start/end it
+            covers the whole range
+        cell (str): Cell size for aggregate=cells: "field" or "square" (default)
 
     Returns:
-        JSON: Array of spot objects with full TX/RX details
+        JSON: Streamed array of spot objects with full TX/RX details, or with
+        ``since`` a delta {"reset", "cursor", "cutoff", "spots"} holding only
+        the spots added after the cursor (see fetch_spot_changes()), or with
+        ``start`` a page {"start", "end", "next", "spots"} (see fetch_spot_page())
 
     Example:
-        GET /spots?lastInterval=30
-        Returns spots from the last 30 minutes
+        GET /spots?lastInterval=30&band=CBs&mode=ft8,ft4&continent=Europe
+        Returns FT8/FT4 contest-band spots from Europe in the last 30 minutes
     """
-    # Only lastInterval is used server-side; other filters are applied client-side
+    filters = spot_filters()
+    try:
+        sources = selected_sources(request.args.get('rx'))
+        format_spot, new_aggregator, aggregate_key = spot_aggregation(request.args)
+    except ValueError as err:
+        return jsonify({"error": str(err)}), 400
+    precision = database_cells(aggregate_key, filters)
+    if 'start' in request.args:
+        if new_aggregator:
+            return range_aggregate_response(format_spot, new_aggregator, filters, sources, precision)
+        return spot_page_response(map_spot, MAP_PROJECTION, filters, sources)
+    if 'since' in request.args:
+        if new_aggregator:
+            return jsonify({"error": "aggregate cannot be combined with since"}), 400
+        return spot_changes_response(map_spot, filters, sources)
+
     lastInterval = request.args.get('lastInterval', '15')
-    band = request.args.get('band')  # Currently unused but preserved for API compatibility
-    spots = fetch_wspr_spots(lastInterval=lastInterval)
-    return jsonify(spots)
+
+    def fetch():
+        if precision:
+            return fetch_cells(precision, filters, sources, lastInterval)
+        spots = fetch_wspr_spots(lastInterval=lastInterval, sources=sources, format_spot=format_spot, **filters)
+        return aggregated(new_aggregator, spots) if new_aggregator else spots
+
+    return coalesced_spots('/spots', lastInterval, {**filters, "rx": source_ids(sources), **aggregate_key}, fetch)
+
+@app.route('/spots/stream')
+def spots_stream():
+    """
+    Server-Sent Events endpoint: live map updates.
+
+    Sends the current window once, then only newly decoded spots as they
+    reach the spot cache, instead of the client re-fetching the whole window
+    on a timer. See stream_spot_events() for the event format.
+
+    Query Parameters:
+        Same filters as /spots (lastInterval, band, mode, country, continent,
+        cqzone, ITUzone, rx). lastInterval must fit in SPOT_CACHE_MINUTES.
+
+    Returns:
+        text/event-stream: One JSON event per SPOT_STREAM_SECONDS:
+        {"reset": bool, "cursor": str, "cutoff": "YYMMDD HHMM", "spots": [map spots]}
+
+    Example:
+        new EventSource("/spots/stream?lastInterval=15&band=CBs")
+    """
+    try:
+        sources = selected_sources(request.args.get('rx'))
+    except ValueError as err:
+        return jsonify({"error": str(err)}), 400
+    return stream_spot_events(
+        request.args.get('lastInterval', '15'),
+        map_spot,
+        spot_filters(),
+        sources,
+        request.headers.get('Last-Event-ID'),
+    )
+
+@app.route('/spots/replay')
+def spots_replay():
+    """
+    Server-Sent Events endpoint: replay a past range on the map.
+
+    Streams the spots of an absolute range one spot minute per event, at
+    ``speed`` times real time, in the /spots/stream event format, so the map
+    can show how bands opened during a past contest. The range is read a
+    page at a time. See replay_events() for the event format.
+
+    Query Parameters:
+        start, end (str): ISO 8601 UTC range to replay (end defaults to now)
+        speed (float): Replayed seconds per second (default: 60, at most REPLAY_MAX_SPEED)
+        lastInterval (str): Minutes of spots kept on the map (default: "15")
+        band, mode, country, continent, cqzone, ITUzone, rx: As for /spots
+
+    Returns:
+        text/event-stream: {"reset", "cursor", "cutoff", "time", "spots"} per
+        replayed minute; the last event has "done": true
+
+    Example:
+        new EventSource("/spots/replay?start=2026-10-10T00:00Z&end=2026-10-12T00:00Z&speed=600&band=CBs")
+    """
+    try:
+        sources = selected_sources(request.args.get('rx'))
+    except ValueError as err:
+        return jsonify({"error": str(err)}), 400
+    return replay_response(spot_filters(), sources)
 
 @app.route('/tbspots')
 def tbspots():
@@ -384,19 +2016,280 @@ def tbspots():
 
     Query Parameters:
         lastInterval (str): Minutes to look back (default: "15")
-        band (str): Band filter (optional)
+        band (str): Band name, or "CBs" for the contest bands (optional)
+        mode (str): Comma-separated modes, e.g. "wspr,ft8" (optional)
+        format (str): "ndjson" for newline-delimited JSON, "columns" or "msgpack"
+            for the columnar format of wire_format.py (optional)
+        since (str): Cursor from a previous delta, or "0" to start (optional)
+        rx (str): Comma-separated receiver ids from /receivers (default: all)
+        start, end, limit, after: Absolute range read in pages, as for /spots
 
     Returns:
-        JSON: Array of spot objects with band, grid, time, cq_zone, mode
+        JSON: Streamed array of spot objects with band, grid, time, cq_zone,
+        region, mode, or with ``since`` a delta and with ``start`` a page like /spots
 
     Example:
         GET /tbspots?lastInterval=15
         Returns spots from the last 15 minutes formatted for table view
     """
+    try:
+        sources = selected_sources(request.args.get('rx'))
+    except ValueError as err:
+        return jsonify({"error": str(err)}), 400
+    filters = table_filters()
+    if 'start' in request.args:
+        return spot_page_response(table_spot, TABLE_PROJECTION, filters, sources)
+    if 'since' in request.args:
+        return spot_changes_response(table_spot, filters, sources)
+
+    lastInterval = request.args.get('lastInterval', '15')
+    return coalesced_spots('/tbspots', lastInterval, {**filters, "rx": source_ids(sources)},
+                           lambda: fetch_wspr_spots_tb(lastInterval=lastInterval, sources=sources, **filters))
+
+@app.route('/tbsummary')
+def tbsummary():
+    """
+    REST API endpoint: Region x band x mode spot counts for the table view.
+
+    Returns the finished count matrix instead of individual spots, so a table
+    refresh transfers a few hundred bytes regardless of how busy the bands are.
+
+    Query Parameters:
+        lastInterval (str): Minutes to look back (default: "15")
+        band (str): Band name, or "CBs" for the contest bands (default: "CBs")
+        mode (str): Comma-separated modes to include, e.g. "wspr,ft8" (optional)
+        rx (str): Comma-separated receiver ids from /receivers (default: all)
+
+    Returns:
+        JSON: {"lastInterval", "total", "counts": {region: {band: {mode: count}}}}
+
+    Example:
+        GET /tbsummary?lastInterval=15&mode=ft8,ft4
+    """
     lastInterval = request.args.get('lastInterval', '15')
-    band = request.args.get('band')  # Currently unused
-    spots = fetch_wspr_spots_tb(lastInterval=lastInterval)
-    return jsonify(spots)
+    band = request.args.get('band', 'CBs')
+    mode = request.args.get('mode')
+    modes = [m for m in mode.split(',') if m] if mode else None
+    try:
+        sources = selected_sources(request.args.get('rx'))
+    except ValueError as err:
+        return jsonify({"error": str(err)}), 400
+    if response_cache is None:
+        return jsonify(fetch_table_summary(lastInterval=lastInterval, band=band, modes=modes, sources=sources))
+
+    def build():
+        summary = jsonify(fetch_table_summary(lastInterval=lastInterval, band=band, modes=modes, sources=sources))
+        return summary.get_data(), summary.mimetype
+
+    filters = {"band": band, "modes": [m.lower() for m in modes] if modes else None, "rx": source_ids(sources)}
+    return conditional_response(cache_key('/tbsummary', lastInterval, filters), build)
+
+@app.route('/tbspots/stream')
+def tbspots_stream():
+    """
+    Server-Sent Events endpoint: live table updates.
+
+    Same event stream as /spots/stream, carrying /tbspots records (which
+    include the region), so the table can keep its count matrix current by
+    adding new spots and subtracting spots that fall behind the cutoff.
+
+    Query Parameters:
+        lastInterval (str): Minutes to look back (default: "15")
+        band (str): Band name, or "CBs" for the contest bands (default: "CBs")
+        mode (str): Comma-separated modes to include, e.g. "wspr,ft8" (optional)
+        rx (str): Comma-separated receiver ids from /receivers (default: all)
+
+    Returns:
+        text/event-stream: {"reset", "cursor", "cutoff", "spots": [table spots]}
+
+    Example:
+        new EventSource("/tbspots/stream?lastInterval=15&mode=ft8")
+    """
+    try:
+        sources = selected_sources(request.args.get('rx'))
+    except ValueError as err:
+        return jsonify({"error": str(err)}), 400
+    return stream_spot_events(request.args.get('lastInterval', '15'), table_spot, table_filters('CBs'),
+                              sources, request.headers.get('Last-Event-ID'))
+
+@app.route('/openings')
+def openings():
+    """
+    REST API endpoint: band openings detected from the live spots (see band_openings.py).
+
+    Query Parameters:
+        since (int): Cursor from a previous response; only newer events are returned
+        band (str): Band name, or "CBs" for the contest bands (default: all)
+        mode (str): Comma-separated modes to include, e.g. "wspr,ft8" (optional)
+        rx (str): Comma-separated receiver ids from /receivers (default: all)
+
+    Returns:
+        JSON: {"cursor", "open": [open paths], "events": [opening/closing events]}
+        (see fetch_openings()), or a 503 JSON error without the spot cache
+
+    Example:
+        GET /openings?band=CBs&since=41
+    """
+    try:
+        since, band, modes, sources = parse_openings(request.args)
+    except ValueError as err:
+        return jsonify({"error": str(err)}), 400
+    error = openings_unavailable(sources)
+    if error:
+        return jsonify({"error": error}), 503
+    return jsonify(fetch_openings(since, band, modes, sources))
+
+@app.route('/openings/stream')
+def openings_stream():
+    """
+    Server-Sent Events endpoint: band opening alerts.
+
+    The first event carries every kept event; after that the detectors are
+    checked every SPOT_STREAM_SECONDS and each event only carries the new
+    ones, with the paths open at that time. Same parameters and event
+    format as /openings. Like the spot streams, it ends after
+    SPOT_STREAM_LIFETIME_SECONDS and the browser resumes from the last event id.
+
+    Example:
+        new EventSource("/openings/stream?band=CBs&mode=ft8")
+    """
+    try:
+        since, band, modes, sources = parse_openings(request.args, request.headers.get('Last-Event-ID'))
+    except ValueError as err:
+        return jsonify({"error": str(err)}), 400
+    error = openings_unavailable(sources)
+    if error:
+        return jsonify({"error": error}), 503
+
+    def generate():
+        cursor = since
+        deadline = time.monotonic() + SPOT_STREAM_LIFETIME_SECONDS
+        yield f"retry: {int(SPOT_STREAM_SECONDS * 1000)}\n\n"
+        while True:
+            event = fetch_openings(cursor, band, modes, sources)
+            cursor = event["cursor"]
+            yield f"id: {cursor}\ndata: {app.json.dumps(event)}\n\n"
+            if time.monotonic() >= deadline:
+                return
+            time.sleep(SPOT_STREAM_SECONDS)
+
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    return Response(stream_with_context(generate()), mimetype="text/event-stream", headers=headers)
+
+@app.route('/stats')
+def stats():
+    """
+    REST API endpoint: SNR (and WSPR drift) median/p90 per band, CQ zone and mode.
+
+    Answered by merging the per-bucket histograms kept as spots arrive
+    (see spot_stats.py), without reading raw spots.
+
+    Query Parameters:
+        lastInterval (str): Minutes to look back (default: "60"), or
+        start, end (str): ISO 8601 UTC window within STATS_RETENTION_HOURS
+        band (str): Band name, or "CBs" for the contest bands (default: all)
+        mode (str): Comma-separated modes to include, e.g. "wspr,ft8" (optional)
+        cqzone (int): Transmitter CQ zone (optional)
+        by (str): Comma-separated fields to group by: band, cq_zone, mode (default: all three)
+        rx (str): Comma-separated receiver ids from /receivers (default: all)
+
+    Returns:
+        JSON: {"start", "end", "bucket_minutes", "stats": [...]} (see fetch_stats()),
+        or a 503 JSON error without the spot cache
+
+    Example:
+        GET /stats?lastInterval=120&band=CBs&by=band,cq_zone
+    """
+    try:
+        args = parse_stats(request.args)
+    except ValueError as err:
+        return jsonify({"error": str(err)}), 400
+    if any(source.stats is None for source in args[-1]):
+        return jsonify({"error": "statistics need the spot cache (SPOT_CACHE_MINUTES > 0)"}), 503
+    return jsonify(fetch_stats(*args))
+
+@app.route('/metrics')
+def metrics():
+    """
+    Prometheus metrics: stage timings, cache hit rates, request and spot
+    count histograms, MongoDB pool statistics (see metrics.py).
+
+    Returns:
+        text/plain: Prometheus text exposition format, or a 404 JSON error
+        with METRICS_ENABLED=0
+    """
+    if not METRICS_ENABLED:
+        return jsonify({"error": "metrics are disabled (METRICS_ENABLED=0)"}), 404
+    return Response(render_metrics(), content_type=PROMETHEUS_CONTENT_TYPE)
+
+@app.route('/debug/profile')
+def debug_profile():
+    """
+    Sample the server's stacks for a flame graph (see profiler.py).
+
+    Query Parameters:
+        seconds (float): Capture length (default: 10, at most PROFILE_MAX_SECONDS)
+
+    Returns:
+        text/plain: Folded stacks for flamegraph.pl or speedscope, a 409
+        JSON error while another capture runs, or 404 unless PROFILER_ENABLED=1
+
+    Example:
+        curl "http://localhost:5000/debug/profile?seconds=30" > spots.folded
+    """
+    if not PROFILER_ENABLED:
+        return jsonify({"error": "profiling is disabled (PROFILER_ENABLED=0)"}), 404
+    stacks = sample_stacks(request.args.get('seconds', 10, type=float))
+    if stacks is None:
+        return jsonify({"error": "a profile capture is already running"}), 409
+    return Response(folded(stacks), mimetype="text/plain")
+
+@app.route('/receivers')
+def receivers_list():
+    """
+    REST API endpoint: The receivers in the registry.
+
+    Returns:
+        JSON: Array of {"id", "callsign", "locator", "lat", "lon"}; the ids are
+        the values accepted by the ``rx`` parameter of the spot endpoints
+
+    Example:
+        GET /receivers
+        [{"id": "kd3ald", "callsign": "KD3ALD", "locator": "FN21ni", "lat": 41.33, "lon": -74.92}]
+    """
+    return jsonify([
+        {"id": r.id, "callsign": r.callsign, "locator": r.locator, "lat": r.lat, "lon": r.lon}
+        for r in receivers
+    ])
+
+@app.route('/zones/<name>')
+def zone_asset(name):
+    """
+    Simplified zone boundary assets for the map overlays (see zone_assets.py).
+
+    ``/zones/manifest.json`` lists the assets of each layer and zoom band; it
+    is revalidated on every load. The assets have a content hash in their
+    name and are cached for a year. The precompressed brotli or gzip variant
+    is sent when the client accepts it.
+
+    Returns:
+        GeoJSON/JSON file, 304 Not Modified, or a 404 JSON error if the
+        assets have not been built (python zone_assets.py)
+
+    Example:
+        GET /zones/manifest.json
+        GET /zones/cq_zone-z2.3f9a2b1c0d4e.geojson
+    """
+    asset = find_zone_asset(name, request.headers.get('Accept-Encoding'))
+    if asset is None:
+        return jsonify({"error": f"no zone asset {name!r} (build them with python zone_assets.py)"}), 404
+    response = send_file(asset.path, mimetype=asset.mimetype, conditional=True)
+    response.headers["Vary"] = "Accept-Encoding"
+    if asset.encoding:
+        response.headers["Content-Encoding"] = asset.encoding
+    response.headers["Cache-Control"] = (f"public, max-age={asset.max_age}, immutable"
+                                         if asset.max_age else "no-cache")
+    return response
 
 @app.route('/table')
 def table():
@@ -411,6 +2304,9 @@ def table():
     """
     return render_template("table_ft.html")
 
+startup.mark("spot sources and routes")
+app.logger.info(startup.summary())
+
 # Application Entry Point
 if __name__ == '__main__':
     """
@@ -419,7 +2315,8 @@ if __name__ == '__main__':
     Debug mode is enabled for development. For production deployment,
     use a production WSGI server like gunicorn or uwsgi.
 
-    Example production command:
-        gunicorn -w 4 -b 0.0.0.0:5000 web-ft:app
+    Example production command (threaded workers, so live update streams
+    do not tie up a whole worker each):
+        gunicorn -w 4 -k gthread --threads 32 -b 0.0.0.0:5000 web-ft:app
     """
     app.run(debug=True)
\ No newline at end of file
@@ -0,0 +1,163 @@
+"""
+HamSCI Contesting and DXing Dashboard - Columnar Spot Wire Format
+
+Opt-in compact encoding for /spots and /tbspots. A JSON array of spot objects
+repeats every key on every row, and map spots also repeat the receiver
+coordinates and callsign. The columnar format instead sends:
+
+    {
+      "format": "columns",
+      "count": 3,
+      "constants": {"rx_lat": 41.35, "rx_lon": -75.63, "rx_sign": "KD3ALD"},
+      "dictionaries": {"band": ["20m", "40m"], "mode": ["ft8", "wspr"]},
+      "columns": {"band": [0, 1, 0], "mode": [0, 0, 1], "snr": [-12, 3, -20]}
+    }
+
+Row i is rebuilt as ``constants`` plus, for every column, either
+``dictionaries[field][columns[field][i]]`` (dictionary-encoded fields) or
+``columns[field][i]``. Fields with the same value on every row are hoisted
+into ``constants``.
+
+The ``msgpack`` variant (needs the optional ``msgpack`` package) sends the
+same structure as MessagePack, with numeric columns packed as little-endian
+typed arrays ``{"dtype": "<f4", "data": <bytes>}`` that a browser can wrap
+in a Float32Array/Int16Array/Uint16Array without parsing.
+
+Selected with ``format=columns`` / ``format=msgpack`` or an Accept header of
+COLUMNS_MIMETYPE / MSGPACK_MIMETYPE.
+
+Project: HamSCI Personal Space Weather Station Dashboard Development
+"""
+
+import numpy as np
+
+try:
+    import msgpack
+except ImportError:  # optional: only needed for format=msgpack
+    msgpack = None
+
+COLUMNS_MIMETYPE = "application/vnd.hamsci.columns+json"
+MSGPACK_MIMETYPE = "application/x-msgpack"
+COLUMNAR_FORMATS = ("columns", "msgpack")
+
+# Low-cardinality string fields sent as an index into a per-response dictionary
+DICTIONARY_FIELDS = ("tx_sign", "rx_sign", "band", "mode", "time", "grid", "region", "first_seen", "last_seen")
+
+# Numeric fields packed as typed arrays in the msgpack variant
+TYPED_FIELDS = {
+    "tx_lat": "<f4", "tx_lon": "<f4", "rx_lat": "<f4", "rx_lon": "<f4",
+    "frequency": "<f8", "snr": "<i2", "drift": "<i2", "cq_zone": "<u1",
+    "count": "<u4", "snr_min": "<i2", "snr_max": "<i2", "snr_last": "<i2",
+    "stations": "<u4", "best_snr": "<i2",
+}
+
+
+def requested_format(fmt, accept=None):
+    """
+    Resolve the response format from the ``format`` parameter or Accept header.
+
+    Args:
+        fmt (str): ``format`` query parameter, or None
+        accept (str): Accept header value, or None
+
+    Returns:
+        str: "columns", "msgpack", "ndjson", or None for the JSON array
+
+    Example:
+        >>> requested_format(None, "application/vnd.hamsci.columns+json")
+        'columns'
+    """
+    if fmt:
+        return fmt
+    if accept:
+        if COLUMNS_MIMETYPE in accept:
+            return "columns"
+        if MSGPACK_MIMETYPE in accept:
+            return "msgpack"
+    return None
+
+
+def to_columns(spots):
+    """
+    Convert spot dictionaries into the columnar structure.
+
+    Args:
+        spots (list[dict]): Spots with the same keys, e.g. from fetch_wspr_spots()
+
+    Returns:
+        dict: {"format", "count", "constants", "dictionaries", "columns"}
+
+    Example:
+        >>> to_columns([{"band": "20m", "snr": -5}, {"band": "20m", "snr": 2}])
+        {'format': 'columns', 'count': 2, 'constants': {'band': '20m'}, 'dictionaries': {}, 'columns': {'snr': [-5, 2]}}
+    """
+    constants, dictionaries, columns = {}, {}, {}
+    for field in (spots[0] if spots else ()):
+        values = [spot.get(field) for spot in spots]
+        first = values[0]
+        if all(value == first and type(value) is type(first) for value in values):
+            constants[field] = first
+        elif field in DICTIONARY_FIELDS:
+            index = {}
+            columns[field] = [index.setdefault(value, len(index)) for value in values]
+            dictionaries[field] = list(index)
+        else:
+            columns[field] = values
+    return {
+        "format": "columns",
+        "count": len(spots),
+        "constants": constants,
+        "dictionaries": dictionaries,
+        "columns": columns,
+    }
+
+
+def _typed(values, dtype):
+    if any(value is None or isinstance(value, (bool, str)) for value in values):
+        return values
+    return {"dtype": dtype, "data": np.asarray(values, dtype=dtype).tobytes()}
+
+
+def pack_columns(table):
+    """
+    Encode a columnar structure as MessagePack with typed numeric arrays.
+
+    Args:
+        table (dict): Result of to_columns()
+
+    Returns:
+        bytes: MessagePack document
+
+    Raises:
+        RuntimeError: If the msgpack package is not installed
+    """
+    if msgpack is None:
+        raise RuntimeError("format=msgpack needs the msgpack package (pip install msgpack)")
+    columns = {}
+    for field, values in table["columns"].items():
+        if field in table["dictionaries"]:
+            size = len(table["dictionaries"][field])
+            columns[field] = _typed(values, "<u2" if size <= 0xFFFF else "<u4")
+        elif field in TYPED_FIELDS:
+            columns[field] = _typed(values, TYPED_FIELDS[field])
+        else:
+            columns[field] = values
+    return msgpack.packb({**table, "columns": columns}, use_bin_type=True)
+
+
+def encode_columns(spots, fmt, dumps):
+    """
+    Serialize spots in one of the COLUMNAR_FORMATS.
+
+    Args:
+        spots (iterable[dict]): Formatted spots
+        fmt (str): "columns" or "msgpack"
+        dumps (callable): JSON serializer for the "columns" format
+
+    Returns:
+        tuple: (body bytes, mimetype)
+    """
+    table = to_columns(list(spots))
+    if fmt == "msgpack":
+        return pack_columns(table), MSGPACK_MIMETYPE
+    return dumps(table).encode(), COLUMNS_MIMETYPE
@@ -0,0 +1,216 @@
+"""
+HamSCI Contesting and DXing Dashboard - Simplified Zone Boundary Assets
+
+The map draws CQ zone outlines (and can draw ITU zones, countries and
+continents) from the bundled GeoJSON files, which are megabytes of
+full-resolution polygons. This module builds small display versions once:
+for each layer and zoom band the polygons are simplified to about one screen
+pixel, coordinates are rounded, and each feature carries a precomputed label
+point. Adjacent polygons are simplified together (shapely.coverage_simplify)
+so shared borders stay shared where the source polygons line up.
+
+Every asset is written as ``<layer>-z<zoom>.<hash>.geojson`` with
+precompressed ``.gz`` and ``.br`` variants (``.br`` needs the optional
+``brotli`` package), plus a ``manifest.json`` listing them. The content hash
+in the file name lets the server send assets with a one-year immutable
+Cache-Control; only the manifest is revalidated.
+
+Usage:
+    python zone_assets.py           # (re)build data/zone_assets/
+
+Project: HamSCI Personal Space Weather Station Dashboard Development
+"""
+
+from collections import namedtuple
+import gzip
+import hashlib
+import json
+import os
+
+import numpy as np
+import shapely
+from shapely.geometry import mapping, shape
+
+from response_cache import accepted_encodings, brotli
+from zones import GEOJSON_DIR, ZONE_LAYERS, geojson_signature
+
+ZONE_ASSET_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "zone_assets")
+ZONE_ASSET_MANIFEST = "manifest.json"
+
+# Bump when the asset layout changes
+ZONE_ASSET_VERSION = 1
+
+# (highest Leaflet zoom, tolerance in degrees, coordinate decimals); a degree
+# is about 1.4 px at zoom 2 and 5.7 px at zoom 4, so each band simplifies to
+# well under a pixel. None covers every zoom above the previous band.
+ZOOM_LEVELS = (
+    (2, 0.2, 2),
+    (4, 0.05, 2),
+    (6, 0.0125, 3),
+    (None, 0.003, 3),
+)
+
+# Hashed assets never change; one year is the conventional "forever"
+ASSET_MAX_AGE = 365 * 24 * 3600
+
+# Precompressed variants, preferred first
+ASSET_ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+ZoneAsset = namedtuple("ZoneAsset", ["path", "encoding", "mimetype", "max_age"])
+
+
+def simplify_layer(geometries, tolerance):
+    """
+    Simplify a layer's polygons, keeping shared borders shared.
+
+    Args:
+        geometries (numpy.ndarray): Shapely polygons of one layer
+        tolerance (float): Simplification tolerance in degrees
+
+    Returns:
+        numpy.ndarray: Simplified polygons in the same order
+    """
+    if hasattr(shapely, "coverage_simplify"):  # shapely 2.1+ with GEOS 3.12+
+        return shapely.coverage_simplify(geometries, tolerance)
+    return shapely.simplify(geometries, tolerance, preserve_topology=True)
+
+
+def feature_collection(values, geometries, labels, property_name, decimals):
+    """
+    Serialize simplified polygons as a compact GeoJSON FeatureCollection.
+
+    Args:
+        values (list): Zone value of each polygon
+        geometries (numpy.ndarray): Simplified polygons
+        labels (list[list[float]]): [lat, lon] label point of each polygon
+        property_name (str): Feature property holding the zone value
+        decimals (int): Decimals kept in each coordinate
+
+    Returns:
+        bytes: UTF-8 GeoJSON without whitespace
+    """
+    rounded = shapely.transform(geometries, lambda coords: np.round(coords, decimals))
+    features = [
+        {
+            "type": "Feature",
+            "properties": {property_name: value, "label": label},
+            "geometry": mapping(geometry),
+        }
+        for value, geometry, label in zip(values, rounded, labels)
+        if not geometry.is_empty
+    ]
+    collection = {"type": "FeatureCollection", "features": features}
+    return json.dumps(collection, separators=(",", ":")).encode()
+
+
+def write_asset(directory, stem, body):
+    """
+    Write an asset under a content-hashed name, with .gz/.br variants.
+
+    Args:
+        directory (str): Output directory
+        stem (str): Name before the hash, e.g. "cq_zone-z2"
+        body (bytes): Asset content
+
+    Returns:
+        str: File name of the uncompressed asset
+    """
+    name = f"{stem}.{hashlib.blake2b(body, digest_size=6).hexdigest()}.geojson"
+    path = os.path.join(directory, name)
+    with open(path, "wb") as f:
+        f.write(body)
+    with open(path + ".gz", "wb") as f:
+        f.write(gzip.compress(body, compresslevel=9, mtime=0))
+    if brotli is not None:
+        with open(path + ".br", "wb") as f:
+            f.write(brotli.compress(body, quality=11))
+    return name
+
+
+def build_zone_assets(geojson_dir=GEOJSON_DIR, directory=ZONE_ASSET_DIR):
+    """
+    Build the simplified assets of every layer and zoom band.
+
+    Args:
+        geojson_dir (str): Directory containing the GeoJSON boundary files
+        directory (str): Output directory; previous assets are removed
+
+    Returns:
+        dict: The manifest written to ``manifest.json``
+    """
+    os.makedirs(directory, exist_ok=True)
+    for name in os.listdir(directory):
+        os.remove(os.path.join(directory, name))
+
+    layers = {}
+    for layer, (filename, property_name) in ZONE_LAYERS.items():
+        with open(os.path.join(geojson_dir, filename)) as f:
+            data = json.load(f)
+        values = [feature["properties"].get(property_name) for feature in data["features"]]
+        geometries = np.array([shape(feature["geometry"]) for feature in data["features"]], dtype=object)
+        # Bounding box centers of the full polygons, as turf.center() computes them
+        bounds = shapely.bounds(geometries)
+        labels = [[round((s + n) / 2, 3), round((w + e) / 2, 3)] for w, s, e, n in bounds]
+
+        levels = []
+        for max_zoom, tolerance, decimals in ZOOM_LEVELS:
+            body = feature_collection(values, simplify_layer(geometries, tolerance), labels,
+                                      property_name, decimals)
+            stem = f"{layer}-z{max_zoom if max_zoom is not None else 'max'}"
+            levels.append({
+                "max_zoom": max_zoom,
+                "tolerance": tolerance,
+                "url": f"/zones/{write_asset(directory, stem, body)}",
+                "bytes": len(body),
+            })
+        layers[layer] = {"property": property_name, "levels": levels}
+
+    manifest = {
+        "version": ZONE_ASSET_VERSION,
+        "sources": geojson_signature(geojson_dir),
+        "layers": layers,
+    }
+    with open(os.path.join(directory, ZONE_ASSET_MANIFEST), "w") as f:
+        json.dump(manifest, f, indent=1)
+    return manifest
+
+
+def find_zone_asset(name, accept_encoding=None, directory=ZONE_ASSET_DIR):
+    """
+    Locate a built asset and the best precompressed variant for a client.
+
+    Args:
+        name (str): File name from the manifest, or "manifest.json"
+        accept_encoding (str): Accept-Encoding header value, or None
+        directory (str): Asset directory
+
+    Returns:
+        ZoneAsset: File to send, its Content-Encoding (or None), mimetype and
+        Cache-Control max-age; None if there is no such asset
+
+    Example:
+        >>> find_zone_asset("cq_zone-z2.3f9a2b1c0d4e.geojson", "gzip, br").encoding
+        'br'
+    """
+    if name != os.path.basename(name) or name.endswith((".gz", ".br")):
+        return None
+    path = os.path.join(directory, name)
+    if not os.path.isfile(path):
+        return None
+    if name == ZONE_ASSET_MANIFEST:
+        return ZoneAsset(path, None, "application/json", 0)
+
+    accepted = accepted_encodings(accept_encoding)
+    for encoding, suffix in ASSET_ENCODINGS:
+        if encoding in accepted and os.path.isfile(path + suffix):
+            return ZoneAsset(path + suffix, encoding, "application/geo+json", ASSET_MAX_AGE)
+    return ZoneAsset(path, None, "application/geo+json", ASSET_MAX_AGE)
+
+
+if __name__ == '__main__':
+    manifest = build_zone_assets()
+    for layer, entry in manifest["layers"].items():
+        sizes = ", ".join(f"z{level['max_zoom'] or 'max'} {level['bytes'] // 1024} KB"
+                          for level in entry["levels"])
+        print(f"{layer}: {sizes}")
+    print(f"Wrote {ZONE_ASSET_DIR}")
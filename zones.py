@@ -0,0 +1,331 @@
+"""
+HamSCI Contesting and DXing Dashboard - Zone Lookup Engine
+
+Spatial index for classifying coordinates into CQ zones, ITU zones, countries
+and continents. Each boundary file is loaded once into a shapely STRtree of
+prepared geometries, so a lookup only runs point-in-polygon tests against the
+handful of polygons whose bounding boxes contain the point instead of walking
+every polygon in the file.
+
+Batch lookups (lists or NumPy arrays of coordinates) are answered with a single
+vectorized tree query, which is what the spot endpoints use to classify a whole
+window of spots at once.
+
+Parsing the GeoJSON files takes about half a second and most lookups are
+answered by the grid table (grid_table.py) anyway, so the dashboard loads zone
+geometry lazily through shared_zone_lookup(). That reads a preprocessed
+compact file instead of the GeoJSON: topology-preserving simplified polygons
+stored as WKB in one memory-mapped blob (``data/zones.npy`` plus a JSON
+sidecar), rebuilt automatically when the GeoJSON files change.
+
+Usage:
+    python zones.py                 # (re)build the compact zone file
+
+Configuration (environment / .env):
+    ZONE_SIMPLIFY_DEGREES=0.001     Simplification tolerance of the compact
+                                    file (0 keeps the exact polygons)
+
+Project: HamSCI Personal Space Weather Station Dashboard Development
+"""
+
+import json
+import os
+import threading
+
+import numpy as np
+import shapely
+from shapely import STRtree
+from shapely.geometry import Point, shape
+
+# Directory holding the GeoJSON boundary files (shared with the frontend)
+GEOJSON_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static", "js")
+
+# Preprocessed zone geometry (not committed; rebuilt when missing or stale)
+ZONE_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "zones.npy")
+
+# Bump when the on-disk layout changes so stale files are rebuilt
+ZONE_CACHE_VERSION = 1
+
+# About 110 m; changes the zone of roughly 1 in 30,000 subsquare corners
+ZONE_SIMPLIFY_DEGREES = float(os.getenv('ZONE_SIMPLIFY_DEGREES', '0.001'))
+
+# Layer name -> (GeoJSON file, feature property holding the zone value)
+ZONE_LAYERS = {
+    "cq_zone": ("cqzones.geojson", "cq_zone_number"),
+    "itu_zone": ("ituzones.geojson", "itu_zone_number"),
+    "country": ("world.geojson", "NAME_LONG"),
+    "continent": ("continents.geojson", "continent"),
+}
+
+
+def geojson_signature(geojson_dir):
+    """Size and mtime of each boundary file, used to detect stale derived files."""
+    signature = {}
+    for filename, _ in ZONE_LAYERS.values():
+        st = os.stat(os.path.join(geojson_dir, filename))
+        signature[filename] = [st.st_size, int(st.st_mtime)]
+    return signature
+
+
+class ZoneIndex:
+    """
+    Spatial index over one set of zone polygons (e.g. the 40 CQ zones).
+
+    Polygons are prepared and stored in an STRtree. When polygons overlap
+    (shared borders, crude continent boxes) the feature listed first in the
+    source file wins, matching the original linear-scan behavior.
+
+    Args:
+        values (list): Zone value for each polygon (zone number, country name, ...)
+        geometries (list): Shapely geometries in the same order as ``values``
+    """
+
+    def __init__(self, values, geometries):
+        self.values = list(values)
+        self.geometries = np.asarray(geometries, dtype=object)
+        shapely.prepare(self.geometries)
+        self.tree = STRtree(self.geometries)
+
+    @classmethod
+    def from_geojson(cls, path, property_name):
+        """
+        Build an index from a GeoJSON FeatureCollection.
+
+        Args:
+            path (str): Path to the GeoJSON file
+            property_name (str): Feature property used as the zone value
+
+        Returns:
+            ZoneIndex: Index over every feature in the file
+        """
+        with open(path) as f:
+            data = json.load(f)
+
+        values = []
+        geometries = []
+        for feature in data["features"]:
+            values.append(feature["properties"].get(property_name))
+            geometries.append(shape(feature["geometry"]))
+        return cls(values, geometries)
+
+    def __len__(self):
+        return len(self.values)
+
+    def lookup(self, lat, lon):
+        """
+        Find the zone containing a single coordinate.
+
+        Args:
+            lat (float): Latitude in decimal degrees
+            lon (float): Longitude in decimal degrees
+
+        Returns:
+            Zone value, or None if the point is outside every polygon
+
+        Example:
+            >>> cq_index.lookup(40.7128, -74.0060)  # New York City
+            5
+        """
+        # Shapely uses (lon, lat) order, not (lat, lon)
+        hits = self.tree.query(Point(lon, lat), predicate="within")
+        if len(hits) == 0:
+            return None
+        return self.values[hits.min()]
+
+    def lookup_many(self, lats, lons):
+        """
+        Find the zone containing each of many coordinates in one tree query.
+
+        Args:
+            lats (array-like): Latitudes in decimal degrees (NaN for unknown)
+            lons (array-like): Longitudes in decimal degrees (NaN for unknown)
+
+        Returns:
+            list: Zone value (or None) for each coordinate, in input order
+        """
+        lats = np.asarray(lats, dtype=float)
+        lons = np.asarray(lons, dtype=float)
+        if lats.size == 0:
+            return []
+
+        points = shapely.points(lons, lats)
+        point_idx, zone_idx = self.tree.query(points, predicate="within")
+
+        # Keep the lowest feature index per point so file order breaks ties
+        best = np.full(lats.size, len(self.values), dtype=np.intp)
+        np.minimum.at(best, point_idx, zone_idx)
+
+        values = self.values + [None]
+        return [values[i] for i in best]
+
+
+class ZoneLookup:
+    """
+    Combined CQ zone, ITU zone, country and continent lookup.
+
+    Loads one ZoneIndex per entry in ZONE_LAYERS. Layers are exposed as
+    attributes (``lookup.cq_zone``, ``lookup.itu_zone``, ``lookup.country``,
+    ``lookup.continent``) for callers that only need one classification.
+
+    Args:
+        geojson_dir (str): Directory containing the GeoJSON boundary files
+        layers (iterable): Subset of ZONE_LAYERS names to load (default: all)
+        indexes (dict): Layer name -> prebuilt ZoneIndex (see load()); the
+            GeoJSON files are not read when given
+    """
+
+    def __init__(self, geojson_dir=GEOJSON_DIR, layers=None, indexes=None):
+        if indexes is None:
+            indexes = {}
+            for name in (layers or ZONE_LAYERS):
+                filename, property_name = ZONE_LAYERS[name]
+                indexes[name] = ZoneIndex.from_geojson(os.path.join(geojson_dir, filename), property_name)
+        self.layers = {}
+        for name, index in indexes.items():
+            self.layers[name] = index
+            setattr(self, name, index)
+
+    def save(self, path=ZONE_CACHE_PATH, geojson_dir=GEOJSON_DIR, tolerance=ZONE_SIMPLIFY_DEGREES):
+        """
+        Write simplified layer geometry as one WKB blob plus a JSON sidecar.
+
+        Args:
+            path (str): Destination .npy file
+            geojson_dir (str): Boundary file directory the layers were loaded from
+            tolerance (float): shapely.simplify tolerance in degrees (topology preserving)
+        """
+        chunks = []
+        layers = {}
+        size = 0
+        for name, index in self.layers.items():
+            geometries = index.geometries
+            if tolerance > 0:
+                geometries = shapely.simplify(geometries, tolerance, preserve_topology=True)
+            offsets = [size]
+            for wkb in shapely.to_wkb(geometries):
+                chunks.append(wkb)
+                size += len(wkb)
+                offsets.append(size)
+            layers[name] = {"values": index.values, "offsets": offsets}
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        np.save(path, np.frombuffer(b"".join(chunks), dtype=np.uint8))
+        meta = {
+            "version": ZONE_CACHE_VERSION,
+            "sources": geojson_signature(geojson_dir),
+            "tolerance": tolerance,
+            "layers": layers,
+        }
+        with open(os.path.splitext(path)[0] + ".json", "w") as f:
+            json.dump(meta, f)
+
+    @classmethod
+    def load(cls, path=ZONE_CACHE_PATH, geojson_dir=GEOJSON_DIR, tolerance=ZONE_SIMPLIFY_DEGREES):
+        """
+        Load layers from a file written by save().
+
+        The blob is memory-mapped, so processes loading the same file share
+        its pages. Only the STRtrees are rebuilt, which takes a few milliseconds.
+
+        Args:
+            path (str): .npy file written by save()
+            geojson_dir (str): Boundary file directory to validate against
+            tolerance (float): Expected simplification tolerance
+
+        Returns:
+            ZoneLookup: Loaded engine, or None if the file is missing or stale
+        """
+        meta_path = os.path.splitext(path)[0] + ".json"
+        try:
+            with open(meta_path) as f:
+                meta = json.load(f)
+            blob = np.load(path, mmap_mode="r")
+        except (OSError, ValueError):
+            return None
+
+        if (meta.get("version") != ZONE_CACHE_VERSION
+                or meta.get("sources") != geojson_signature(geojson_dir)
+                or meta.get("tolerance") != tolerance
+                or set(meta.get("layers", ())) != set(ZONE_LAYERS)):
+            return None
+
+        indexes = {}
+        for name, layer in meta["layers"].items():
+            offsets = layer["offsets"]
+            wkbs = [blob[start:end].tobytes() for start, end in zip(offsets, offsets[1:])]
+            indexes[name] = ZoneIndex(layer["values"], shapely.from_wkb(wkbs))
+        return cls(indexes=indexes)
+
+    def lookup(self, lat, lon):
+        """
+        Classify a single coordinate against every loaded layer.
+
+        Args:
+            lat (float): Latitude in decimal degrees
+            lon (float): Longitude in decimal degrees
+
+        Returns:
+            dict: Layer name -> zone value (None when outside every polygon)
+
+        Example:
+            >>> zone_lookup.lookup(40.7128, -74.0060)
+            {'cq_zone': 5, 'itu_zone': 8, 'country': 'United States', 'continent': 'North America'}
+        """
+        return {name: index.lookup(lat, lon) for name, index in self.layers.items()}
+
+    def lookup_many(self, lats, lons):
+        """
+        Classify many coordinates against every loaded layer.
+
+        Args:
+            lats (array-like): Latitudes in decimal degrees
+            lons (array-like): Longitudes in decimal degrees
+
+        Returns:
+            dict: Layer name -> list of zone values in input order
+        """
+        return {name: index.lookup_many(lats, lons) for name, index in self.layers.items()}
+
+
+def load_zone_lookup(path=ZONE_CACHE_PATH, geojson_dir=GEOJSON_DIR):
+    """
+    Load the compact zone file, building it from the GeoJSON first if needed.
+
+    Args:
+        path (str): Location of the compact .npy file
+        geojson_dir (str): Directory containing the GeoJSON boundary files
+
+    Returns:
+        ZoneLookup: Engine over the simplified layers
+    """
+    lookup = ZoneLookup.load(path, geojson_dir)
+    if lookup is None:
+        ZoneLookup(geojson_dir).save(path, geojson_dir)
+        lookup = ZoneLookup.load(path, geojson_dir)
+    return lookup
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def shared_zone_lookup():
+    """
+    Process-wide ZoneLookup, loaded by the first caller.
+
+    Returns:
+        ZoneLookup: The shared engine (see load_zone_lookup())
+    """
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = load_zone_lookup()
+        return _shared
+
+
+if __name__ == '__main__':
+    ZoneLookup().save()
+    lookup = ZoneLookup.load()
+    print(f"Wrote {ZONE_CACHE_PATH}: {os.path.getsize(ZONE_CACHE_PATH)} bytes, "
+          f"{sum(len(index) for index in lookup.layers.values())} polygons "
+          f"(tolerance {ZONE_SIMPLIFY_DEGREES} deg)")